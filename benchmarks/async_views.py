@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""Compare sequential and concurrent evaluation of CV section querysets.
+
+Every query is delayed by a simulated network latency (``--latency``,
+in milliseconds) so that the effect of concurrent round trips on a
+remote database can be measured with a local SQLite file. Usage::
+
+    python benchmarks/async_views.py --latency 5 --repeat 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import django
+from django.conf import settings
+from django.db import connections
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+
+def configure(db_path):
+    settings.configure(
+        SECRET_KEY='benchmark',
+        DATABASES={'default': {
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': db_path}},
+        INSTALLED_APPS=['django.contrib.contenttypes', 'django.contrib.auth',
+                        'cv'],
+        TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'APP_DIRS': True}],
+        CV_PERSONAL_INFO={'name': 'Benchmark'},
+    )
+    django.setup()
+
+
+def add_latency(latency):
+    """Delay every query on every connection by ``latency`` seconds."""
+    from django.db.backends.signals import connection_created
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(latency)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(install, weak=False)
+
+
+def populate(n):
+    from django.core.management import call_command
+    from cv.models import Article, Book, Chapter, Report, Grant, Talk, \
+        Award, Degree, Position
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    for i in range(n):
+        for model, status, extra in [(Article, 60, {}), (Book, 30, {}),
+                                     (Chapter, 0, {'book_title': 'Book'}),
+                                     (Report, 60, {})]:
+            model.objects.create(
+                title='%s %s' % (model.__name__, i), short_title='%s' % i,
+                slug='%s-%s' % (model.__name__.lower(), i), status=status,
+                pub_date='2000-01-01', **extra)
+        Grant.objects.create(
+            title='Grant %s' % i, short_title='%s' % i, slug='grant-%s' % i,
+            source=Grant.EXTERNAL, amount=1000, start_date='2000-01-01',
+            abstract='')
+        Talk.objects.create(
+            title='Talk %s' % i, short_title='%s' % i, slug='talk-%s' % i)
+        Award.objects.create(
+            name='Award %s' % i, organization='Org', date='2000-01-01')
+        Degree.objects.create(
+            degree='PhD', date_earned='2000-01-01', institution='U',
+            city='C', state='S', country='USA')
+        Position.objects.create(
+            title='Position %s' % i, start_date='2000-01-01',
+            end_date='2001-01-01', institution='U',
+            current_position=False, primary_position=(i == 0))
+
+
+def run(repeat):
+    from asgiref.sync import async_to_sync
+    from django.db import close_old_connections
+    from django.test import RequestFactory
+    from cv.views import MODELS, CVView, AsyncCVView
+
+    def make_view(view_class, **initkwargs):
+        # Views read the profile and window from the request
+        view = view_class(**initkwargs)
+        view.setup(RequestFactory().get('/'))
+        return view
+
+    def sync_sections():
+        context = make_view(CVView).get_context_data()
+        for value in context.values():
+            if hasattr(value, '_fetch_all'):
+                len(value)
+
+    def concurrent_sections():
+        view = make_view(AsyncCVView, concurrent_queries=True)
+        async_to_sync(view.aget_cv_lists)(MODELS)
+
+    results = dict()
+    for name, func in [('sequential', sync_sections),
+                       ('concurrent', concurrent_sections)]:
+        timings = list()
+        for i in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+            close_old_connections()
+        results[name] = min(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--latency', type=float, default=5.0,
+                        help='simulated latency per query in milliseconds')
+    parser.add_argument('--items', type=int, default=20,
+                        help='number of items of each type')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(os.path.join(tmp, 'benchmark.sqlite3'))
+        populate(args.items)
+        connections.close_all()
+        add_latency(args.latency / 1000)
+        results = run(args.repeat)
+    for name, seconds in results.items():
+        print('{0:<12}{1:8.1f} ms'.format(name, seconds * 1000))
+    print('speedup     {0:8.2f}x'.format(
+        results['sequential'] / results['concurrent']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""Compare the peak memory of building the PDF of a long CV.
+
+The CV has ``--entries`` articles, each with an author. Peak memory is
+measured with ``tracemalloc`` for three builds: every flowable created in
+a list before layout (``list``), flowables created from the CV document as
+they are laid out (``document``), and entries streamed from the database
+as they are laid out (``stream``). The peaks of ``list`` and ``document``
+include the CV document, which is built during the measurement. Usage::
+
+    python benchmarks/pdf_memory.py --entries 10000
+"""
+import argparse
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+
+def configure(db_path):
+    settings.configure(
+        SECRET_KEY='benchmark',
+        DATABASES={'default': {
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': db_path}},
+        INSTALLED_APPS=['django.contrib.contenttypes', 'django.contrib.auth',
+                        'cv'],
+        TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'APP_DIRS': True}],
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        CV_PERSONAL_INFO={'name': 'Benchmark'},
+    )
+    django.setup()
+
+
+def populate(n):
+    """Create ``n`` articles with bulk queries, bypassing signals."""
+    from django.core.management import call_command
+    from cv.models import Article, ArticleAuthorship, Collaborator
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    author = Collaborator.objects.create(
+        first_name='Ann', last_name='Author', email='ann@example.com')
+    Article.objects.bulk_create([
+        Article(title='Article about a long research program %s' % i,
+                short_title='%s' % i, slug='article-%s' % i, status=60,
+                is_published=True, pub_date='2000-01-01', volume='1',
+                start_page='1', end_page='20')
+        for i in range(n)], batch_size=500)
+    ArticleAuthorship.objects.bulk_create([
+        ArticleAuthorship(article_id=pk, collaborator=author,
+                          display_order=1)
+        for pk in Article.objects.values_list('pk', flat=True)],
+        batch_size=500)
+
+
+def build_list():
+    from cv.document import build_document
+    from cv.views.pdf import CVPdf
+    document = build_document()
+    pdf = CVPdf()
+    flowables = list(pdf.document_flowables(document))
+    pdf.make_doc_template(io.BytesIO(), document.name).build(
+        flowables, onFirstPage=pdf.myFirstPage,
+        onLaterPages=pdf.myLaterPages)
+
+
+def build_document():
+    from cv.document import build_document
+    from cv.views.pdf import CVPdf
+    CVPdf().build_cv(io.BytesIO(), build_document())
+
+
+def build_stream():
+    from cv.views.pdf import CVPdf
+    CVPdf().build_cv(io.BytesIO(), stream=True)
+
+
+def run():
+    results = dict()
+    for name, func in [('list', build_list), ('document', build_document),
+                       ('stream', build_stream)]:
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = (peak, seconds)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--entries', type=int, default=10000,
+                        help='number of entries of the CV')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(os.path.join(tmp, 'benchmark.sqlite3'))
+        populate(args.entries)
+        results = run()
+    for name, (peak, seconds) in results.items():
+        print('{0:<10}{1:8.1f} MB peak{2:8.1f} s'.format(
+            name, peak / 2 ** 20, seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""Compare the time of exporting the CV as a static website with a
+different number of worker processes.
+
+The CV has ``--items`` articles, each with a page and two citations.
+Usage::
+
+    python benchmarks/static_site.py --items 500 --workers 1 2 4 8
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import django
+from django.conf import settings
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+urlpatterns = list()
+
+
+def configure(db_path):
+    settings.configure(
+        SECRET_KEY='benchmark',
+        DATABASES={'default': {
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': db_path}},
+        INSTALLED_APPS=['django.contrib.contenttypes', 'django.contrib.auth',
+                        'django.contrib.staticfiles', 'cv'],
+        TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'APP_DIRS': True,
+            'OPTIONS': {'libraries': {
+                'staticfiles': 'django.templatetags.static'}}}],
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ROOT_URLCONF=__name__,
+        STATIC_URL='/static/',
+        CV_PERSONAL_INFO={'name': 'Benchmark'},
+    )
+    django.setup()
+    from django.urls import include, path
+    urlpatterns.append(path('', include('cv.urls')))
+
+
+def populate(n):
+    """Create ``n`` articles with bulk queries, bypassing signals."""
+    from django.core.management import call_command
+    from cv.models import Article
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    Article.objects.bulk_create([
+        Article(title='Article %s' % i, short_title='%s' % i,
+                slug='article-%s' % i, status=60, is_published=True,
+                pub_date='2000-01-01', volume='1', start_page='1',
+                end_page='20')
+        for i in range(n)], batch_size=500)
+
+
+def run(directory, workers):
+    from cv.static_site import export
+    results = dict()
+    for n in workers:
+        start = time.perf_counter()
+        pages = len(export(os.path.join(directory, str(n)), n))
+        results[n] = (pages, time.perf_counter() - start)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--items', type=int, default=500,
+                        help='number of articles')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                        help='numbers of worker processes to compare')
+    args = parser.parse_args()
+
+    # Workers must inherit the settings given to settings.configure()
+    multiprocessing.set_start_method('fork')
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(os.path.join(tmp, 'benchmark.sqlite3'))
+        populate(args.items)
+        results = run(tmp, args.workers)
+    for n, (pages, seconds) in results.items():
+        print('{0:>3} workers{1:8} pages{2:8.1f} s'.format(
+            n, pages, seconds))
+
+
+if __name__ == '__main__':
+    main()
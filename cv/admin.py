@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.contenttypes.admin import GenericTabularInline, GenericStackedInline
+from django.utils.text import format_lazy
 
 from .models import Collaborator, CVFile, Journal, Discipline, Award, \
 					Position, Degree, \
@@ -11,6 +12,9 @@ from .models import Collaborator, CVFile, Journal, Discipline, Award, \
 					Talk, Presentation, OtherWriting, \
 					MediaMention, Service, JournalService, Student, \
 					Course, CourseOffering 
+from .batch import reorder_collaborations, update_works
+from .models.base import CollaborationModel
+from .settings import PUBLICATION_STATUS_CHOICES
 
 ## Uncomment the following two lines if you would like to use the `researchprojects` app
 ## to link lines in CV to research projects
@@ -18,6 +22,53 @@ from .models import Collaborator, CVFile, Journal, Discipline, Award, \
 # project_admin_inlines = ['GrantAdmin','ArticleAdmin','ChapterAdmin','BookAdmin','TalkAdmin','MediaMentionAdmin']
 
 
+# Admin actions for `cv`
+def make_status_action(status, label):
+	"""Return admin action that sets the status of selected publications."""
+	def set_status(modeladmin, request, queryset):
+		updated = update_works(
+			queryset.model, list(queryset.values_list('pk', flat=True)),
+			status=status)
+		modeladmin.message_user(request, 'Set status of %s %s to "%s".' % (
+			updated, queryset.model._meta.verbose_name_plural, label))
+	set_status.__name__ = 'set_status_%s' % status
+	set_status.short_description = format_lazy(
+		'Set status of selected %(verbose_name_plural)s to "{}"', label)
+	return set_status
+
+status_actions = [make_status_action(status, label) for status, label in PUBLICATION_STATUS_CHOICES]
+
+def make_display_action(display):
+	"""Return admin action that shows or hides selected works on the CV."""
+	def set_display(modeladmin, request, queryset):
+		updated = update_works(
+			queryset.model, list(queryset.values_list('pk', flat=True)),
+			display=display)
+		modeladmin.message_user(request, '%s %s %s.' % (
+			'Displayed' if display else 'Hid', updated,
+			queryset.model._meta.verbose_name_plural))
+	set_display.__name__ = 'display_selected' if display else 'hide_selected'
+	set_display.short_description = '%s selected %%(verbose_name_plural)s on CV' % (
+		'Display' if display else 'Hide')
+	return set_display
+
+display_actions = [make_display_action(True), make_display_action(False)]
+
+def renumber_collaborations(modeladmin, request, queryset):
+	"""Number authors, editors, and grant collaborators of selected works
+	consecutively from 1, keeping their current order."""
+	relations = [rel.name for rel in queryset.model._meta.related_objects
+		if rel.one_to_many and issubclass(rel.related_model, CollaborationModel)]
+	for instance in queryset.prefetch_related(*relations):
+		for relation in relations:
+			pks = [c.pk for c in sorted(getattr(instance, relation).all(), 
+				key=lambda c: c.display_order)]
+			reorder_collaborations(instance, relation, pks)
+renumber_collaborations.short_description = 'Renumber collaborators of selected %(verbose_name_plural)s'
+
+publication_actions = status_actions + display_actions + [renumber_collaborations]
+
+
 # Admin class models for `cv`
 class CVFileInline(GenericTabularInline):
 	model = CVFile
@@ -25,6 +76,7 @@ class CVFileInline(GenericTabularInline):
 	
 class DisciplineAdmin(admin.ModelAdmin):
 	prepopulated_fields = {'slug': ['name']}
+	search_fields = ['^name']
 	
 class CollaboratorAdmin(admin.ModelAdmin):
 	fieldsets = (
@@ -33,6 +85,8 @@ class CollaboratorAdmin(admin.ModelAdmin):
 		)
 	list_display = ('last_name','first_name','email')
 	list_display_links = ('last_name','first_name','email')
+	search_fields = ['^last_name','^first_name']
+	show_full_result_count = False
 	
 class JournalAdmin(admin.ModelAdmin):
 	fieldsets = (
@@ -42,7 +96,8 @@ class JournalAdmin(admin.ModelAdmin):
 	list_display = ('title','issn')
 	list_display_links = ('title','issn')
 	list_filter = ('primary_discipline',)
-	filter_horizontal = ['other_disciplines']
+	search_fields = ['^title','^abbreviated_title']
+	autocomplete_fields = ['primary_discipline','other_disciplines']
 
 class AwardAdmin(admin.ModelAdmin):
 	
@@ -86,6 +141,7 @@ class PositionAdmin(admin.ModelAdmin):
 class GrantCollaborationInline(admin.TabularInline):
 	model = GrantCollaboration
 	extra = 3
+	autocomplete_fields = ['collaborator']
 
 class GrantAdmin(admin.ModelAdmin):
 	
@@ -99,16 +155,20 @@ class GrantAdmin(admin.ModelAdmin):
 		)
 	prepopulated_fields = {'slug':['short_title']}
 	list_display = ('title','source','agency','start_date','end_date')
+	actions = display_actions + [renumber_collaborations]
 	list_editable = ('start_date','end_date','source')
 	date_hierarchy = 'start_date'
 	list_filter = ('source','agency','primary_discipline')
-	filter_horizontal = ['other_disciplines']
+	search_fields = ['^title','^short_title']
+	autocomplete_fields = ['primary_discipline','other_disciplines']
+	show_full_result_count = False
 	
 	inlines = [GrantCollaborationInline, CVFileInline]
 	
 class ArticleAuthorshipInline(admin.TabularInline):
 	model = ArticleAuthorship
 	extra = 5
+	autocomplete_fields = ['collaborator']
 
 class ArticleAdmin(admin.ModelAdmin):
 	
@@ -128,20 +188,26 @@ class ArticleAdmin(admin.ModelAdmin):
 		)
 	prepopulated_fields = {'slug':['short_title']}
 	list_display = ('title','status','submission_date','pub_date','journal')
+	actions = publication_actions
 	list_editable = ('status','submission_date','pub_date')
+	list_select_related = ('journal',)
 	date_hierarchy = 'pub_date'
 	list_filter = ('status','primary_discipline')
-	filter_horizontal = ['other_disciplines']
+	search_fields = ['^title','^short_title','^journal__title']
+	autocomplete_fields = ['journal','grants','primary_discipline','other_disciplines']
+	show_full_result_count = False
 	
 	inlines = [ArticleAuthorshipInline, CVFileInline]
 
 class ChapterAuthorshipInline(admin.TabularInline):
 	model = ChapterAuthorship
-	extra = 5 
+	extra = 5
+	autocomplete_fields = ['collaborator']
 
 class ChapterEditorshipInline(admin.TabularInline):
 	model = ChapterEditorship
-	extra = 2 
+	extra = 2
+	autocomplete_fields = ['collaborator']
 
 class ChapterAdmin(admin.ModelAdmin):
 	
@@ -163,16 +229,20 @@ class ChapterAdmin(admin.ModelAdmin):
 		)
 	prepopulated_fields = {'slug':['short_title']}
 	list_display = ('title','status','book_title')
+	actions = publication_actions
 	list_editable = ('status',)
 	date_hierarchy = 'pub_date'
 	list_filter = ('status','primary_discipline')
-	filter_horizontal = ['other_disciplines','grants']
+	search_fields = ['^title','^short_title','^book_title']
+	autocomplete_fields = ['grants','primary_discipline','other_disciplines']
+	show_full_result_count = False
 	
 	inlines = [ChapterAuthorshipInline, ChapterEditorshipInline, CVFileInline]
 
 class BookAuthorshipInline(admin.TabularInline):
 	model = BookAuthorship
 	extra = 1
+	autocomplete_fields = ['collaborator']
 
 class BookEditionInline(admin.TabularInline):
 	model = BookEdition
@@ -200,15 +270,19 @@ class BookAdmin(admin.ModelAdmin):
 		)
 	prepopulated_fields = {'slug':['short_title']}
 	list_display = ('title','status','pub_date')
+	actions = publication_actions
 	list_editable = ('status',)
 	date_hierarchy = 'pub_date'
-	filter_horizontal = ['other_disciplines']
+	search_fields = ['^title','^short_title']
+	autocomplete_fields = ['grants','primary_discipline','other_disciplines']
+	show_full_result_count = False
 	
 	inlines = [BookAuthorshipInline, BookEditionInline, CVFileInline]
 
 class ReportAuthorshipInline(admin.TabularInline):
 	model = ReportAuthorship
 	extra = 5
+	autocomplete_fields = ['collaborator']
 
 class ReportAdmin(admin.ModelAdmin):
 	
@@ -228,10 +302,13 @@ class ReportAdmin(admin.ModelAdmin):
 		)
 	prepopulated_fields = {'slug':['short_title']}
 	list_display = ('title','status','report_type')
+	actions = publication_actions
 	list_editable = ('status',)
 	date_hierarchy = 'pub_date'
 	list_filter = ('status','primary_discipline')
-	filter_horizontal = ['other_disciplines']
+	search_fields = ['^title','^short_title']
+	autocomplete_fields = ['grants','primary_discipline','other_disciplines']
+	show_full_result_count = False
 	
 	inlines = [ReportAuthorshipInline, CVFileInline]
 
@@ -253,9 +330,12 @@ class TalkAdmin(admin.ModelAdmin):
 		)
 	prepopulated_fields = {'slug':['short_title']}
 	list_display = ('title',)
+	actions = display_actions
 	date_hierarchy = 'latest_presentation_date'
 	inlines = [PresentationInline, CVFileInline]
-	filter_horizontal = ['collaborator']
+	search_fields = ['^title','^short_title']
+	autocomplete_fields = ['collaborator','grants','primary_discipline','other_disciplines']
+	show_full_result_count = False
 
 class PresentationAdmin(admin.ModelAdmin):
 	fieldsets = (
@@ -263,13 +343,17 @@ class PresentationAdmin(admin.ModelAdmin):
 		(None, {'fields':(('event','event_acronym'))}),
 		(None, {'fields':(('city','state','country'))})
 		)
+	list_display = ('talk','event','presentation_date')
+	list_select_related = ('talk',)
+	date_hierarchy = 'presentation_date'
+	search_fields = ['^talk__title','^event']
+	show_full_result_count = False
 
 class MediaMentionAdmin(admin.ModelAdmin):
 	fieldsets = (
 		('Media mention information', {'fields':(('title','date','url'),)}),
 		('Media outlet information',{'fields':(('outlet','section','author'),)}),
 		('Content of mention', {'fields':('description','snapshot')}),
-		('Relevant product', {'fields':('article','book','talk')})
 		)
 
 class OtherWritingAdmin(admin.ModelAdmin):
@@ -282,8 +366,10 @@ class OtherWritingAdmin(admin.ModelAdmin):
 		)
 	prepopulated_fields = {'slug':['title']}
 	list_display = ('type','title','date','venue')
+	actions = display_actions
 	list_filter = ['type']
-	date_hierarchy = 'date'	
+	date_hierarchy = 'date'
+	search_fields = ['^title']
 	
 class ServiceAdmin(admin.ModelAdmin):
 	fieldsets = (
@@ -302,6 +388,9 @@ class JournalServiceAdmin(admin.ModelAdmin):
 		('Basic Information',{'fields':('journal','is_reviewer')}),
 		('Extra information',{'fields':('extra',),'classes':('collapse',)})
 		)
+	list_display = ('journal','is_reviewer')
+	list_select_related = ('journal',)
+	autocomplete_fields = ['journal']
 
 class StudentAdmin(admin.ModelAdmin):
 	fieldsets = (
@@ -318,6 +407,7 @@ class StudentAdmin(admin.ModelAdmin):
 	list_editable = ('graduation_date','is_current_student')
 	date_hierarchy = 'graduation_date'
 	list_filter = ('student_level','is_current_student')
+	search_fields = ['^last_name','^first_name']
 
 
 class CourseOfferingInline(admin.TabularInline):
@@ -339,13 +429,18 @@ class CourseAdmin(admin.ModelAdmin):
 
 def register_hidden_models(*model_names):
 	"""Hide models from list of models on CV admin but allow models to be edited using 
-	plus symbol on related models."""
+	plus symbol on related models.
+
+	Each argument is either a model or a ``(model, model_admin)`` tuple; the
+	hidden admin is derived from ``model_admin`` so that options such as
+	``search_fields`` remain available to autocomplete widgets."""
 	## Copied from murraybiscuit's answer on StackOverflow: 
 	## https://stackoverflow.com/a/41193766
 	for m in model_names:
+		m, base = m if isinstance(m, tuple) else (m, admin.ModelAdmin)
 		ma = type(
 			str(m)+'Admin',
-			(admin.ModelAdmin,),
+			(base,),
 			{
 				'get_model_perms': lambda self, request: {}
 			})
@@ -370,7 +465,7 @@ if researchprojects_installed():
 		c = getattr(importlib.import_module('cv.admin'),admin_type)
 		c.inlines+=[ResearchProjectItemInline]
 
-register_hidden_models(Journal,Discipline)
+register_hidden_models((Journal,JournalAdmin),(Discipline,DisciplineAdmin))
 
 admin.site.register(Collaborator,CollaboratorAdmin)	
 admin.site.register(Award,AwardAdmin)
@@ -0,0 +1,158 @@
+"""Change the order of collaborators and the status or display of many CV
+works at once.
+
+Changes are made with ``bulk_update`` and ``QuerySet.update``, which do
+not send ``post_save`` signals, so the functions in this module bump the
+:class:`cv.models.CVRevision`, queue PDF builds (see :mod:`cv.builds`),
+and update the ``modified`` field of the changed works themselves. Search entries are updated when the display of
+works changes.
+"""
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from cv.builds import enqueue_builds
+from cv.models import CVRevision
+from cv.models.base import CollaborationModel, DisplayableModel
+from cv.search import update_index
+from cv.settings import PUBLICATION_STATUS_CHOICES
+
+
+UPDATE_FIELDS = ('status', 'display')
+"""Fields of works that may be changed by :func:`update_works`."""
+
+
+def get_work_model(model_name):
+    """Return CV model named ``model_name`` that has a ``display`` field."""
+    try:
+        model = apps.get_model('cv', model_name)
+    except (LookupError, ValueError):
+        raise ValidationError('Unknown model: %s' % model_name)
+    if not issubclass(model, DisplayableModel):
+        raise ValidationError('Unknown model: %s' % model_name)
+    return model
+
+
+def get_collaboration_field(model, relation):
+    """Return the field of the collaboration model related to ``model``
+    with the name ``relation`` (e.g., ``authorship``, ``editorship``, or
+    ``collaboration``)."""
+    try:
+        rel = model._meta.get_field(relation)
+    except FieldDoesNotExist:
+        rel = None
+    if (rel is None or not rel.one_to_many or
+            not issubclass(rel.related_model, CollaborationModel)):
+        raise ValidationError('%s has no collaborations named %s' % (
+            model._meta.verbose_name.title(), relation))
+    return rel.field
+
+
+def reorder_collaborations(instance, relation, pks):
+    """Order collaborations of ``instance`` named ``relation`` as listed in
+    ``pks`` and return the reordered collaborations.
+
+    For example, ``reorder_collaborations(article, 'authorship', [3, 1, 2])``
+    makes the authorship with id 3 the first author of ``article``.
+    """
+    field = get_collaboration_field(instance.__class__, relation)
+    with transaction.atomic():
+        collaborations = field.model.objects.filter(
+            **{field.name: instance}).reorder(pks)
+        instance.__class__._base_manager.filter(pk=instance.pk).update(
+            modified=timezone.now())
+        CVRevision.objects.bump()
+        enqueue_builds()
+    return collaborations
+
+
+def update_works(model, pks, **fields):
+    """Update ``status`` and/or ``display`` of instances of ``model`` with
+    primary keys in ``pks`` and return the number of instances updated.
+
+    The ``is_published``, ``is_inrevision``, and ``is_inprep`` fields of
+    publications are set from ``status`` in the same query.
+    """
+    invalid = set(fields) - set(UPDATE_FIELDS)
+    if invalid or not fields:
+        raise ValidationError(
+            'Fields to update must be among %s' % ', '.join(UPDATE_FIELDS))
+    if 'display' in fields and not isinstance(fields['display'], bool):
+        raise ValidationError('Display must be true or false.')
+    if 'status' in fields:
+        try:
+            model._meta.get_field('status')
+        except FieldDoesNotExist:
+            raise ValidationError('%s has no status' % (
+                model._meta.verbose_name.title()))
+        status = fields['status']
+        if isinstance(status, bool) or \
+                status not in dict(PUBLICATION_STATUS_CHOICES):
+            raise ValidationError('Unknown status: %s' % fields['status'])
+    with transaction.atomic():
+        try:
+            updated = model.objects.filter(pk__in=pks).update(
+                modified=timezone.now(), **fields)
+        except (TypeError, ValueError):
+            raise ValidationError('Ids must be a list of integers.')
+        if updated:
+            CVRevision.objects.bump()
+            enqueue_builds()
+            if 'display' in fields:
+                update_index(model, pks)
+    return updated
+
+
+def get_operations(operations, name):
+    """Return the list of ``name`` operations of a batch."""
+    ops = operations.get(name, [])
+    if not isinstance(ops, list) or \
+            not all(isinstance(op, dict) for op in ops):
+        raise ValidationError('"%s" must be a list of objects.' % name)
+    return ops
+
+
+def apply_batch(operations):
+    """Apply a batch of ``reorder`` and ``update`` operations in a single
+    transaction and return the number of works changed by each.
+
+    ``operations`` is a dictionary such as::
+
+        {
+            "reorder": [{"model": "article", "id": 1,
+                         "relation": "authorship", "order": [3, 1, 2]}],
+            "update": [{"model": "article", "ids": [1, 2],
+                        "status": 60, "display": true}]
+        }
+
+    Raises :class:`~django.core.exceptions.ValidationError` and makes no
+    changes if any operation is invalid.
+    """
+    if not isinstance(operations, dict) or \
+            set(operations) - {'reorder', 'update'}:
+        raise ValidationError(
+            'Batch must be an object with "reorder" and/or "update" lists.')
+    reorders = get_operations(operations, 'reorder')
+    updates = get_operations(operations, 'update')
+    result = {'reordered': 0, 'updated': 0}
+    with transaction.atomic():
+        for op in reorders:
+            model = get_work_model(op.get('model'))
+            try:
+                instance = model._base_manager.get(pk=op.get('id'))
+            except (model.DoesNotExist, ValueError, TypeError):
+                raise ValidationError('No %s with id %s' % (
+                    model._meta.verbose_name, op.get('id')))
+            reorder_collaborations(
+                instance, op.get('relation', 'authorship'),
+                op.get('order', []))
+            result['reordered'] += 1
+        for op in updates:
+            op = dict(op)
+            model = get_work_model(op.pop('model', None))
+            pks = op.pop('ids', [])
+            if not isinstance(pks, list):
+                raise ValidationError('Ids must be a list.')
+            result['updated'] += update_works(model, pks, **op)
+    return result
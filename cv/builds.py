@@ -0,0 +1,113 @@
+"""Build PDFs of CV profiles in the background.
+
+When :setting:`CV_PDF_QUEUE` is ``True``, every change to CV data queues a
+:class:`~cv.models.PDFBuild` of each profile (see :mod:`cv.profiles`). The
+``run_pdf_builds`` management command runs queued builds and stores their
+PDFs in the database, so no broker is needed. The PDF view serves the
+newest completed build of a profile and the PDF status view reports
+whether a newer build is pending.
+
+Builds are queued when the transaction that changes CV data commits, once
+per transaction however many instances it saves, so that workers never
+build data that is not committed yet.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from cv.models import CVRevision, PDFBuild
+from cv.profiles import get_profile, get_profiles
+from cv.settings import CV_PDF_QUEUE
+from cv.windows import parse_window
+
+import traceback
+
+
+def is_enabled():
+    """Return ``True`` if PDFs are built in the background."""
+    return bool(CV_PDF_QUEUE)
+
+
+def queue_profiles():
+    """Queue a build of each profile."""
+    PDFBuild.objects.enqueue(sorted(get_profiles()))
+
+
+def enqueue_builds():
+    """Queue a build of each profile when the current transaction commits,
+    if PDFs are built in the background.
+
+    Builds are queued at most once per transaction. Callbacks of savepoints
+    that are rolled back are discarded by Django, so the pending callbacks
+    of the connection are checked rather than a flag.
+    """
+    if not is_enabled():
+        return
+    connection = transaction.get_connection()
+    if any(callback[1] is queue_profiles
+           for callback in connection.run_on_commit):
+        return
+    transaction.on_commit(queue_profiles)
+
+
+def run_build(build):
+    """Build the PDF of running ``build`` and store it.
+
+    The PDF is streamed from the database rather than built from the
+    cached CV document, so builds of long CVs use little memory.
+
+    Failures are stored on the build. Older completed builds of the
+    profile and failures they supersede are deleted, and so are older
+    failures when the build fails.
+    """
+    from cv.views.pdf import build_cv_pdf
+    build.revision = CVRevision.objects.current().revision
+    try:
+        profile = get_profile(build.profile)
+        build.content = build_cv_pdf(
+            parse_window(profile.years), profile, stream=True)
+        build.status = PDFBuild.DONE
+    except Exception:
+        build.error = traceback.format_exc()
+        build.status = PDFBuild.FAILED
+    build.finished = timezone.now()
+    build.save()
+    older = PDFBuild.objects.filter(profile=build.profile).exclude(
+        pk=build.pk)
+    if build.status == PDFBuild.DONE:
+        older.filter(
+            Q(status=PDFBuild.DONE, revision__lt=build.revision) |
+            Q(status=PDFBuild.FAILED, revision__lte=build.revision)
+        ).delete()
+    else:
+        older.filter(status=PDFBuild.FAILED).delete()
+    return build
+
+
+def run_builds(limit=None):
+    """Run pending builds, at most ``limit`` of them, and return the list
+    of builds that were run."""
+    builds = list()
+    while limit is None or len(builds) < limit:
+        build = PDFBuild.objects.claim()
+        if build is None:
+            break
+        builds.append(run_build(build))
+    return builds
+
+
+def get_build_status(profile):
+    """Return dictionary describing the newest completed build of
+    ``profile`` and whether a newer build is pending."""
+    revision = CVRevision.objects.current().revision
+    newest = PDFBuild.objects.defer('content').newest(profile.name)
+    return {
+        'profile': profile.name,
+        'revision': revision,
+        'build': newest and {
+            'revision': newest.revision,
+            'finished': newest.finished.isoformat(),
+        },
+        'pending': PDFBuild.objects.is_pending(profile.name),
+        'current': bool(newest) and newest.revision == revision,
+    }
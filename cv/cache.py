@@ -0,0 +1,102 @@
+"""Cache CV data keyed on the revision of the CV.
+
+Keys include the current :class:`cv.models.CVRevision`, so cached values
+are never served after CV data changes and need not be deleted
+explicitly; old entries expire after :setting:`CV_CACHE_TIMEOUT`.
+Entries of the PDF are cached by :class:`EntryCache` under the version of
+each instance instead.
+"""
+from django.core.cache import caches
+
+from cv.models import CVRevision
+from cv.settings import CV_CACHE_ALIAS, CV_CACHE_TIMEOUT
+
+import hashlib
+import threading
+
+
+def get_cv_cache():
+    """Return cache backend defined by :setting:`CV_CACHE_ALIAS`."""
+    return caches[CV_CACHE_ALIAS]
+
+
+def make_key(namespace, *parts, revision=None):
+    """Return cache key for ``parts`` in ``namespace`` at ``revision``.
+
+    The current CV revision is used if ``revision`` is not given.
+    """
+    if revision is None:
+        # The time of the change keeps keys distinct if the counter is
+        # ever reset, e.g., when a database is restored from a backup
+        current = CVRevision.objects.current()
+        revision = '%s.%s' % (
+            current.revision, int(current.modified.timestamp() * 1e6))
+    digest = hashlib.md5(
+        ':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return 'cv:%s:%s:%s' % (namespace, revision, digest)
+
+
+def get_or_set(key, func, timeout=CV_CACHE_TIMEOUT):
+    """Return value cached at ``key`` or cache and return ``func()``."""
+    cache = get_cv_cache()
+    value = cache.get(key)
+    if value is None:
+        value = func()
+        cache.set(key, value, timeout)
+    return value
+
+
+class EntryCache:
+    """Cache of the markup of CV entries.
+
+    Entries are keyed on their model, primary key, and ``modified`` time
+    rather than on the CV revision, so after a change only the entries of
+    the changed instances are formatted again. Hits and misses are counted
+    in each process.
+    """
+    namespace = 'cv_entry'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, model_name, pk, modified, *parts):
+        """Return key of the entry of ``pk`` of ``model_name`` changed at
+        ``modified`` and formatted with ``parts``."""
+        version = int(modified.timestamp() * 1e6)
+        return make_key(self.namespace, *parts,
+                        revision='%s.%s.%s' % (model_name, pk, version))
+
+    def get_many(self, keys):
+        """Return dictionary of the entries cached at ``keys``."""
+        if not keys:
+            return {}
+        entries = get_cv_cache().get_many(keys)
+        with self.lock:
+            self.hits += len(entries)
+            self.misses += len(keys) - len(entries)
+        return entries
+
+    def set_many(self, entries, timeout=CV_CACHE_TIMEOUT):
+        """Cache ``entries``, a dictionary of entries keyed by the keys of
+        :meth:`make_key`."""
+        if entries:
+            get_cv_cache().set_many(entries, timeout)
+
+    def get_stats(self):
+        """Return dictionary of the hits, misses, and hit rate of the
+        cache since the process started or :meth:`reset_stats`."""
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {'hits': hits, 'misses': misses,
+                'hit_rate': hits / total if total else 0.0}
+
+    def reset_stats(self):
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+
+
+entry_cache = EntryCache()
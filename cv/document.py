@@ -0,0 +1,213 @@
+"""A format-neutral representation of the CV.
+
+A :class:`CVDocument` holds the heading of the CV and its sections, each
+divided into subsections of entries. Entries have a printable date and
+rich text, the inline markup written by the entry templates in
+``cv/pdf/`` (``<i>``, ``<b>``, ``<br />``, ``<super>``, and character
+entities). Documents are built with one pass over the database for each
+profile and window and cached until the CV changes, so that every output
+format (see :mod:`cv.renderers`) is rendered from the same data.
+"""
+from django.utils.html import strip_tags
+
+from cv.cache import get_or_set, make_key
+from cv.models import Position
+from cv.profiles import get_profile
+from cv.settings import CV_PERSONAL_INFO
+
+import html
+import re
+
+
+class Entry:
+    """An entry of the CV with a printable ``date`` and rich ``text``."""
+
+    def __init__(self, date, text):
+        self.date = date
+        self.text = text
+
+    @property
+    def html(self):
+        return markup_to_html(self.text)
+
+    @property
+    def plain_text(self):
+        return markup_to_text(self.text)
+
+    def to_dict(self):
+        return {'date': self.date, 'text': self.plain_text,
+                'html': self.html}
+
+    def __repr__(self):
+        return '<Entry: %s %s>' % (self.date, self.plain_text[:40])
+
+
+class Subsection:
+    """A list of entries with a ``title``, or with no title if it is the
+    only list of its section."""
+
+    def __init__(self, title, entries):
+        self.title = title
+        self.entries = entries
+
+    def to_dict(self):
+        return {'title': self.title,
+                'entries': [entry.to_dict() for entry in self.entries]}
+
+
+class Section:
+    """A section of the CV for the model named ``model_name``."""
+
+    def __init__(self, model_name, title, subsections):
+        self.model_name = model_name
+        self.title = title
+        self.subsections = subsections
+
+    def to_dict(self):
+        return {'model_name': self.model_name, 'title': self.title,
+                'subsections': [s.to_dict() for s in self.subsections]}
+
+
+class CVDocument:
+    """The CV of ``name`` with the lines of its ``heading`` and its
+    ``sections``."""
+
+    def __init__(self, name, heading, sections, profile=None, since=None):
+        self.name = name
+        self.heading = heading
+        self.sections = sections
+        self.profile = profile
+        self.since = since
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'heading': self.heading,
+            'profile': self.profile,
+            'since': self.since,
+            'sections': [section.to_dict() for section in self.sections],
+        }
+
+
+MARKUP_TAGS = {
+    'i': 'i', 'em': 'em', 'b': 'b', 'strong': 'strong', 'u': 'u',
+    'strike': 's', 'super': 'sup', 'sup': 'sup', 'sub': 'sub', 'br': 'br',
+}
+"""HTML tags that correspond to tags of entry markup. Other tags are
+dropped when entries are converted to HTML."""
+
+TAG_RE = re.compile(r'<(/?)\s*(\w+)[^>]*?(/?)>')
+
+
+def markup_to_html(text):
+    """Return entry markup ``text`` as HTML."""
+    def replace(match):
+        closing, tag, empty = match.groups()
+        tag = MARKUP_TAGS.get(tag.lower())
+        if tag is None:
+            return ''
+        if tag == 'br':
+            return '<br>'
+        return '<%s%s>' % (closing, tag)
+    return TAG_RE.sub(replace, text)
+
+
+def markup_to_text(text):
+    """Return entry markup ``text`` as plain text."""
+    text = re.sub(r'<\s*br\s*/?>', ' ', text)
+    return ' '.join(html.unescape(strip_tags(text)).split())
+
+
+RUN_FORMATS = {
+    'i': 'i', 'em': 'i', 'b': 'b', 'strong': 'b', 'u': 'u', 'strike': 's',
+    'super': 'sup', 'sup': 'sup', 'sub': 'sub',
+}
+"""Formats of runs of text for tags of entry markup."""
+
+
+def markup_to_runs(text):
+    """Return entry markup ``text`` as a list of ``(text, formats)`` runs.
+
+    ``formats`` is a set of the values of :data:`RUN_FORMATS` applied to
+    the run. Line breaks are runs of ``'\\n'``. Formats without a
+    counterpart in another output format may simply be ignored.
+    """
+    runs, formats, position = list(), list(), 0
+
+    def add(part):
+        part = html.unescape(re.sub(r'\s+', ' ', part))
+        if part:
+            runs.append((part, frozenset(formats)))
+
+    for match in TAG_RE.finditer(text):
+        add(text[position:match.start()])
+        position = match.end()
+        closing, tag, empty = match.groups()
+        tag = tag.lower()
+        if tag == 'br':
+            runs.append(('\n', frozenset()))
+        elif tag in RUN_FORMATS and not empty:
+            if not closing:
+                formats.append(RUN_FORMATS[tag])
+            elif RUN_FORMATS[tag] in formats:
+                formats.remove(RUN_FORMATS[tag])
+    add(text[position:])
+    return runs
+
+
+def get_heading():
+    """Return lines at the top of the CV: the primary positions and the
+    contact information of :setting:`CV_PERSONAL_INFO`."""
+    lines = list()
+    for position in Position.primarypositions.all():
+        lines += [position.title]
+        if position.department:
+            lines += [position.department]
+        if position.institution:
+            lines += [position.institution]
+    info = CV_PERSONAL_INFO or {}
+    for key in ['address', 'phone', 'email']:
+        if key in info.keys():
+            lines += info[key].split("\n")
+    return lines
+
+
+def build_section(pdf_section):
+    """Return :class:`Section` of the entries of a
+    :class:`~cv.views.pdf.CVPdfSection` or ``None`` if it is empty."""
+    from cv.views.pdf import CVPdfSubsectionContainer
+    entries = pdf_section.make_section_entries()
+    if not entries:
+        return None
+    if isinstance(entries, CVPdfSubsectionContainer):
+        subsections = [
+            Subsection(title, [Entry(**e) for e in subsection_entries])
+            for subsection in entries.subsection_entries
+            for title, subsection_entries in subsection.items()]
+    else:
+        subsections = [Subsection(None, [Entry(**e) for e in entries])]
+    return Section(pdf_section.model_name,
+                   pdf_section.make_section_header_name(), subsections)
+
+
+def build_document(profile=None, since=None):
+    """Return :class:`CVDocument` of ``profile`` (by default, the complete
+    CV) limited to the window that starts on ``since``."""
+    from cv.views.pdf import CVPdfSection
+    profile = profile or get_profile()
+    sections = list()
+    for section in profile.sections:
+        section = build_section(CVPdfSection(since=since, **section))
+        if section is not None:
+            sections.append(section)
+    info = CV_PERSONAL_INFO or {}
+    return CVDocument(info.get('name', ''), get_heading(),
+                      sections, profile=profile.name, since=since)
+
+
+def get_document(profile=None, since=None):
+    """Return cached :class:`CVDocument` of ``profile`` limited to the
+    window that starts on ``since``, building it if necessary."""
+    profile = profile or get_profile()
+    return get_or_set(make_key('cv_document.%s' % profile.name, since),
+                      lambda: build_document(profile, since))
@@ -0,0 +1,205 @@
+"""Count and filter CV works by discipline, year, type, and status.
+
+Facet counts are computed from a "cube" of the number of displayable works
+for each combination of type, discipline, year, and status. The cube is
+one ``UNION ALL`` of a grouped aggregate of each kind of work, so its size
+depends on the number of combinations rather than the number of works,
+and it is cached until the CV changes (see :mod:`cv.cache`).
+
+Works are counted under their primary discipline and each of their other
+disciplines; a work whose other disciplines include its primary
+discipline is counted twice under that discipline.
+"""
+from django.apps import apps
+from django.db.models import BooleanField, CharField, Count, F, Q, \
+    Value, Case, When
+from django.db.models.functions import Coalesce, ExtractYear
+from django.utils.translation import ugettext_lazy as _
+
+from collections import Counter, namedtuple
+
+from cv.cache import get_or_set, make_key
+from cv.models import Discipline
+
+
+FACET_DATES = {
+    'article': ('pub_date', 'submission_date'),
+    'book': ('pub_date', 'submission_date'),
+    'chapter': ('pub_date', 'submission_date'),
+    'report': ('pub_date', 'submission_date'),
+    'talk': ('latest_presentation_date',),
+    'grant': ('start_date',),
+    'dataset': ('pub_date',),
+    'otherwriting': ('date',),
+}
+"""Names of models included in facets and the date fields that determine
+the year of their instances. The first date that is not ``NULL`` is
+used."""
+
+FACETS = ('type', 'discipline', 'year', 'status')
+
+STATUS_LABELS = {
+    'published': _('Published'),
+    'revise': _('Under Review'),
+    'inprep': _('In Preparation'),
+}
+
+CubeRow = namedtuple('CubeRow', FACETS + ('primary', 'count'))
+"""Number of works of a type, discipline, year, and status. ``primary``
+is ``False`` for works counted under one of their other disciplines."""
+
+
+def get_facet_models():
+    """Return list of models included in facets."""
+    return [apps.get_model('cv', name) for name in FACET_DATES]
+
+
+def has_status(model):
+    """Return whether ``model`` is a publication with a ``status``."""
+    return hasattr(model.displayable, 'published')
+
+
+def get_status_filters(model):
+    """Return dictionary of status names (e.g., ``published``) and the
+    conditions that select publications with each status."""
+    return model.displayable.management_filters() if has_status(model) \
+        else dict()
+
+
+def year_expression(model):
+    """Return expression of the year of instances of ``model``."""
+    dates = FACET_DATES[model._meta.model_name]
+    date = Coalesce(*dates) if len(dates) > 1 else F(dates[0])
+    return ExtractYear(date)
+
+
+def year_filter(model, year):
+    """Return condition for instances of ``model`` dated in ``year``
+    that can use the indexes of the date fields."""
+    condition, earlier_null = Q(pk__in=[]), Q()
+    for name in FACET_DATES[model._meta.model_name]:
+        condition |= earlier_null & Q(**{name + '__year': year})
+        earlier_null &= Q(**{name + '__isnull': True})
+    return condition
+
+
+def status_expression(model):
+    """Return expression of the status name of instances of ``model``."""
+    return Case(
+        *[When(condition, then=Value(name))
+          for name, condition in get_status_filters(model).items()],
+        default=Value(None), output_field=CharField())
+
+
+def get_cube_querysets(model):
+    """Return querysets of the grouped counts of ``model`` by primary and
+    by other disciplines."""
+    columns = {
+        'facet_type': Value(model._meta.model_name, output_field=CharField()),
+        'facet_year': year_expression(model),
+        'facet_status': status_expression(model),
+    }
+    primary = model.displayable.order_by().values(
+        facet_discipline=F('primary_discipline'), **columns,
+        facet_primary=Value(True, output_field=BooleanField()))
+    other = model.displayable.order_by().filter(
+        other_disciplines__isnull=False).values(
+        facet_discipline=F('other_disciplines'), **columns,
+        facet_primary=Value(False, output_field=BooleanField()))
+    return [qs.annotate(facet_count=Count('pk')) for qs in (primary, other)]
+
+
+def get_cube():
+    """Return list of :class:`CubeRow` tuples of all displayable works,
+    calculated with one query."""
+    querysets = [qs for model in get_facet_models()
+                 for qs in get_cube_querysets(model)]
+    rows = querysets[0].union(*querysets[1:], all=True)
+    return [
+        CubeRow(row['facet_type'], row['facet_discipline'],
+                row['facet_year'], row['facet_status'],
+                bool(row['facet_primary']), row['facet_count'])
+        for row in rows]
+
+
+def get_cached_cube():
+    """Return :func:`get_cube` cached until the CV changes."""
+    return get_or_set(make_key('facets', 'cube'), get_cube)
+
+
+def row_matches(row, filters, exclude=None):
+    """Return whether ``row`` matches ``filters`` of facets other than
+    ``exclude``.
+
+    Rows of other disciplines count only when disciplines are filtered or
+    counted, so that other works are counted once.
+    """
+    if not row.primary and 'discipline' not in filters and \
+            exclude != 'discipline':
+        return False
+    return all(getattr(row, facet) == value
+               for facet, value in filters.items() if facet != exclude)
+
+
+def count_facets(cube, filters):
+    """Return dictionary of :class:`~collections.Counter` instances of the
+    number of works with each value of each facet, and the total number of
+    works matching ``filters``.
+
+    The counts of each facet apply the filters of the other facets, so
+    that they show how many works selecting each value would return.
+    """
+    counts = {facet: Counter() for facet in FACETS}
+    total = 0
+    for row in cube:
+        for facet in FACETS:
+            if row_matches(row, filters, exclude=facet):
+                counts[facet][getattr(row, facet)] += row.count
+        if row_matches(row, filters):
+            total += row.count
+    return counts, total
+
+
+def filter_works(model, filters):
+    """Return displayable instances of ``model`` that match ``filters``,
+    or ``None`` if no instance of ``model`` can match."""
+    if filters.get('type', model._meta.model_name) != model._meta.model_name:
+        return None
+    queryset = model.displayable.all()
+    if 'status' in filters:
+        condition = get_status_filters(model).get(filters['status'])
+        if condition is None:
+            return None
+        queryset = queryset.filter(condition)
+    if 'discipline' in filters:
+        queryset = queryset.filter(
+            Q(primary_discipline=filters['discipline']) |
+            Q(pk__in=model._base_manager.filter(
+                other_disciplines=filters['discipline']).values('pk')))
+    if 'year' in filters:
+        queryset = queryset.filter(year_filter(model, filters['year']))
+    return queryset
+
+
+def get_work_groups(filters, type_counts=None):
+    """Return list of ``(model_name, queryset)`` tuples of the works that
+    match ``filters``, grouped by type.
+
+    Types with no works in ``type_counts``, the counts of the ``type``
+    facet returned by :func:`count_facets`, are skipped without a query.
+    """
+    groups = list()
+    for model in get_facet_models():
+        name = model._meta.model_name
+        if type_counts is not None and not type_counts[name]:
+            continue
+        queryset = filter_works(model, filters)
+        if queryset is not None:
+            groups.append((name, queryset))
+    return groups
+
+
+def get_disciplines():
+    """Return dictionary of primary keys and disciplines."""
+    return get_or_set(make_key('facets', 'disciplines'),
+                      lambda: Discipline.objects.in_bulk())
@@ -0,0 +1,227 @@
+"""Format the text of CV entries.
+
+A formatter is a callable that returns the rich text of an entry (see
+:mod:`cv.document`) for a record of :mod:`cv.records` or a model
+instance. Python formatters of the models of the default CV are
+registered with :func:`register_formatter` and produce the same markup
+as the templates in ``cv/pdf/`` without rendering a template for each
+entry.
+
+Templates remain an option: a model whose ``cv/pdf/<model name>.xml``
+template is overridden by a project, or a section that names another
+``template``, is formatted with that template, which is compiled once.
+"""
+from django.template.defaultfilters import date as format_date
+from django.template.loader import get_template
+from django.utils.html import conditional_escape as e
+
+from functools import lru_cache
+import os
+
+
+FORMATTERS = dict()
+"""Registered Python formatters by model name."""
+
+
+def register_formatter(model_name):
+    """Decorator that registers a Python formatter of ``model_name``.
+
+    Registered formatters replace the default template of the model unless
+    the template is overridden.
+    """
+    def decorator(func):
+        FORMATTERS[model_name] = func
+        get_formatter.cache_clear()
+        return func
+    return decorator
+
+
+class TemplateFormatter:
+    """Formatter that renders ``template_name`` with the entry as the
+    variable named ``model_name``."""
+
+    def __init__(self, model_name, template_name):
+        self.model_name = model_name
+        self.template = get_template(template_name)
+
+    def render(self, context):
+        return self.template.render(context)
+
+    def __call__(self, entry):
+        return self.render({self.model_name: entry})
+
+
+def get_default_template_name(model_name):
+    return 'cv/pdf/{}.xml'.format(model_name)
+
+
+def is_package_template(template_name):
+    """Return ``True`` if ``template_name`` is found in the templates of
+    the ``cv`` app rather than overridden by the project."""
+    template_dir = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'templates')
+    origin = get_template(template_name).origin.name
+    return os.path.abspath(origin).startswith(template_dir + os.sep)
+
+
+@lru_cache(maxsize=None)
+def get_formatter(model_name, template_name=None):
+    """Return formatter of the entries of ``model_name`` written with
+    ``template_name`` (by default, ``cv/pdf/<model name>.xml``)."""
+    default = get_default_template_name(model_name)
+    template_name = template_name or default
+    if model_name in FORMATTERS and template_name == default and \
+            is_package_template(template_name):
+        return FORMATTERS[model_name]
+    return TemplateFormatter(model_name, template_name)
+
+
+def display(entry, field):
+    """Return label of the choice of ``field`` of ``entry``, which records
+    store as an attribute and model instances return from a method."""
+    label = getattr(entry, 'get_%s_display' % field)
+    return label() if callable(label) else label
+
+
+def pages(entry):
+    """Return page range of ``entry``."""
+    if not entry.start_page:
+        return ''
+    if entry.end_page:
+        return '%s-%s' % (e(entry.start_page), e(entry.end_page))
+    return e(entry.start_page)
+
+
+@register_formatter('article')
+def format_article(article):
+    """Return text of an article."""
+    text = '%s. &#8220;%s.&#8221;' % (e(article.authors), e(article.title))
+    if article.journal:
+        text += '<i>%s</i>' % e(article.journal)
+        if article.volume:
+            text += ' %s' % e(article.volume)
+            if article.issue:
+                text += '(%s)' % e(article.issue)
+            text += ': '
+    if article.start_page:
+        text += '%s.' % pages(article)
+    return text
+
+
+@register_formatter('award')
+def format_award(award):
+    """Return text of an award."""
+    return '<i>%s</i>, %s' % (e(award.name), e(award.organization))
+
+
+@register_formatter('book')
+def format_book(book):
+    """Return text of a book."""
+    return '<i>%s</i>. %s' % (e(book.title), e(book.publisher))
+
+
+@register_formatter('chapter')
+def format_chapter(chapter):
+    """Return text of a book chapter."""
+    text = '%s. &#8220;%s.&#8221; <i>%s</i>.' % (
+        e(chapter.authors), e(chapter.title), e(chapter.book_title))
+    if chapter.editors:
+        text += ' %s, ed%s.' % (
+            e(chapter.editors), 's' if chapter.editors_count > 1 else '')
+    if chapter.place:
+        text += ' %s:' % e(chapter.place)
+    if chapter.publisher:
+        text += '%s.' % e(chapter.publisher)
+    if chapter.start_page:
+        text += ' %s' % pages(chapter)
+    return text
+
+
+@register_formatter('course')
+def format_course(course):
+    """Return text of a course and its offerings."""
+    text = '<i>%s</i> (%s' % (
+        e(course.title), e(display(course, 'student_level')))
+    offerings = course.offerings.all()
+    if offerings.count() > 0:
+        text += '; ' + ', '.join(
+            '%s %s' % (e(display(offering, 'term')),
+                       format_date(offering.start_date, 'Y'))
+            for offering in offerings)
+    return text + ') '
+
+
+@register_formatter('degree')
+def format_degree(degree):
+    """Return text of a degree."""
+    text = e(degree.degree)
+    if degree.honors:
+        text += ' (%s)' % e(degree.honors)
+    if degree.major:
+        text += ', %s' % e(degree.major)
+    return text + ', %s, %s, %s' % (
+        e(degree.institution), e(degree.city), e(degree.state))
+
+
+@register_formatter('grant')
+def format_grant(grant):
+    """Return text of a grant."""
+    return e(grant.title)
+
+
+@register_formatter('otherwriting')
+def format_otherwriting(otherwriting):
+    """Return text of another writing."""
+    return e(otherwriting.title)
+
+
+@register_formatter('position')
+def format_position(position):
+    """Return text of a position."""
+    text = e(position.title)
+    if position.project:
+        text += ', %s' % e(position.project)
+    if position.department:
+        text += ', %s' % e(position.department)
+    return text + ', %s' % e(position.institution)
+
+
+@register_formatter('report')
+def format_report(report):
+    """Return text of a report."""
+    text = '%s. <i>%s</i>.' % (e(report.authors), e(report.title))
+    if report.institution:
+        text += ' %s' % e(report.institution)
+        if report.place:
+            text += ':%s' % e(report.place)
+        text += '.'
+    return text
+
+
+@register_formatter('student')
+def format_student(student):
+    """Return text of a student."""
+    text = e(student.first_name)
+    if getattr(student, 'middle_initial', None):
+        text += ' %s' % e(student.middle_initial)
+    text += ' %s (%s)' % (e(student.last_name), e(student.role))
+    if student.graduation_date:
+        text += 'Graduated %s' % format_date(student.graduation_date, 'M Y')
+    if student.current_position:
+        text += ', currently %s' % e(student.current_position)
+    return text
+
+
+@register_formatter('talk')
+def format_talk(talk):
+    """Return text of a talk and its presentations."""
+    presentations = list()
+    for presentation in talk.presentations.all():
+        text = '%s (%s)' % (
+            e(presentation.event),
+            format_date(presentation.presentation_date, 'M Y'))
+        if display(presentation, 'type') == 'Invited':
+            text += '<super rise=3>*</super>'
+        presentations.append(text)
+    return '&#8220;%s.&#8221;<br />%s' % (
+        e(talk.title), ', '.join(presentations))
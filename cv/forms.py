@@ -1,5 +1,6 @@
 from django.apps import apps
-from django.forms import inlineformset_factory
+from django.forms import inlineformset_factory, Select, SelectMultiple
+from django.urls import reverse
 
 from cv.models import Book, BookEdition, \
                       Chapter, ChapterEditorship, \
@@ -8,6 +9,80 @@ from cv.models import Book, BookEdition, \
                       Course, CourseOffering
 
 
+AUTOCOMPLETE_SEARCH_FIELDS = {
+    'collaborator': ['last_name', 'first_name'],
+    'journal': ['title', 'abbreviated_title'],
+    'grant': ['title'],
+}
+"""Fields searched by prefix for models offered by autocomplete. Each
+field has a :class:`~cv.models.base.PrefixSearchIndex`."""
+
+
+class AutocompleteMixin:
+    """Render only selected choices of a model choice field.
+
+    The remaining choices are searched with
+    :func:`cv.views.forms.autocomplete_view` by the script in
+    ``cv/cv-autocomplete.js`` so that pages do not include, and the
+    database does not read, every instance of the related model.
+    """
+
+    def __init__(self, model_name, attrs=None, choices=()):
+        self.model_name = model_name
+        super().__init__(attrs, choices)
+
+    class Media:
+        js = ('cv/cv-autocomplete.js',)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = reverse(
+            'cv:autocomplete', kwargs={'model_name': self.model_name})
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        """Return options for the empty choice and selected instances."""
+        selected = [v for v in value if v not in ('', None)]
+        options = list()
+        if not self.allow_multiple_selected:
+            options.append(self.create_option(
+                name, '', self.choices.field.empty_label or '',
+                not selected, 0, attrs=attrs))
+        if selected:
+            queryset = self.choices.queryset.filter(pk__in=selected)
+            for index, obj in enumerate(queryset, len(options)):
+                options.append(self.create_option(
+                    name, obj.pk, self.choices.field.label_from_instance(obj),
+                    True, index, attrs=attrs))
+        return [(None, options, 0)]
+
+
+class AutocompleteSelect(AutocompleteMixin, Select):
+    """Select widget for foreign keys searched with autocomplete."""
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, SelectMultiple):
+    """Select widget for many-to-many fields searched with autocomplete."""
+
+
+def autocomplete_widgets(model, fields):
+    """Return dictionary of autocomplete widgets for ``fields`` of ``model``
+    that relate to models listed in ``AUTOCOMPLETE_SEARCH_FIELDS``."""
+    widgets = dict()
+    for name in fields:
+        field = model._meta.get_field(name)
+        if not field.is_relation or field.related_model is None:
+            continue
+        related_name = field.related_model._meta.model_name
+        if related_name not in AUTOCOMPLETE_SEARCH_FIELDS:
+            continue
+        if field.many_to_many:
+            widgets[name] = AutocompleteSelectMultiple(related_name)
+        else:
+            widgets[name] = AutocompleteSelect(related_name)
+    return widgets
+
+
 def get_authorship_fields():
     """Return list of fields for student collaborations."""
     return ('collaborator', 'print_middle', 'display_order',
@@ -20,7 +95,10 @@ def authorship_formset_factory(model_name=None, **kwargs):
     try:
         authorship_model = apps.get_model('cv', '%sauthorship' % model_name)
         return inlineformset_factory(
-            model, authorship_model, fields=get_authorship_fields(), **kwargs)
+            model, authorship_model, fields=get_authorship_fields(),
+            widgets=autocomplete_widgets(
+                authorship_model, get_authorship_fields()),
+            **kwargs)
     except LookupError:
         return None
 
@@ -39,15 +117,18 @@ def editorship_formset_factory(**kwargs):
     return inlineformset_factory(
         Chapter, ChapterEditorship,
         fields=get_authorship_fields()[0:3],
+        widgets=autocomplete_widgets(
+            ChapterEditorship, get_authorship_fields()[0:3]),
         **kwargs
     )
 
 
 def grant_collaboration_formset_factory(**kwargs):
     """Create set of forms representing grang collaborations."""
+    fields = ['collaborator', 'role', 'is_pi', 'display_order']
     return inlineformset_factory(
-        Grant, GrantCollaboration,
-        fields=['collaborator', 'role', 'is_pi', 'display_order'],
+        Grant, GrantCollaboration, fields=fields,
+        widgets=autocomplete_widgets(GrantCollaboration, fields),
         **kwargs
     )
 
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cv.document import get_document
+from cv.profiles import get_profile
+from cv.renderers import RENDERERS, get_renderer
+from cv.windows import parse_window
+
+import os
+
+
+class Command(BaseCommand):
+    help = 'Writes the CV in one or more formats.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'formats', nargs='+',
+            help='Formats to write (available: %s).' % ', '.join(
+                sorted(RENDERERS)))
+        parser.add_argument(
+            '--profile', help='Name of the profile to write (default: the '
+                              'complete CV).')
+        parser.add_argument(
+            '--years', type=int,
+            help='Write the CV limited to the last number of years.')
+        parser.add_argument(
+            '--output-dir', default='.',
+            help='Directory of the files (default: current directory).')
+
+    def handle(self, *args, **options):
+        try:
+            renderers = [get_renderer(format)
+                         for format in options['formats']]
+            profile = get_profile(options['profile'])
+        except LookupError as e:
+            raise CommandError(str(e))
+        since = parse_window(options['years'] or profile.years)
+        # Every format is rendered from the same document
+        document = get_document(profile, since)
+        os.makedirs(options['output_dir'], exist_ok=True)
+        for renderer in renderers:
+            path = os.path.join(
+                options['output_dir'], renderer.get_filename(document))
+            with open(path, 'wb') as f:
+                for chunk in renderer.stream(document):
+                    f.write(chunk)
+            self.stdout.write('Wrote %s.' % path)
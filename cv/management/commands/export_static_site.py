@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cv.static_site import export
+
+import time
+
+
+class Command(BaseCommand):
+    help = 'Writes the pages of the CV as a static website.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output_dir', help='Directory of the website.')
+        parser.add_argument(
+            '--workers', type=int,
+            help='Number of processes that render pages (default: one for '
+                 'each CPU).')
+        parser.add_argument(
+            '--chunk-size', type=int, default=50,
+            help='Number of pages rendered by a process at a time '
+                 '(default: 50).')
+
+    def handle(self, *args, **options):
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError('--workers must be at least 1.')
+        start = time.perf_counter()
+        paths = export(options['output_dir'], options['workers'],
+                       options['chunk_size'])
+        self.stdout.write('Wrote %s pages in %.1f seconds.' % (
+            len(paths), time.perf_counter() - start))
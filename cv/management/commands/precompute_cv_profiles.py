@@ -0,0 +1,47 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import reverse
+
+from cv.cache import entry_cache
+from cv.profiles import get_profiles
+from cv.views import CVView
+from cv.views.pdf import get_cv_pdf
+from cv.windows import parse_window
+
+
+class Command(BaseCommand):
+    help = 'Caches the HTML and PDF versions of CV profiles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'profiles', nargs='*',
+            help='Names of the profiles to cache (default: all profiles).')
+        parser.add_argument(
+            '--years', type=int,
+            help='Cache the profiles limited to the last number of years.')
+
+    def handle(self, *args, **options):
+        profiles = get_profiles()
+        names = options['profiles'] or sorted(profiles)
+        unknown = [name for name in names if name not in profiles]
+        if unknown:
+            raise CommandError('Unknown profiles: %s' % ', '.join(unknown))
+        years = options['years']
+        for name in names:
+            profile = profiles[name]
+            get_cv_pdf(profile, parse_window(years or profile.years))
+            params = {'profile': name}
+            if years:
+                params['years'] = years
+            request = RequestFactory().get(reverse('cv:cv_list'), params)
+            request.user = AnonymousUser()
+            response = CVView.as_view()(request)
+            if hasattr(response, 'render'):
+                response.render()
+            self.stdout.write('Cached %s.' % profile.title)
+        stats = entry_cache.get_stats()
+        self.stdout.write(
+            'PDF entries: %(hits)s cached, %(misses)s formatted '
+            '(%(hit_rate).0f%% hit rate).' % dict(
+                stats, hit_rate=stats['hit_rate'] * 100))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cv.search import get_search_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index of CV works.'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        if backend is None:
+            raise CommandError(
+                'Search requires a SQLite or PostgreSQL database.')
+        backend.install()
+        count = rebuild_index()
+        self.stdout.write('Indexed %s works.' % count)
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from cv.builds import is_enabled, queue_profiles, run_builds
+from cv.models import PDFBuild
+
+import datetime
+import time
+
+
+class Command(BaseCommand):
+    help = 'Runs queued builds of the PDFs of CV profiles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Run the pending builds and exit instead of waiting for '
+                 'new builds.')
+        parser.add_argument(
+            '--enqueue', action='store_true',
+            help='Queue a build of each profile before running builds.')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait between checks for new builds '
+                 '(default: 5).')
+        parser.add_argument(
+            '--timeout', type=int, default=3600,
+            help='Seconds after which running builds are considered '
+                 'stalled and queued again (default: 3600).')
+
+    def handle(self, *args, **options):
+        if not is_enabled():
+            raise CommandError(
+                'PDFs are built in the background only if CV_PDF_QUEUE is '
+                'True.')
+        if options['enqueue']:
+            queue_profiles()
+        while True:
+            PDFBuild.objects.requeue_stalled(
+                timezone.now() -
+                datetime.timedelta(seconds=options['timeout']))
+            for build in run_builds():
+                if build.status == PDFBuild.DONE:
+                    self.stdout.write('Built %s at revision %s.' % (
+                        build.profile, build.revision))
+                else:
+                    self.stderr.write('Failed to build %s:\n%s' % (
+                        build.profile, build.error))
+            if options['once']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -15,3 +15,9 @@ from .works import Grant, GrantCollaboration, \
     Talk, Presentation, \
     Dataset, DatasetAuthorship, \
     OtherWriting
+
+from .revision import CVRevision
+
+from .search import SearchEntry
+
+from .builds import PDFBuild
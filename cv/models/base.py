@@ -3,6 +3,7 @@ from markdown import markdown
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.db import models
 from django.db.models import Max
+from django.db.models.functions import Upper
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.urls import reverse
@@ -14,16 +15,44 @@ from cv.settings import PUBLICATION_STATUS_CHOICES, \
     SERVICE_TYPES_CHOICES, SERVICE_TYPES, \
     FILE_TYPES_CHOICES, \
     TERMS_CHOICES, \
-    INPREP_RANGE, INREVISION_RANGE, PUBLISHED_RANGE
+    INREVISION_RANGE, PUBLISHED_RANGE
 from cv.utils import CSLCitation, check_isbn
 
 from .files import CVFile
 from .managers import (
-    DisplayManager, PublicationManager, ServiceManager,
-    PrimaryPositionManager
+    CVManager, DisplayManager, PublicationManager, ServiceManager,
+    PrimaryPositionManager, PublicationQuerySet, CollaborationManager
 )
 
 
+class PrefixSearchIndex(models.Index):
+    """Index of the upper-case value of ``field`` for case-insensitive
+    prefix searches, i.e., ``UPPER(field) LIKE 'PREFIX%'``.
+
+    On PostgreSQL the index uses the ``text_pattern_ops`` operator class,
+    without which ``LIKE`` can only use the index in the ``C`` locale. The
+    index cannot order rows by the column, so columns used for ordering
+    keep their plain index as well.
+    """
+
+    def __init__(self, field, name):
+        self.field_name = field
+        super().__init__(Upper(field), name=name)
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor == 'postgresql':
+            from django.contrib.postgres.indexes import OpClass
+            index = models.Index(
+                OpClass(Upper(self.field_name), name='text_pattern_ops'),
+                name=self.name)
+            return index.create_sql(model, schema_editor, using, **kwargs)
+        return super().create_sql(model, schema_editor, using, **kwargs)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        return path, (), {'field': self.field_name, 'name': self.name}
+
+
 class DisplayableModel(models.Model):  
     """Abstract class including fields shared by all CV models.
     
@@ -40,6 +69,15 @@ class DisplayableModel(models.Model):
     
     files : :class:`GenericRelation` to :class:`cv.models.CVFile`
         Relates files to model. 
+
+    created : datetime
+        Time at which the instance was created (indexed).
+
+    modified : datetime
+        Time at which the instance, or items that depend on it such as
+        authorships and files, was last changed (indexed). Use the
+        ``changed_since`` method of :class:`cv.models.managers.CVQuerySet`
+        to find instances changed since a point in time.
     
     .. note:: 
       due to rules that Django uses to load managers, it will be defined as the 
@@ -49,6 +87,8 @@ class DisplayableModel(models.Model):
     display = models.BooleanField(default=True)
     extra = models.TextField(blank=True)
     files = GenericRelation(CVFile)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
 
     displayable = DisplayManager()
 
@@ -68,17 +108,27 @@ class Collaborator(models.Model):
     defined in the :setting:`CV_KEY_CONTRIBUTORS_LIST` setting. 
     """
     
-    first_name = models.CharField('First (given) name', max_length=100)
-    last_name = models.CharField('Last (family) name', max_length=100)
+    first_name = models.CharField(
+        'First (given) name', max_length=100, db_index=True)
+    last_name = models.CharField(
+        'Last (family) name', max_length=100, db_index=True)
     email = models.EmailField(unique=True)
     middle_initial = models.CharField(max_length=100, blank=True)
     suffix = models.CharField(max_length=100,blank=True)
     institution = models.CharField(max_length=150, blank=True)
     website = models.URLField(blank=True)
     alternate_email = models.EmailField(blank=True)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CVManager()
     
     class Meta:
         ordering = ['last_name']
+        indexes = [
+            PrefixSearchIndex('last_name', 'cv_collab_last_upper_idx'),
+            PrefixSearchIndex('first_name', 'cv_collab_first_upper_idx'),
+        ]
     
     def __str__(self):
         """String representation of collaborator.
@@ -116,6 +166,8 @@ class CollaborationModel(models.Model):
     display_order = models.IntegerField(
         help_text='Order that collaborators should be listed')
 
+    objects = CollaborationManager()
+
     class Meta:
         abstract = True
 
@@ -146,6 +198,7 @@ class Discipline(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [PrefixSearchIndex('name', 'cv_discipline_name_up')]
 
     def __str__(self):
         """Return string representation of :class:`Discipline`.
@@ -163,7 +216,7 @@ class Discipline(models.Model):
 class VitaeModel(DisplayableModel):
     """Create reusable model containing basic titling and discipline fields."""
 
-    title = models.CharField(max_length=200,
+    title = models.CharField(max_length=200, db_index=True,
         validators=[RegexValidator(r'\S+')])
     short_title = models.CharField(max_length=80)
     slug = models.SlugField(
@@ -213,6 +266,15 @@ class VitaePublicationModel(VitaeModel):
     class Meta:
         abstract = True
         ordering = ['status', '-pub_date', '-submission_date']
+        indexes = [
+            models.Index(fields=['display', 'status', 'pub_date'],
+                         name='%(app_label)s_%(class)s_status_pub_idx'),
+            models.Index(fields=['display', 'status', 'submission_date'],
+                         name='%(app_label)s_%(class)s_status_sub_idx'),
+            PrefixSearchIndex('title', '%(app_label)s_%(class)s_title_up'),
+            PrefixSearchIndex('short_title',
+                              '%(app_label)s_%(class)s_short_up'),
+        ]
 
     def __str__(self):
         return '%s' % self.short_title
@@ -281,17 +343,9 @@ class VitaePublicationModel(VitaeModel):
         return self.files.filter(is_primary__exact=True)
 
     def set_status_fields(self):
-        for status in ['is_published', 'is_inrevision', 'is_inprep']:
-            setattr(self, status, False)
-        if (self.status and
-           PUBLISHED_RANGE.min <= self.status < PUBLISHED_RANGE.max):
-                self.is_published = True
-        if (self.status and
-           INREVISION_RANGE.min <= self.status < INREVISION_RANGE.max):
-                self.is_inrevision = True
-        if (self.status is not None and
-           INPREP_RANGE.min <= self.status < INPREP_RANGE.max):
-                self.is_inprep = True
+        status_fields = PublicationQuerySet.get_status_fields(self.status)
+        for field, value in status_fields.items():
+            setattr(self, field, value)
 
     def cite(self):
         """Return citation based on format defined in CV_CSL_STYLE setting."""
@@ -313,10 +367,11 @@ class Journal(models.Model):
     .. _International Standard Serial Number: http://www.issn.org/understanding-the-issn/what-is-an-issn/
     """
     
-    title = models.CharField(max_length=200)
+    title = models.CharField(max_length=200, db_index=True)
     abbreviated_title = models.CharField(
         max_length=100,
         blank=True,
+        db_index=True,
         help_text='Abbreviated journal title; use style you wish to display in views')
     issn = models.CharField(
         'ISSN',
@@ -335,6 +390,11 @@ class Journal(models.Model):
 
     class Meta:
         ordering = ['title']
+        indexes = [
+            PrefixSearchIndex('title', 'cv_journal_title_upper_idx'),
+            PrefixSearchIndex('abbreviated_title',
+                              'cv_journal_abbr_upper_idx'),
+        ]
 
     def __str__(self):
         """Return string representation of :class:`Journal`"""
@@ -350,7 +410,7 @@ class Award(DisplayableModel):
     
     name = models.CharField(max_length=200)
     organization = models.CharField('Granting institution or organization',max_length=200)
-    date = models.DateField()
+    date = models.DateField(db_index=True)
     description = models.TextField(blank=True)
     # book = models.ForeignKey(Book,null=True,blank=True,on_delete=models.PROTECT)
     # article = models.ForeignKey(Article,null=True,blank=True,on_delete=models.PROTECT)
@@ -365,7 +425,7 @@ class Award(DisplayableModel):
     def get_absolute_url(self):
         return '%s#award-%s' % (reverse('cv:cv_list'),self.pk)
     
-    objects = models.Manager()
+    objects = CVManager()
 
 ## Degrees
 class Degree(DisplayableModel):
@@ -399,7 +459,7 @@ class Degree(DisplayableModel):
     def get_absolute_url(self):
         return '%s#degree-%s' % (reverse('cv:cv_list'),self.pk)
 
-    objects = models.Manager()
+    objects = CVManager()
 
 class Position(DisplayableModel):
 
@@ -448,7 +508,7 @@ class Position(DisplayableModel):
     def __str__(self):
         return '%s' % (self.title)
     
-    objects = models.Manager()
+    objects = CVManager()
     primarypositions = PrimaryPositionManager()
 
         
@@ -461,7 +521,7 @@ class MediaMention(DisplayableModel):
     section = models.CharField(max_length=200,
                 help_text='Section of publication or program', null=True, blank=True)
     title = models.CharField(max_length=200,null=True,blank=True)
-    date = models.DateField()
+    date = models.DateField(db_index=True)
     url = models.URLField(blank=True, null=True)
     author = models.CharField(max_length=200, blank=True, null=True,
                             help_text='E.g., author of written piece or interviewer on visual medium')
@@ -478,7 +538,7 @@ class MediaMention(DisplayableModel):
     def __str__(self):
         return '%s (%s)' % (self.outlet, self.date.strftime('%b %d, %Y'))
     
-    objects = models.Manager()
+    objects = CVManager()
 
 ## SERVICE
 ## Managers of different levels of service
@@ -540,7 +600,7 @@ class Service(DisplayableModel):
         if not any(check):
             raise ValidationError(_('Must select at least one date field.'))
     
-    objects = models.Manager()
+    objects = CVManager()
     displayable = ServiceManager()
     # department_services = DepartmentServiceManager()
     # university_services = UniversityServiceManager()
@@ -560,7 +620,7 @@ class JournalService(DisplayableModel):
     def __str__(self):
         return '%s' % self.journal.title
     
-    objects = models.Manager()
+    objects = CVManager()
     
 ## Students
 class Student(DisplayableModel):
@@ -582,11 +642,15 @@ class Student(DisplayableModel):
     
     class Meta: 
         ordering = ['student_level','graduation_date']
+        indexes = [
+            PrefixSearchIndex('last_name', 'cv_student_last_up'),
+            PrefixSearchIndex('first_name', 'cv_student_first_up'),
+        ]
     
     def __str__(self):
         return '%s, %s' % (self.last_name, self.first_name)
     
-    objects = models.Manager()
+    objects = CVManager()
     
 
 class Course(DisplayableModel):
@@ -627,7 +691,7 @@ class Course(DisplayableModel):
     #     #     last_offering=Max('end_date'))['last_offering']
         super(Course, self).save(force_insert, force_update)
 
-    objects = models.Manager()
+    objects = CVManager()
 
 
 class CourseOffering(models.Model):
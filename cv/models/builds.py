@@ -0,0 +1,58 @@
+"""Defines the queue of PDF builds of Django-CV profiles."""
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+from .managers import PDFBuildManager
+
+
+class PDFBuild(models.Model):
+    """Store a build of the PDF of a CV profile.
+
+    Builds are queued when CV data changes and run by the
+    ``run_pdf_builds`` management command (see :mod:`cv.builds`). Views
+    serve the PDF of the newest completed build of each profile.
+
+    profile : string
+        Name of the profile (see :mod:`cv.profiles`).
+
+    status : integer
+        Whether the build is pending, running, done, or failed.
+
+    revision : integer
+        The CV revision when the build started.
+
+    content : bytes
+        The PDF, once the build is done.
+
+    error : string
+        The traceback of a failed build.
+    """
+    PENDING = 10
+    RUNNING = 20
+    DONE = 30
+    FAILED = 40
+    STATUS_CHOICES = (
+        (PENDING, _('Pending')),
+        (RUNNING, _('Running')),
+        (DONE, _('Done')),
+        (FAILED, _('Failed')),
+    )
+
+    profile = models.CharField(max_length=100, db_index=True)
+    status = models.IntegerField(
+        choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    revision = models.PositiveIntegerField(null=True, blank=True)
+    content = models.BinaryField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    objects = PDFBuildManager()
+
+    class Meta:
+        verbose_name = _('PDF build')
+        ordering = ['created']
+
+    def __str__(self):
+        return '%s (%s)' % (self.profile, self.get_status_display())
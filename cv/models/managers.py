@@ -1,8 +1,162 @@
-from django.db import models
-from cv.settings import SERVICE_TYPES
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
+from cv.settings import SERVICE_TYPES, \
+    INPREP_RANGE, INREVISION_RANGE, PUBLISHED_RANGE
 
 
-class DisplayManager(models.Manager):
+STATUS_FIELD_RANGES = (
+    ('is_published', PUBLISHED_RANGE),
+    ('is_inrevision', INREVISION_RANGE),
+    ('is_inprep', INPREP_RANGE),
+)
+"""Boolean status fields of publications and the ``status`` range each
+represents."""
+
+
+class CVQuerySet(models.QuerySet):
+    """QuerySet with methods shared by CV models."""
+
+    def changed_since(self, timestamp):
+        """Return instances created or modified at or after ``timestamp``.
+
+        Saving or deleting authorships, editorships, grant collaborations,
+        files, editions, presentations, and course offerings updates the
+        ``modified`` field of the related instance (see :mod:`cv.signals`),
+        so those changes are included. Instances related to a collaborator
+        that changed since ``timestamp`` are included as well.
+        """
+        query = models.Q(modified__gte=timestamp)
+        collaborator_fields = [
+            f.name for f in self.model._meta.many_to_many
+            if f.related_model._meta.label_lower == 'cv.collaborator']
+        for name in collaborator_fields:
+            query |= models.Q(**{'%s__modified__gte' % name: timestamp})
+        queryset = self.filter(query)
+        if collaborator_fields:
+            queryset = queryset.distinct()
+        return queryset
+
+
+class CVManager(models.Manager.from_queryset(CVQuerySet)):
+    """Returns all objects from models as :class:`CVQuerySet` instances."""
+
+
+class PublicationQuerySet(CVQuerySet):
+    """QuerySet for publications.
+
+    The ``published``, ``revise``, and ``inprep`` methods filter on ranges
+    of ``status`` so that they are correct however ``status`` was set.
+    The queryset also keeps the ``is_published``, ``is_inrevision``, and
+    ``is_inprep`` fields consistent with ``status`` when it is updated.
+    """
+
+    @staticmethod
+    def get_status_fields(status):
+        """Return dictionary of boolean status fields for ``status``."""
+        return {
+            field: status is not None and rng.min <= status < rng.max
+            for field, rng in STATUS_FIELD_RANGES
+        }
+
+    def update(self, **kwargs):
+        """Update publications, setting the boolean status fields when
+        ``status`` is updated."""
+        if 'status' not in kwargs:
+            return super(PublicationQuerySet, self).update(**kwargs)
+        status = kwargs['status']
+        if isinstance(status, int):
+            kwargs.update(self.get_status_fields(status))
+            return super(PublicationQuerySet, self).update(**kwargs)
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            rows = super(PublicationQuerySet, self).update(**kwargs)
+            PublicationQuerySet(self.model, using=self.db).filter(
+                pk__in=pks).set_status_fields()
+        return rows
+
+    @staticmethod
+    def status_filter(status_range):
+        """Return condition for publications with ``status`` in
+        ``status_range``, a :class:`~cv.settings.MinMax` of the lowest
+        status included and the lowest status excluded."""
+        return models.Q(
+            status__gte=status_range.min, status__lt=status_range.max)
+
+    def with_status(self, status_range):
+        """Return publications with ``status`` in ``status_range``."""
+        return self.filter(self.status_filter(status_range))
+
+    def published(self):
+        """Return publications accepted for publication or published,
+        most recent first."""
+        return self.with_status(PUBLISHED_RANGE).order_by('-pub_date')
+
+    def revise(self):
+        """Return publications in the revision process, most recently
+        submitted first."""
+        return self.with_status(INREVISION_RANGE).order_by(
+            '-submission_date')
+
+    def inprep(self):
+        """Return publications being prepared for submission."""
+        return self.with_status(INPREP_RANGE)
+
+    def set_status_fields(self):
+        """Recompute the boolean status fields of every publication in the
+        queryset from ``status`` with a single query."""
+        return super(PublicationQuerySet, self).update(**{
+            field: models.Case(
+                models.When(
+                    status__gte=rng.min, status__lt=rng.max,
+                    then=models.Value(True)),
+                default=models.Value(False),
+                output_field=models.BooleanField())
+            for field, rng in STATUS_FIELD_RANGES
+        })
+
+
+class CVPublicationManager(models.Manager.from_queryset(PublicationQuerySet)):
+    """Returns all publications as :class:`PublicationQuerySet` instances."""
+
+
+class CollaborationQuerySet(CVQuerySet):
+    """QuerySet for authorships, editorships, and other collaborations."""
+
+    def reorder(self, pks):
+        """Set ``display_order`` of the collaborations in the queryset to the
+        position of their primary keys in ``pks``, starting from 1.
+
+        ``pks`` must contain every collaboration in the queryset (usually
+        all collaborations of one work). Rows are first moved to negative
+        positions so that swapping orders does not violate uniqueness of
+        ``display_order``. Returns the list of reordered collaborations.
+        """
+        with transaction.atomic(using=self.db):
+            collaborations = self.in_bulk()
+            try:
+                pks = [int(pk) for pk in pks]
+            except (TypeError, ValueError):
+                raise ValidationError('Order must be a list of ids.')
+            if len(pks) != len(collaborations) or \
+                    set(pks) != set(collaborations):
+                raise ValidationError(
+                    'Order must include each of %s exactly once.' %
+                    sorted(collaborations))
+            objs = [collaborations[pk] for pk in pks]
+            for sign in (-1, 1):
+                for position, obj in enumerate(objs, 1):
+                    obj.display_order = sign * position
+                self.model._base_manager.using(self.db).bulk_update(
+                    objs, ['display_order'])
+        return objs
+
+
+class CollaborationManager(models.Manager.from_queryset(CollaborationQuerySet)):
+    """Returns collaborations as :class:`CollaborationQuerySet` instances."""
+
+
+class DisplayManager(CVManager):
     """Returns displayable objects from models."""
 
     def get_queryset(self):
@@ -10,8 +164,25 @@ class DisplayManager(models.Manager):
         ``display`` has been set to ``True``."""
         return super(DisplayManager, self).get_queryset().filter(display=True)
 
+    def management_filters(self):
+        """Return dictionary of the conditions that select the objects
+        returned by each method in ``management_lists``."""
+        return dict()
+
+    def count_management_lists(self, condition=None):
+        """Return dictionary of the number of displayable objects returned
+        by each method in ``management_lists``, counted in one query.
 
-class PublicationManager(DisplayManager):
+        Only objects that meet ``condition`` are counted if it is given.
+        """
+        queryset = self.filter(condition) if condition else self.all()
+        return queryset.aggregate(**{
+            name: models.Count('pk', filter=condition)
+            for name, condition in self.management_filters().items()
+        })
+
+
+class PublicationManager(DisplayManager.from_queryset(PublicationQuerySet)):
     """Class to manage publications.
 
     This class subclasses ``DisplayManager`` and includes the default
@@ -22,27 +193,27 @@ class PublicationManager(DisplayManager):
 
     management_lists = ['published', 'revise', 'inprep']
 
+    def management_filters(self):
+        status_filter = PublicationQuerySet.status_filter
+        return {
+            'published': status_filter(PUBLISHED_RANGE),
+            'revise': status_filter(INREVISION_RANGE),
+            'inprep': status_filter(INPREP_RANGE),
+        }
+
     def published(self):
         """Return queryset of articles accepted for publication
         or published.
         """
-        return self.filter(
-            is_published__exact=True).filter(
-            display__exact=True).order_by(
-            '-pub_date')
+        return self.get_queryset().published()
 
     def revise(self):
         """Return queryset of articles in revision process."""
-        return self.filter(
-            is_inrevision__exact=True).filter(
-            display__exact=True).order_by(
-            '-submission_date')
+        return self.get_queryset().revise()
 
     def inprep(self):
         """Return queryset of articles being prepared for submission."""
-        return self.filter(
-            is_inprep__exact=True).filter(
-            display__exact=True)
+        return self.get_queryset().inprep()
 
 
 class GrantManager(DisplayManager):
@@ -57,11 +228,17 @@ class GrantManager(DisplayManager):
     management_lists = ['internal_grants',
                         'external_grants']
 
+    def management_filters(self):
+        return {
+            'internal_grants': models.Q(source=10),
+            'external_grants': models.Q(source=40),
+        }
+
     def internal_grants(self):
-        return self.filter(source=10).filter(display=True)
+        return self.filter(self.management_filters()['internal_grants'])
 
     def external_grants(self):
-        return self.filter(source=40).filter(display=True)
+        return self.filter(self.management_filters()['external_grants'])
 
 
 class ServiceManager(DisplayManager):
@@ -77,20 +254,26 @@ class ServiceManager(DisplayManager):
                         'university_services',
                         'discipline_services']
 
-    def department_services(self):
-        return self.filter(
-            type__in=[
+    def management_filters(self):
+        return {
+            'department_services': models.Q(type__in=[
                 SERVICE_TYPES['DEPARTMENT_SERVICE'],
                 SERVICE_TYPES['SCHOOL_SERVICE']
-            ]).filter(display=True)
+            ]),
+            'university_services': models.Q(
+                type=SERVICE_TYPES['UNIVERSITY_SERVICE']),
+            'discipline_services': models.Q(
+                type=SERVICE_TYPES['DISCIPLINE_SERVICE']),
+        }
+
+    def department_services(self):
+        return self.filter(self.management_filters()['department_services'])
 
     def university_services(self):
-        return self.filter(
-            type=SERVICE_TYPES['UNIVERSITY_SERVICE']).filter(display=True)
+        return self.filter(self.management_filters()['university_services'])
 
     def discipline_services(self):
-        return self.filter(
-            type=SERVICE_TYPES['DISCIPLINE_SERVICE']).filter(display=True)
+        return self.filter(self.management_filters()['discipline_services'])
 
 
 class PrimaryPositionManager(models.Manager):
@@ -104,3 +287,96 @@ class PrimaryPositionManager(models.Manager):
         return super(PrimaryPositionManager, self).get_queryset().filter(
             primary_position=True)
 
+
+
+class CVRevisionManager(models.Manager):
+    """Manages the single revision counter of CV data.
+
+    The revision is incremented with ``bump`` every time an instance of a
+    model in ``cv`` is saved or deleted (see :mod:`cv.signals`).
+    """
+
+    def current(self):
+        """Return the revision instance, creating it if necessary."""
+        return self.get_or_create(pk=1)[0]
+
+    def bump(self):
+        """Increment the revision and record the time of the change."""
+        updated = self.filter(pk=1).update(
+            revision=models.F('revision') + 1, modified=timezone.now())
+        if not updated:
+            revision, created = self.get_or_create(pk=1)
+            if not created:
+                return self.bump()
+
+
+class PDFBuildQuerySet(models.QuerySet):
+    """QuerySet for the queue of PDF builds (see :mod:`cv.builds`)."""
+
+    def lock_queue(self):
+        """Lock the row of the CV revision until the end of the current
+        transaction. Changes to the queue that depend on pending builds
+        hold this lock, so that concurrent transactions do not queue the
+        same build twice."""
+        revision = self.model._meta.apps.get_model('cv', 'CVRevision')
+        revision._default_manager.db_manager(self.db).select_for_update(
+        ).get_or_create(pk=1)
+
+    def enqueue(self, profiles):
+        """Queue a build of each of ``profiles`` that does not already have
+        a pending build."""
+        with transaction.atomic(using=self.db):
+            self.lock_queue()
+            pending = set(self.filter(
+                status=self.model.PENDING, profile__in=profiles
+            ).values_list('profile', flat=True))
+            self.bulk_create([
+                self.model(profile=profile)
+                for profile in profiles if profile not in pending])
+
+    def claim(self):
+        """Mark the oldest pending build as running and return it, or return
+        ``None`` if no build is pending.
+
+        A build is claimed with a conditional update, so that concurrent
+        workers never run the same build.
+        """
+        pending = self.filter(status=self.model.PENDING).order_by('created')
+        for pk in pending.values_list('pk', flat=True)[:10]:
+            claimed = self.filter(pk=pk, status=self.model.PENDING).update(
+                status=self.model.RUNNING, started=timezone.now())
+            if claimed:
+                return self.get(pk=pk)
+        return None
+
+    def requeue_stalled(self, started_before):
+        """Return builds that started running before ``started_before``,
+        e.g., because their worker stopped, to the queue and return their
+        number. Only the oldest stalled build of each profile without a
+        pending build is queued again; the others are deleted."""
+        with transaction.atomic(using=self.db):
+            self.lock_queue()
+            stalled = self.filter(
+                status=self.model.RUNNING, started__lt=started_before)
+            pending = self.filter(status=self.model.PENDING).values('profile')
+            oldest = list(stalled.order_by().values('profile').annotate(
+                oldest=models.Min('pk')).values_list('oldest', flat=True))
+            stalled.filter(
+                models.Q(profile__in=pending) | ~models.Q(pk__in=oldest)
+            ).delete()
+            return stalled.update(status=self.model.PENDING, started=None)
+
+    def newest(self, profile):
+        """Return newest completed build of ``profile`` or ``None``."""
+        return self.filter(profile=profile, status=self.model.DONE).order_by(
+            '-revision', '-finished').first()
+
+    def is_pending(self, profile):
+        """Return ``True`` if a build of ``profile`` is pending or
+        running."""
+        return self.filter(profile=profile, status__in=(
+            self.model.PENDING, self.model.RUNNING)).exists()
+
+
+class PDFBuildManager(models.Manager.from_queryset(PDFBuildQuerySet)):
+    """Returns PDF builds as :class:`PDFBuildQuerySet` instances."""
@@ -9,7 +9,9 @@ from cv.utils import check_isbn
 from markdown import markdown
 
 from .base import DisplayableModel, VitaePublicationModel, Journal, \
-    Collaborator, CollaborationModel, StudentCollaborationModel
+    Collaborator, CollaborationModel, StudentCollaborationModel, \
+    PrefixSearchIndex
+from .managers import CVManager, CVPublicationManager
 from .works import Grant, Talk
 
 
@@ -57,7 +59,7 @@ class Article(VitaePublicationModel):
     #     as "primary files" associated with article."""
     #     return self.files.filter(is_primary__exact=True)
 
-    objects = models.Manager()
+    objects = CVPublicationManager()
 
 
 class ArticleAuthorship(CollaborationModel, StudentCollaborationModel):
@@ -103,7 +105,7 @@ class Book(VitaePublicationModel):
         """Return queryset of all editions associated with book."""
         return self.editions.all().order_by('-pub_date')
 
-    objects = models.Manager()
+    objects = CVPublicationManager()
 
 
 class BookAuthorship(CollaborationModel, StudentCollaborationModel):
@@ -142,7 +144,7 @@ class BookEdition(DisplayableModel):
     def __str__(self):
         return '%s ed. of %s' % (self.edition, str(self.book))
 
-    objects = models.Manager()
+    objects = CVManager()
 
 
 class Chapter(VitaePublicationModel):
@@ -173,7 +175,12 @@ class Chapter(VitaePublicationModel):
 
     abstract_html = models.TextField(blank=True, editable=False)
 
-    objects = models.Manager()
+    objects = CVPublicationManager()
+
+    class Meta(VitaePublicationModel.Meta):
+        indexes = VitaePublicationModel.Meta.indexes + [
+            PrefixSearchIndex('book_title', 'cv_chapter_book_title_up'),
+        ]
 
 
 class ChapterAuthorship(CollaborationModel, StudentCollaborationModel):
@@ -220,7 +227,7 @@ class Report(VitaePublicationModel):
     # def get_primary_files(self):
     #     return self.files.filter(is_primary__exact=True)
 
-    objects = models.Manager()
+    objects = CVPublicationManager()
 
 
 class ReportAuthorship(CollaborationModel, StudentCollaborationModel):
@@ -0,0 +1,32 @@
+"""Defines the revision counter of Django-CV data."""
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from .managers import CVRevisionManager
+
+
+class CVRevision(models.Model):
+    """Store the revision of the CV data as a whole.
+
+    A single instance records how many times CV data has changed and when
+    it last changed. Views use the revision to answer conditional requests
+    without querying the sections of the CV.
+
+    revision : integer
+        Incremented every time an instance of a ``cv`` model is saved or
+        deleted.
+
+    modified : datetime
+        Time of the most recent change.
+    """
+    revision = models.PositiveIntegerField(default=0)
+    modified = models.DateTimeField(default=timezone.now)
+
+    objects = CVRevisionManager()
+
+    class Meta:
+        verbose_name = _('CV revision')
+
+    def __str__(self):
+        return '%s (%s)' % (self.revision, self.modified)
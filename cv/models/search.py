@@ -0,0 +1,41 @@
+"""Defines the full-text search index of Django-CV works."""
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+
+class SearchEntry(models.Model):
+    """Store the searchable text of a displayable CV work.
+
+    Entries are maintained by :mod:`cv.search` and should not be edited
+    directly. The full-text index of the database (an FTS5 table on SQLite
+    or a ``tsvector`` column with a GIN index on PostgreSQL) is created
+    alongside the table.
+
+    model_name : string
+        Name of the model of the work (e.g., ``article``).
+
+    object_id : integer
+        Primary key of the work.
+
+    title : string
+        Title of the work, ranked above other text.
+
+    body : string
+        Abstracts, venues, and names of authors of the work.
+
+    url : string
+        URL of the page of the work, if it has one.
+    """
+    model_name = models.CharField(max_length=100)
+    object_id = models.PositiveIntegerField()
+    title = models.TextField()
+    body = models.TextField(blank=True)
+    url = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        verbose_name = _('search entry')
+        verbose_name_plural = _('search entries')
+        unique_together = ('model_name', 'object_id')
+
+    def __str__(self):
+        return '%s %s: %s' % (self.model_name, self.object_id, self.title)
@@ -4,8 +4,8 @@ from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
 
 from .base import (VitaeModel, Collaborator, CollaborationModel,
-                   StudentCollaborationModel)
-from .managers import GrantManager
+                   StudentCollaborationModel, PrefixSearchIndex)
+from .managers import CVManager, GrantManager
 
 from markdown import markdown
 
@@ -53,7 +53,7 @@ class Grant(VitaeModel):
     grant_number = models.CharField(
         _('Grant number'), max_length=50, blank=True)
     amount = models.IntegerField(_('Amount'))
-    start_date = models.DateField(_('Start date'))
+    start_date = models.DateField(_('Start date'), db_index=True)
     end_date = models.DateField(
         _('End date'), null=True, blank=True)
     role = models.CharField(
@@ -77,11 +77,15 @@ class Grant(VitaeModel):
 
     class Meta:
         ordering = ['-is_current', '-start_date', '-end_date']
+        indexes = [
+            PrefixSearchIndex('title', 'cv_grant_title_upper_idx'),
+            PrefixSearchIndex('short_title', 'cv_grant_short_up'),
+        ]
 
     def __str__(self):
         return self.title
 
-    objects = models.Manager()
+    objects = CVManager()
     displayable = GrantManager()
     # internal_grants = InternalGrantManager()
     # external_grants = ExternalGrantManager()
@@ -116,11 +120,13 @@ class Talk(VitaeModel):
     abstract_html = models.TextField(editable=False, blank=True)
     latest_presentation_date = models.DateField(
         editable=False, blank=True, null=True)
-    created = models.DateField(auto_now_add=True, blank=True)
-    modified = models.DateField(auto_now=True, blank=True)
 
     class Meta:
         ordering = ['-latest_presentation_date']
+        indexes = [
+            PrefixSearchIndex('title', 'cv_talk_title_up'),
+            PrefixSearchIndex('short_title', 'cv_talk_short_up'),
+        ]
 
     def __str__(self):
         return self.short_title
@@ -136,7 +142,7 @@ class Talk(VitaeModel):
     def get_latest_presentation(self):
         return self.presentations.all()[0]
 
-    objects = models.Manager()
+    objects = CVManager()
 
 
 class Presentation(models.Model):
@@ -155,7 +161,7 @@ class Presentation(models.Model):
             (KEYNOTE, 'Keynote'))
     talk = models.ForeignKey(
         Talk, related_name='presentations', on_delete=models.CASCADE)
-    presentation_date = models.DateField()
+    presentation_date = models.DateField(db_index=True)
     type = models.IntegerField(choices=TYPE)
     event = models.CharField(max_length=150)
     event_acronym = models.CharField(max_length=10, blank=True)
@@ -165,6 +171,7 @@ class Presentation(models.Model):
 
     class Meta:
         ordering = ['-presentation_date']
+        indexes = [PrefixSearchIndex('event', 'cv_presentation_event_up')]
 
     def __str__(self):
         return '%s; %s (%s %s)' % (
@@ -210,6 +217,10 @@ class OtherWriting(VitaeModel):
     class Meta:
         """Orders other writings in reverse chronological order."""
         ordering = ['-date']
+        indexes = [
+            PrefixSearchIndex('title', 'cv_otherwriting_title_up'),
+            PrefixSearchIndex('short_title', 'cv_otherwriting_short_up'),
+        ]
 
     def __str__(self):
         """Returns string representation of other writing."""
@@ -221,7 +232,7 @@ class OtherWriting(VitaeModel):
         super(OtherWriting, self).save(
             force_insert, force_update, *args, **kwargs)
 
-    objects = models.Manager()
+    objects = CVManager()
 
 
 class Dataset(VitaeModel):
@@ -265,7 +276,7 @@ class Dataset(VitaeModel):
         """String representation of a dataset instance."""
         return '%s' % self.short_title
 
-    objects = models.Manager()
+    objects = CVManager()
 
 
 class DatasetAuthorship(CollaborationModel, StudentCollaborationModel):
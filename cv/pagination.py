@@ -0,0 +1,227 @@
+"""Paginate CV querysets by keyset (also known as "cursor" or "seek")
+pagination.
+
+Each page is selected by filtering for rows that sort after the last row
+of the previous page instead of skipping rows with ``OFFSET``, so later
+pages cost no more than the first. Pages follow the ordering of the
+queryset (the ordering set by its manager or the model's default
+ordering) with the primary key added to break ties. ``NULL`` values sort
+before all other values in ascending order and after them in descending
+order on every database.
+"""
+from django.core import signing
+from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+
+import datetime
+import decimal
+import uuid
+
+
+CURSOR_SALT = 'cv.pagination'
+
+
+def expand_ordering(model, name, descending):
+    """Return list of ``(path, descending)`` tuples for ordering ``model``
+    by ``name``, replacing relations by the ordering of the related model.
+    """
+    opts, field = model._meta, None
+    for part in name.split('__'):
+        field = opts.pk if part == 'pk' else opts.get_field(part)
+        if field.is_relation:
+            opts = field.related_model._meta
+    if field is not None and field.is_relation and field.concrete:
+        expanded = list()
+        for sub in opts.ordering or ['pk']:
+            sub_desc = sub.startswith('-')
+            expanded += expand_ordering(
+                model, '%s__%s' % (name, sub.lstrip('-')),
+                descending != sub_desc)
+        return expanded
+    return [(name, descending)]
+
+
+def get_keyset_ordering(queryset):
+    """Return list of ``(path, descending)`` tuples that totally order
+    ``queryset``."""
+    if queryset.query.order_by:
+        ordering = queryset.query.order_by
+    elif queryset.query.default_ordering:
+        ordering = queryset.model._meta.ordering
+    else:
+        ordering = []
+    keyset = list()
+    for item in ordering:
+        if not isinstance(item, str) or item == '?':
+            raise ValueError(
+                'Keyset pagination requires ordering by field names.')
+        keyset += expand_ordering(
+            queryset.model, item.lstrip('-'), item.startswith('-'))
+    pk_names = ('pk', queryset.model._meta.pk.name)
+    if not any(path in pk_names for path, _ in keyset):
+        keyset.append(('pk', False))
+    return keyset
+
+
+def order_expression(path, descending):
+    """Return expression ordering by ``path`` with ``NULL`` values lowest."""
+    if descending:
+        return F(path).desc(nulls_last=True)
+    return F(path).asc(nulls_first=True)
+
+
+def after_condition(path, descending, value):
+    """Return condition for rows that sort after ``value`` of ``path``."""
+    if value is None:
+        return Q(pk__in=[]) if descending else Q(**{path + '__isnull': False})
+    if descending:
+        return Q(**{path + '__lt': value}) | Q(**{path + '__isnull': True})
+    return Q(**{path + '__gt': value})
+
+
+def equal_condition(path, value):
+    """Return condition for rows whose ``path`` equals ``value``."""
+    if value is None:
+        return Q(**{path + '__isnull': True})
+    return Q(**{path: value})
+
+
+def keyset_condition(keyset, values):
+    """Return condition for rows that sort after the row with ``values``
+    of the ``keyset``."""
+    condition = Q(pk__in=[])
+    equal = Q()
+    for (path, descending), value in zip(keyset, values):
+        condition |= equal & after_condition(path, descending, value)
+        equal &= equal_condition(path, value)
+    return condition
+
+
+def cursor_value(value):
+    """Return ``value`` as a JSON value that filters select exactly."""
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+def encode_cursor(values):
+    """Return signed, URL-safe cursor representing ``values``."""
+    values = [cursor_value(value) for value in values]
+    return signing.dumps(values, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor):
+    """Return list of values represented by ``cursor``."""
+    try:
+        values = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise InvalidPage('Invalid cursor.')
+    if not isinstance(values, list):
+        raise InvalidPage('Invalid cursor.')
+    return values
+
+
+class KeysetPage:
+    """A page of objects selected by :func:`keyset_paginate`.
+
+    ``object_list`` contains the objects of the page, ``has_next`` whether
+    another page follows it, and ``next_cursor`` the cursor of that page
+    (or ``None``).
+    """
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __repr__(self):
+        return '<KeysetPage: %s objects>' % len(self.object_list)
+
+
+def keyset_paginate(queryset, cursor=None, per_page=50):
+    """Return :class:`KeysetPage` of at most ``per_page`` objects of
+    ``queryset`` that follow the position given by ``cursor``.
+
+    The first page is returned if ``cursor`` is ``None``. Raises
+    :class:`~django.core.paginator.InvalidPage` if the cursor was not
+    created for a queryset with the same ordering.
+    """
+    keyset = get_keyset_ordering(queryset)
+    names = ['keyset_%s' % i for i in range(len(keyset))]
+    queryset = queryset.annotate(**{
+        name: F(path) for name, (path, _) in zip(names, keyset)
+    }).order_by(*[order_expression(*key) for key in keyset])
+    if cursor is not None:
+        values = decode_cursor(cursor)
+        if len(values) != len(keyset):
+            raise InvalidPage('Invalid cursor.')
+        queryset = queryset.filter(keyset_condition(keyset, values))
+    object_list = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        next_cursor = encode_cursor(
+            [getattr(object_list[-1], name) for name in names])
+    return KeysetPage(object_list, next_cursor)
+
+
+class KeysetGroupPage(KeysetPage):
+    """A page of objects from consecutive groups selected by
+    :func:`keyset_paginate_groups`.
+
+    ``object_lists`` is a dictionary with the objects of the page in each
+    group (empty for groups not on the page) and ``object_list`` contains
+    the objects of all groups in order.
+    """
+
+    def __init__(self, object_lists, next_cursor):
+        self.object_lists = object_lists
+        object_list = [obj for objs in object_lists.values() for obj in objs]
+        super(KeysetGroupPage, self).__init__(object_list, next_cursor)
+
+
+def keyset_paginate_groups(groups, cursor=None, per_page=50):
+    """Return :class:`KeysetGroupPage` of at most ``per_page`` objects from
+    ``groups``, a list of ``(key, queryset)`` tuples paginated one after
+    another.
+
+    Each page takes objects from the group in which the previous page
+    ended and continues with the following groups while there is room on
+    the page. Each group visited costs one query.
+    """
+    index, group_cursor = 0, None
+    if cursor is not None:
+        values = decode_cursor(cursor)
+        if (len(values) != 2 or not isinstance(values[0], int) or
+                not 0 <= values[0] < len(groups)):
+            raise InvalidPage('Invalid cursor.')
+        index, group_cursor = values
+    object_lists = {key: [] for key, _ in groups}
+    remaining, next_cursor = per_page, None
+    for i in range(index, len(groups)):
+        key, queryset = groups[i]
+        page = keyset_paginate(
+            queryset, group_cursor if i == index else None, remaining)
+        object_lists[key] = page.object_list
+        remaining -= len(page)
+        if page.has_next:
+            next_cursor = encode_cursor([i, page.next_cursor])
+            break
+        if not remaining:
+            for j in range(i + 1, len(groups)):
+                if groups[j][1].exists():
+                    next_cursor = encode_cursor([j, None])
+                    break
+            break
+    return KeysetGroupPage(object_lists, next_cursor)
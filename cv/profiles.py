@@ -0,0 +1,162 @@
+"""Named variants of the CV, such as a short CV or a biosketch.
+
+A profile lists the sections of the CV in order. Each section is a
+dictionary with the keys of the sections of ``cv/pdf/pdf_list.json``
+(``model_name``, ``display_name``, ``template``, ``date_field``, and
+``subsections``) and two optional keys:
+
+``filters``
+    Dictionary of lookups that items of the section must match, e.g.,
+    ``{"primary_discipline__slug": "sociology"}``.
+
+``limit``
+    Maximum number of items listed in the section or in each of its
+    subsections.
+
+Profiles are defined by :setting:`CV_PROFILES`. The ``full`` profile is the
+complete CV of ``cv/pdf/pdf_list.json`` unless it is redefined. The HTML
+and PDF versions of each profile are cached under their own namespaces
+until the CV changes.
+
+Profiles are built once per process since their settings and templates do
+not change at runtime. Overriding :setting:`CV_PROFILES` or ``TEMPLATES``
+in tests rebuilds them.
+"""
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.loader import get_template
+
+from cv.settings import CV_PROFILES
+from cv.windows import window_queryset
+
+from functools import lru_cache
+import json
+
+
+DEFAULT_PROFILE = 'full'
+
+HTML_SECTION_TEMPLATES = {
+    'degree': 'cv/sections/degrees.html',
+    'position': 'cv/sections/positions.html',
+    'award': 'cv/sections/awards.html',
+    'book': 'cv/sections/books.html',
+    'article': 'cv/sections/articles.html',
+    'chapter': 'cv/sections/chapters.html',
+    'report': 'cv/sections/reports.html',
+    'grant': 'cv/sections/grants.html',
+    'otherwriting': 'cv/sections/otherwriting.html',
+    'talk': 'cv/sections/talks.html',
+    'student': 'cv/sections/students.html',
+    'course': 'cv/sections/courses.html',
+    'service': 'cv/sections/service.html',
+}
+"""Templates of the sections of the HTML CV for each model. Sections of
+other models appear only in PDFs."""
+
+SECTION_KEYS = ('model_name', 'display_name', 'template', 'date_field',
+                'subsections', 'filters', 'limit')
+
+
+def section_queryset(queryset, section, since=None):
+    """Return ``queryset`` limited by the ``filters`` and ``limit`` of
+    ``section`` and the window that starts on ``since``."""
+    queryset = window_queryset(
+        queryset.filter(**section.get('filters', {})), since)
+    if section.get('limit'):
+        queryset = queryset[:section['limit']]
+    return queryset
+
+
+class Profile:
+    """A named list of CV sections.
+
+    ``years`` limits the profile to a window of recent years unless the
+    request selects another window. ``complete`` marks the built-in
+    complete CV, whose HTML version is the ``cv/cv.html`` page.
+    """
+
+    def __init__(self, name, sections, title=None, years=None,
+                 complete=False):
+        self.name = name
+        self.complete = complete
+        self.title = title or name.replace('_', ' ').title()
+        self.years = years
+        self.sections = [self.clean_section(s) for s in sections]
+
+    def clean_section(self, section):
+        """Return copy of ``section`` after checking its keys, model, and
+        subsections."""
+        unknown = set(section) - set(SECTION_KEYS)
+        if unknown:
+            raise ImproperlyConfigured(
+                'Unknown keys in section of CV profile "%s": %s' % (
+                    self.name, ', '.join(sorted(unknown))))
+        try:
+            model = apps.get_model('cv', section['model_name'])
+        except (KeyError, LookupError):
+            raise ImproperlyConfigured(
+                'Sections of CV profile "%s" must name a model of the cv '
+                'app.' % self.name)
+        lists = getattr(model.displayable, 'management_lists', [])
+        for label, manager in section.get('subsections') or []:
+            if manager not in lists:
+                raise ImproperlyConfigured(
+                    'CV profile "%s": %s has no list "%s".' % (
+                        self.name, section['model_name'], manager))
+        return dict(section)
+
+    def get_html_sections(self):
+        """Return list of ``(section, template)`` tuples of the sections
+        that appear in the HTML CV."""
+        html_sections = list()
+        for section in self.sections:
+            template = HTML_SECTION_TEMPLATES.get(section['model_name'])
+            if template:
+                html_sections.append((section, template))
+        return html_sections
+
+    def __repr__(self):
+        return '<Profile: %s>' % self.name
+
+
+def get_default_sections():
+    """Return sections of the complete CV from ``cv/pdf/pdf_list.json``."""
+    return json.loads(get_template('cv/pdf/pdf_list.json').render({}))
+
+
+@lru_cache(maxsize=None)
+def get_profiles():
+    """Return dictionary of the :class:`Profile` instances defined by
+    :setting:`CV_PROFILES`, including the ``full`` profile. The dictionary
+    is shared and must not be changed."""
+    profiles = {DEFAULT_PROFILE: Profile(
+        DEFAULT_PROFILE, get_default_sections(), title='Full CV',
+        complete=True)}
+    for name, definition in CV_PROFILES.items():
+        profiles[name] = Profile(name, **definition)
+    return profiles
+
+
+@receiver(setting_changed)
+def reload_profiles(setting, value, **kwargs):
+    """Rebuild profiles when the settings they are built from change."""
+    global CV_PROFILES
+    if setting == 'CV_PROFILES':
+        CV_PROFILES = value or {}
+    if setting in ('CV_PROFILES', 'TEMPLATES'):
+        get_profiles.cache_clear()
+
+
+def get_profile(name=None):
+    """Return the :class:`Profile` called ``name`` or the ``full``
+    profile if ``name`` is empty.
+
+    Raises :class:`LookupError` if there is no such profile.
+    """
+    name = name or DEFAULT_PROFILE
+    try:
+        return get_profiles()[name]
+    except KeyError:
+        raise LookupError('There is no CV profile named "%s".' % name)
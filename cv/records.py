@@ -0,0 +1,275 @@
+"""Lightweight rows of CV data for the entries of the CV document.
+
+Entries of the PDF and the other formats of :mod:`cv.renderers` need only
+a few columns of each work. :func:`get_records` fetches those columns with
+``values()`` and wraps each row in a :class:`Record` with ``__slots__``
+instead of a model instance. Author and editor names are fetched for the
+whole section with one query and stored as strings; related lists, such
+as the presentations of talks, are fetched with one query and stored as
+lists of records.
+
+Records keep the attribute names of the model, so the entry templates in
+``cv/pdf/`` use them as they would use instances. The label of a field
+with choices is stored as ``get_<field>_display``, and lists of related
+records answer ``all()`` and ``count()`` like related managers.
+:func:`iter_records` yields the records of very long sections a chunk at a
+time.
+"""
+from cv.templatetags.cvtags import print_authors
+from cv.windows import WINDOW_DATE_FIELDS
+
+from itertools import islice
+
+
+CHUNK_SIZE = 500
+"""Number of records held in memory by :func:`iter_records`."""
+
+RECORD_FIELDS = {
+    'article': ('title', 'journal__title', 'volume', 'issue', 'start_page',
+                'end_page'),
+    'award': ('name', 'organization'),
+    'book': ('title', 'publisher'),
+    'chapter': ('title', 'book_title', 'place', 'publisher', 'start_page',
+                'end_page'),
+    'course': ('title', 'student_level'),
+    'degree': ('degree', 'honors', 'major', 'institution', 'city', 'state'),
+    'grant': ('title',),
+    'otherwriting': ('title',),
+    'position': ('title', 'project', 'department', 'institution'),
+    'report': ('title', 'institution', 'place'),
+    'student': ('first_name', 'last_name', 'role', 'graduation_date',
+                'current_position'),
+    'talk': ('title',),
+}
+"""Columns fetched for the entries of each model. Columns of related
+models (e.g., ``journal__title``) are stored under the name of the
+relation (``journal``). Instances of other models are used as they
+are."""
+
+RECORD_RELATIONS = {
+    'article': ('authorship',),
+    'chapter': ('authorship', 'editorship'),
+    'report': ('authorship',),
+    'talk': ('presentations',),
+    'course': ('offerings',),
+}
+"""Related rows fetched for the entries of each model."""
+
+RELATION_FIELDS = {
+    'presentations': ('event', 'presentation_date', 'type'),
+    'offerings': ('term', 'start_date'),
+}
+"""Columns fetched for related lists of records."""
+
+NAME_FIELDS = ('print_middle', 'collaborator__first_name',
+               'collaborator__middle_initial', 'collaborator__last_name',
+               'collaborator__email')
+
+NAME_ATTRIBUTES = {
+    'authorship': 'authors',
+    'editorship': 'editors',
+}
+"""Attributes that store the names of authors and editors."""
+
+
+class Record:
+    """A row of CV data with the columns of its ``__slots__``."""
+    __slots__ = ('pk',)
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self.pk)
+
+
+class RecordList(list):
+    """List of related records that answers ``all()`` and ``count()``."""
+
+    def all(self):
+        return self
+
+    def count(self):
+        return len(self)
+
+
+class Name:
+    """Name of a collaborator in the form expected by
+    :func:`~cv.templatetags.cvtags.print_authors`."""
+    __slots__ = ('collaborator', 'print_middle', 'first_name',
+                 'middle_initial', 'last_name', 'email')
+
+    def __init__(self, print_middle, first_name, middle_initial, last_name,
+                 email):
+        self.collaborator = self
+        self.print_middle = print_middle
+        self.first_name = first_name
+        self.middle_initial = middle_initial
+        self.last_name = last_name
+        self.email = email
+
+
+RECORD_CLASSES = dict()
+
+
+def get_record_class(model, names):
+    """Return subclass of :class:`Record` with slots for ``names``."""
+    key = (model._meta.label, tuple(names))
+    if key not in RECORD_CLASSES:
+        RECORD_CLASSES[key] = type(
+            '%sRecord' % model.__name__, (Record,),
+            {'__slots__': tuple(name for name in names if name != 'pk')})
+    return RECORD_CLASSES[key]
+
+
+def get_choice_displays(model, fields):
+    """Return dictionary of the choices of ``fields`` that have them."""
+    displays = dict()
+    for name in fields:
+        if '__' not in name and name != 'pk':
+            field = model._meta.get_field(name)
+            if field.choices:
+                displays[name] = dict(field.flatchoices)
+    return displays
+
+
+def iter_rows(queryset, fields, chunk_size=None):
+    """Yield rows of ``fields`` of ``queryset`` as dictionaries keyed by
+    attribute names, with labels of choices.
+
+    Rows are read from the database ``chunk_size`` at a time if it is
+    given (see :meth:`~django.db.models.query.QuerySet.iterator`).
+    """
+    displays = get_choice_displays(
+        queryset.model,
+        [name for name in fields if name not in queryset.query.annotations])
+    rows = queryset.values(*fields)
+    if chunk_size:
+        rows = rows.iterator(chunk_size)
+    for row in rows:
+        values = {name.split('__')[0]: value for name, value in row.items()}
+        for name, choices in displays.items():
+            values['get_%s_display' % name] = choices.get(
+                row[name], row[name])
+        yield values
+
+
+def fetch_rows(queryset, fields):
+    """Return rows of ``fields`` of ``queryset`` as dictionaries keyed by
+    attribute names, with labels of choices."""
+    return list(iter_rows(queryset, fields))
+
+
+def make_records(model, rows):
+    """Return list of records of ``model`` for dictionaries ``rows``."""
+    if not rows:
+        return []
+    record_class = get_record_class(model, list(rows[0]))
+    return [record_class(**row) for row in rows]
+
+
+def get_related_records(model, relation, pks, since=None):
+    """Return dictionary of the lists of rows related to each of ``pks``
+    through ``relation`` of ``model``.
+
+    Names of collaborators are returned as :class:`Name` instances. Related
+    dated rows of windowed models are limited to the window that starts
+    on ``since``.
+    """
+    rel = model._meta.get_field(relation)
+    related, fk = rel.related_model, rel.field.attname
+    queryset = related._default_manager.filter(**{fk + '__in': pks})
+    window_field = WINDOW_DATE_FIELDS.get(model._meta.model_name)
+    if since and window_field and window_field.startswith(relation + '__'):
+        queryset = queryset.filter(
+            **{window_field.split('__', 1)[1] + '__gte': since})
+    related_rows = dict()
+    if relation in NAME_ATTRIBUTES:
+        for row in queryset.values_list(fk, *NAME_FIELDS):
+            name = Name(*row[1:])
+            if relation == 'editorship':
+                # Editors are printed without middle initials
+                name.print_middle = False
+            related_rows.setdefault(row[0], []).append(name)
+        return related_rows
+    rows = fetch_rows(queryset, (fk,) + RELATION_FIELDS[relation])
+    for record in make_records(related, rows):
+        related_rows.setdefault(getattr(record, fk), RecordList()).append(
+            record)
+    return related_rows
+
+
+def get_related_columns(model_name):
+    """Return names of the attributes of records of ``model_name`` that
+    store columns of related models, e.g., ``journal`` for
+    ``journal__title``."""
+    return tuple(name.split('__')[0]
+                 for name in RECORD_FIELDS.get(model_name, ()) if '__' in name)
+
+
+def get_record_fields(model, date_fields=()):
+    """Return names of the columns of the records of ``model``, including
+    ``date_fields``, or ``None`` if ``model`` has no record columns."""
+    fields = RECORD_FIELDS.get(model._meta.model_name)
+    if fields is None:
+        return None
+    if isinstance(date_fields, str):
+        date_fields = (date_fields,)
+    return ('pk',) + tuple(fields) + tuple(
+        field for field in date_fields or () if field not in fields)
+
+
+def add_related_records(model, rows, since=None):
+    """Return list of records of ``model`` for ``rows`` with the names
+    and lists of records related to each."""
+    pks = [row['pk'] for row in rows]
+    for relation in RECORD_RELATIONS.get(model._meta.model_name, ()):
+        related_rows = get_related_records(model, relation, pks, since) \
+            if pks else {}
+        for row in rows:
+            related = related_rows.get(row['pk'], [])
+            if relation in NAME_ATTRIBUTES:
+                attribute = NAME_ATTRIBUTES[relation]
+                row[attribute] = print_authors(related)
+                row['%s_count' % attribute] = len(related)
+            else:
+                row[relation] = related or RecordList()
+    return make_records(model, rows)
+
+
+def get_records(queryset, date_fields=(), since=None):
+    """Return list of records of the entries of ``queryset``.
+
+    ``date_fields`` are fetched in addition to the columns of
+    :data:`RECORD_FIELDS`, as are any other fields or annotations of
+    ``queryset`` named in it. Returns model instances for models without
+    record columns.
+    """
+    fields = get_record_fields(queryset.model, date_fields)
+    if fields is None:
+        return list(queryset)
+    return add_related_records(
+        queryset.model, fetch_rows(queryset.prefetch_related(None), fields),
+        since)
+
+
+def iter_records(queryset, date_fields=(), since=None,
+                 chunk_size=CHUNK_SIZE):
+    """Yield records of the entries of ``queryset`` like
+    :func:`get_records`, holding only ``chunk_size`` of them in memory.
+
+    Rows are read with :meth:`~django.db.models.query.QuerySet.iterator`
+    and the related rows of each chunk are fetched with one query for each
+    relation.
+    """
+    fields = get_record_fields(queryset.model, date_fields)
+    if fields is None:
+        yield from queryset.iterator(chunk_size)
+        return
+    rows = iter_rows(queryset.prefetch_related(None), fields, chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        yield from add_related_records(queryset.model, chunk, since)
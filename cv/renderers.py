@@ -0,0 +1,408 @@
+"""Render a :class:`~cv.document.CVDocument` in different formats.
+
+Renderers are registered by format with :func:`register_renderer`. Each
+renderer only lays out a document, so that every format is produced from
+the same cached document without further queries. Renderers of text
+formats, and of Word documents, stream their output a section at a time.
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.template.loader import render_to_string
+
+from cv.document import markup_to_runs
+from cv.settings import CV_PERSONAL_INFO
+
+from xml.sax.saxutils import escape
+import io
+import json
+import re
+import zipfile
+
+
+RENDERERS = dict()
+"""Registered renderers by format."""
+
+
+class Renderer:
+    """Base class of renderers.
+
+    Subclasses set the ``format`` used in URLs, the ``content_type`` and
+    file ``extension`` of the output, and implement either :meth:`render`
+    or :meth:`stream`.
+    """
+    format = None
+    content_type = 'application/octet-stream'
+    extension = None
+
+    def render(self, document, request=None):
+        """Return ``document`` in the format of the renderer as bytes."""
+        return b''.join(self.stream(document, request))
+
+    def stream(self, document, request=None):
+        """Yield ``document`` in the format of the renderer as chunks of
+        bytes."""
+        yield self.render(document, request)
+
+    def get_filename(self, document):
+        """Return name of the file of ``document`` in this format."""
+        name = '_'.join(document.name.lower().replace('.', '').split())
+        return 'cv_{0}.{1}'.format(name or 'cv', self.extension or self.format)
+
+
+def encode_lines(lines):
+    """Return ``lines`` as UTF-8 bytes, each ending with a newline."""
+    return ''.join(line + '\n' for line in lines).encode('utf-8')
+
+
+def iter_json(data, chunk_size=8192):
+    """Yield ``data`` encoded as JSON in chunks of about ``chunk_size``
+    bytes."""
+    chunk = list()
+    size = 0
+    for part in DjangoJSONEncoder().iterencode(data):
+        chunk.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield ''.join(chunk).encode('utf-8')
+            chunk, size = list(), 0
+    if chunk:
+        yield ''.join(chunk).encode('utf-8')
+
+
+def register_renderer(renderer_class):
+    """Class decorator that registers a :class:`Renderer` by its format."""
+    RENDERERS[renderer_class.format] = renderer_class()
+    return renderer_class
+
+
+def get_renderer(format):
+    """Return renderer registered for ``format``.
+
+    Raises :class:`LookupError` if no renderer is registered.
+    """
+    try:
+        return RENDERERS[format]
+    except KeyError:
+        raise LookupError('There is no renderer for the format "%s". '
+                          'Available formats: %s.' % (
+                              format, ', '.join(sorted(RENDERERS))))
+
+
+@register_renderer
+class HTMLRenderer(Renderer):
+    """Render a document as a webpage with ``cv/document.html``."""
+    format = 'html'
+    content_type = 'text/html; charset=utf-8'
+    template_name = 'cv/document.html'
+
+    def render(self, document, request=None):
+        return render_to_string(
+            self.template_name, {'document': document},
+            request=request).encode('utf-8')
+
+
+@register_renderer
+class JSONRenderer(Renderer):
+    """Render a document as JSON."""
+    format = 'json'
+    content_type = 'application/json'
+
+    def to_dict(self, document):
+        return document.to_dict()
+
+    def stream(self, document, request=None):
+        return iter_json(self.to_dict(document))
+
+
+@register_renderer
+class TextRenderer(Renderer):
+    """Render a document as plain text."""
+    format = 'txt'
+    content_type = 'text/plain; charset=utf-8'
+
+    def stream(self, document, request=None):
+        yield encode_lines([document.name] + document.heading)
+        for section in document.sections:
+            lines = ['', section.title.upper()]
+            for subsection in section.subsections:
+                if subsection.title is not None:
+                    lines += ['', subsection.title]
+                for entry in subsection.entries:
+                    lines += ['%-10s%s' % (entry.date, entry.plain_text)]
+            yield encode_lines(lines)
+
+
+@register_renderer
+class PDFRenderer(Renderer):
+    """Render a document as a PDF with :class:`~cv.views.pdf.CVPdf`."""
+    format = 'pdf'
+    content_type = 'application/pdf'
+
+    def render(self, document, request=None):
+        from cv.views.pdf import CVPdf
+        return CVPdf().build_cv(io.BytesIO(), document)
+
+
+MARKDOWN_FORMATS = (('b', '**', '**'), ('i', '*', '*'), ('s', '~~', '~~'),
+                    ('u', '<u>', '</u>'), ('sup', '<sup>', '</sup>'),
+                    ('sub', '<sub>', '</sub>'))
+"""Markdown written before and after runs of each format."""
+
+MARKDOWN_SPECIAL_RE = re.compile(r'([\\`*_{}\[\]<>#|~])')
+
+
+def runs_to_markdown(runs):
+    """Return Markdown of ``(text, formats)`` runs of entry markup (see
+    :func:`~cv.document.markup_to_runs`)."""
+    parts = list()
+    for text, formats in runs:
+        if text == '\n':
+            parts.append('  \n  ')
+            continue
+        stripped = MARKDOWN_SPECIAL_RE.sub(r'\\\1', text.strip())
+        if not stripped:
+            parts.append(text)
+            continue
+        for format, before, after in MARKDOWN_FORMATS:
+            if format in formats:
+                stripped = before + stripped + after
+        # Emphasis must not start or end with a space
+        leading = ' ' if text[:1].isspace() else ''
+        trailing = ' ' if text[-1:].isspace() else ''
+        parts.append(leading + stripped + trailing)
+    return ''.join(parts)
+
+
+@register_renderer
+class MarkdownRenderer(Renderer):
+    """Render a document as Markdown, with a list of entries in each
+    subsection."""
+    format = 'md'
+    content_type = 'text/markdown; charset=utf-8'
+
+    def stream(self, document, request=None):
+        heading = [line + '  ' for line in document.heading]
+        yield encode_lines(['# %s' % document.name, ''] + heading)
+        for section in document.sections:
+            lines = ['', '## %s' % section.title]
+            for subsection in section.subsections:
+                if subsection.title is not None:
+                    lines += ['', '### %s' % subsection.title]
+                lines.append('')
+                for entry in subsection.entries:
+                    text = runs_to_markdown(markup_to_runs(entry.text))
+                    if entry.date:
+                        text = '**%s** %s' % (entry.date, text)
+                    lines.append('- %s' % text)
+            yield encode_lines(lines)
+
+
+JSON_RESUME_SECTIONS = {
+    'position': ('work', 'position', None),
+    'degree': ('education', 'studyType', None),
+    'award': ('awards', 'title', 'date'),
+    'article': ('publications', 'name', 'releaseDate'),
+    'book': ('publications', 'name', 'releaseDate'),
+    'chapter': ('publications', 'name', 'releaseDate'),
+    'report': ('publications', 'name', 'releaseDate'),
+    'otherwriting': ('publications', 'name', 'releaseDate'),
+}
+"""Key of the JSON Resume section of the entries of each model, the key of
+the text of each entry, and the key of its date (``None`` for a
+``startDate`` and ``endDate``). Entries of other models are listed as
+projects."""
+
+
+@register_renderer
+class JSONResumeRenderer(JSONRenderer):
+    """Render a document in the `JSON Resume <https://jsonresume.org>`_
+    schema.
+
+    Entries keep the text of the CV rather than the fields of the schema,
+    and only the years of their dates.
+    """
+    format = 'jsonresume'
+    extension = 'resume.json'
+
+    def make_item(self, section, entry):
+        key, text_key, date_key = JSON_RESUME_SECTIONS.get(
+            section.model_name, ('projects', 'name', None))
+        item = {text_key: entry.plain_text}
+        years = re.findall(r'\d{4}', entry.date)
+        if years and date_key:
+            item[date_key] = years[0]
+        elif years:
+            item['startDate'] = years[0]
+            if len(years) > 1:
+                item['endDate'] = years[1]
+        if key == 'projects':
+            item['type'] = section.title
+        return key, item
+
+    def to_dict(self, document):
+        info = CV_PERSONAL_INFO or {}
+        resume = {'basics': {
+            'name': document.name,
+            'email': info.get('email', ''),
+            'phone': info.get('phone', ''),
+            'summary': ' '.join(document.heading),
+        }}
+        for section in document.sections:
+            for subsection in section.subsections:
+                for entry in subsection.entries:
+                    key, item = self.make_item(section, entry)
+                    resume.setdefault(key, []).append(item)
+        return resume
+
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'content-types">'
+    '<Default Extension="rels" ContentType="application/'
+    'vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '</Types>')
+
+DOCX_RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/></Relationships>')
+
+DOCX_DOCUMENT_RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>')
+
+DOCX_NAMESPACE = ('xmlns:w="http://schemas.openxmlformats.org/'
+                  'wordprocessingml/2006/main"')
+
+DOCX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:styles %s><w:docDefaults><w:rPrDefault><w:rPr>'
+    '<w:rFonts w:ascii="Times New Roman" w:hAnsi="Times New Roman" '
+    'w:cs="Times New Roman"/><w:sz w:val="22"/></w:rPr></w:rPrDefault>'
+    '<w:pPrDefault><w:pPr><w:spacing w:after="120"/></w:pPr>'
+    '</w:pPrDefault></w:docDefaults></w:styles>' % DOCX_NAMESPACE)
+
+DOCX_PARTS = (
+    ('[Content_Types].xml', DOCX_CONTENT_TYPES),
+    ('_rels/.rels', DOCX_RELATIONSHIPS),
+    ('word/_rels/document.xml.rels', DOCX_DOCUMENT_RELATIONSHIPS),
+    ('word/styles.xml', DOCX_STYLES),
+)
+"""Parts of a Word document other than its text."""
+
+DOCX_RUN_PROPERTIES = (('b', '<w:b/>'), ('i', '<w:i/>'),
+                       ('u', '<w:u w:val="single"/>'), ('s', '<w:strike/>'),
+                       ('sup', '<w:vertAlign w:val="superscript"/>'),
+                       ('sub', '<w:vertAlign w:val="subscript"/>'))
+"""Properties of runs of each format."""
+
+
+def docx_run(text, formats=(), size=None):
+    """Return WordprocessingML run of ``text`` with ``formats``."""
+    if text == '\n':
+        return '<w:r><w:br/></w:r>'
+    if text == '\t':
+        return '<w:r><w:tab/></w:r>'
+    properties = ''.join(xml for format, xml in DOCX_RUN_PROPERTIES
+                         if format in formats)
+    if size:
+        properties += '<w:sz w:val="%s"/>' % size
+    if properties:
+        properties = '<w:rPr>%s</w:rPr>' % properties
+    return '<w:r>%s<w:t xml:space="preserve">%s</w:t></w:r>' % (
+        properties, escape(text))
+
+
+def docx_paragraph(runs, properties=''):
+    """Return WordprocessingML paragraph of ``runs``."""
+    if properties:
+        properties = '<w:pPr>%s</w:pPr>' % properties
+    return '<w:p>%s%s</w:p>' % (properties, ''.join(runs))
+
+
+class StreamBuffer:
+    """Unseekable file that holds written bytes until they are taken."""
+
+    def __init__(self):
+        self.chunks = list()
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        """Return and forget the bytes written since the last call."""
+        data = b''.join(self.chunks)
+        self.chunks = list()
+        return data
+
+
+@register_renderer
+class DOCXRenderer(Renderer):
+    """Render a document as a Word document.
+
+    The document is written as WordprocessingML without further
+    dependencies and compressed as it is streamed. Entries are indented
+    with their dates at the left margin, as in the PDF.
+    """
+    format = 'docx'
+    content_type = ('application/vnd.openxmlformats-officedocument.'
+                    'wordprocessingml.document')
+
+    def iter_xml(self, document):
+        """Yield the text of ``word/document.xml`` of ``document``."""
+        yield ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+               '<w:document %s><w:body>' % DOCX_NAMESPACE)
+        center = '<w:jc w:val="center"/>'
+        xml = [docx_paragraph([docx_run(document.name, ('b',), 26)], center)]
+        xml += [docx_paragraph([docx_run(line)], center)
+                for line in document.heading]
+        yield ''.join(xml)
+        for section in document.sections:
+            keep = '<w:keepNext/><w:spacing w:before="240"/>'
+            xml = [docx_paragraph([docx_run(section.title, ('b',), 26)], keep)]
+            for subsection in section.subsections:
+                if subsection.title is not None:
+                    xml.append(docx_paragraph(
+                        [docx_run(subsection.title, ('i',))],
+                        '<w:keepNext/>'))
+                for entry in subsection.entries:
+                    runs = [docx_run(entry.date)] if entry.date else []
+                    runs.append(docx_run('\t'))
+                    runs += [docx_run(text, formats) for text, formats
+                             in markup_to_runs(entry.text)]
+                    xml.append(docx_paragraph(
+                        runs, '<w:ind w:left="1080" w:hanging="1080"/>'))
+            yield ''.join(xml)
+        yield ('<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+               '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" '
+               'w:left="1440" w:header="720" w:footer="720" w:gutter="0"/>'
+               '</w:sectPr></w:body></w:document>')
+
+    def stream(self, document, request=None):
+        buffer = StreamBuffer()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as docx:
+            for name, content in DOCX_PARTS:
+                docx.writestr(name, content)
+            with docx.open('word/document.xml', 'w') as part:
+                for xml in self.iter_xml(document):
+                    part.write(xml.encode('utf-8'))
+                    data = buffer.take()
+                    if data:
+                        yield data
+        yield buffer.take()
@@ -0,0 +1,344 @@
+"""Search the titles, abstracts, venues, and authors of CV works.
+
+The searchable text of each displayable work is stored in one
+:class:`cv.models.SearchEntry` table with a full-text index maintained by
+the database: an FTS5 table ranked by BM25 on SQLite and a weighted
+``tsvector`` column with a GIN index on PostgreSQL. A search is a single
+ranked query of the index however many kinds of works match.
+
+Entries are updated by the signals connected in :mod:`cv.signals` when
+works, their authorships, presentations, journals, or collaborators are
+saved or deleted. Changes made by ``QuerySet.update`` or ``bulk_create``
+send no signals; call :func:`update_index` afterwards or run the
+``rebuild_search_index`` management command.
+"""
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, router, transaction
+
+from functools import lru_cache
+import re
+
+from cv.models import SearchEntry
+from cv.settings import CV_SEARCH_CONFIG
+
+
+AUTHORS = ('authorship__collaborator__first_name',
+           'authorship__collaborator__last_name')
+
+SEARCH_FIELDS = {
+    'article': ('abstract', 'journal__title', AUTHORS),
+    'book': ('abstract', 'publisher', 'series', AUTHORS),
+    'chapter': ('book_title', 'publisher', 'series', AUTHORS,
+                ('editorship__collaborator__first_name',
+                 'editorship__collaborator__last_name')),
+    'report': ('abstract', 'institution', 'series_title', AUTHORS),
+    'talk': ('abstract', 'presentations__event',
+             ('collaborator__first_name', 'collaborator__last_name')),
+    'grant': ('abstract', 'agency', 'division',
+              ('collaboration__collaborator__first_name',
+               'collaboration__collaborator__last_name')),
+    'dataset': ('producer', 'distributor', AUTHORS),
+    'otherwriting': ('abstract', 'venue'),
+}
+"""Names of the models included in search and the lookups of the text
+indexed with their titles. Lookups grouped in a tuple are joined into one
+phrase, such as the first and last name of an author."""
+
+INDEX_CHUNK_SIZE = 500
+
+
+class SearchBackend:
+    """Full-text index of :class:`cv.models.SearchEntry` for a database
+    connection."""
+
+    table = SearchEntry._meta.db_table
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        """Create the full-text index if it does not exist."""
+        raise NotImplementedError
+
+    def query(self, query, limit, offset):
+        """Return list of ``(model_name, object_id, title, url, rank)``
+        tuples of entries matching ``query``, best first."""
+        raise NotImplementedError
+
+    def execute(self, sql, params=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else None
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """Searches an external-content FTS5 table kept in sync with the
+    entries by triggers."""
+
+    fts_table = '%s_fts' % SearchBackend.table
+
+    def install(self):
+        params = {'table': self.table, 'fts': self.fts_table}
+        self.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS %(fts)s USING fts5("
+            "title, body, content='%(table)s', content_rowid='id', "
+            "tokenize='porter unicode61')" % params)
+        self.execute(
+            "CREATE TRIGGER IF NOT EXISTS %(table)s_ai AFTER INSERT ON "
+            "%(table)s BEGIN INSERT INTO %(fts)s(rowid, title, body) "
+            "VALUES (new.id, new.title, new.body); END" % params)
+        self.execute(
+            "CREATE TRIGGER IF NOT EXISTS %(table)s_ad AFTER DELETE ON "
+            "%(table)s BEGIN INSERT INTO %(fts)s(%(fts)s, rowid, title, "
+            "body) VALUES ('delete', old.id, old.title, old.body); END"
+            % params)
+        self.execute(
+            "CREATE TRIGGER IF NOT EXISTS %(table)s_au AFTER UPDATE ON "
+            "%(table)s BEGIN INSERT INTO %(fts)s(%(fts)s, rowid, title, "
+            "body) VALUES ('delete', old.id, old.title, old.body); "
+            "INSERT INTO %(fts)s(rowid, title, body) "
+            "VALUES (new.id, new.title, new.body); END" % params)
+        self.execute(
+            "INSERT INTO %(fts)s(%(fts)s) VALUES ('rebuild')" % params)
+
+    def query(self, query, limit, offset):
+        # Each word of the query must match the beginning of a word
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return []
+        match = ' '.join('"%s"*' % term for term in terms)
+        return [
+            (model_name, object_id, title, url, -rank)
+            for model_name, object_id, title, url, rank in self.execute(
+                "SELECT e.model_name, e.object_id, e.title, e.url, "
+                "bm25(%(fts)s, 10.0, 1.0) AS rank "
+                "FROM %(fts)s JOIN %(table)s e ON e.id = %(fts)s.rowid "
+                "WHERE %(fts)s MATCH %%s ORDER BY rank, e.id "
+                "LIMIT %%s OFFSET %%s" % {
+                    'table': self.table, 'fts': self.fts_table},
+                [match, limit, offset])]
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """Searches a stored ``tsvector`` column, weighting titles above other
+    text, with a GIN index."""
+
+    def __init__(self, connection):
+        super(PostgreSQLSearchBackend, self).__init__(connection)
+        if not re.match(r'^\w+$', CV_SEARCH_CONFIG):
+            raise ImproperlyConfigured(
+                'CV_SEARCH_CONFIG must be the name of a text search '
+                'configuration.')
+        self.config = CV_SEARCH_CONFIG
+
+    def install(self):
+        params = {'table': self.table, 'config': self.config}
+        self.execute(
+            "ALTER TABLE %(table)s ADD COLUMN IF NOT EXISTS document "
+            "tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('%(config)s', title), 'A') || "
+            "setweight(to_tsvector('%(config)s', body), 'B')) STORED"
+            % params)
+        self.execute(
+            "CREATE INDEX IF NOT EXISTS %(table)s_document_idx "
+            "ON %(table)s USING GIN (document)" % params)
+
+    def query(self, query, limit, offset):
+        return [tuple(row) for row in self.execute(
+            "SELECT model_name, object_id, title, url, "
+            "ts_rank_cd(document, query) AS rank "
+            "FROM %s, websearch_to_tsquery('%s', %%s) query "
+            "WHERE document @@ query ORDER BY rank DESC, id "
+            "LIMIT %%s OFFSET %%s" % (self.table, self.config),
+            [query, limit, offset])]
+
+
+SEARCH_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(using=None):
+    """Return :class:`SearchBackend` of the database of the search index,
+    or ``None`` if the database does not support full-text search."""
+    using = using or router.db_for_write(SearchEntry)
+    connection = connections[using]
+    backend = SEARCH_BACKENDS.get(connection.vendor)
+    return backend(connection) if backend else None
+
+
+def get_search_models():
+    """Return list of models included in search."""
+    return [apps.get_model('cv', name) for name in SEARCH_FIELDS]
+
+
+def get_dependencies(model):
+    """Return dictionary of models whose instances are indexed with those
+    of ``model`` and the lookups from ``model`` to them."""
+    dependencies = dict()
+    for paths in SEARCH_FIELDS[model._meta.model_name]:
+        for path in (paths,) if isinstance(paths, str) else paths:
+            opts, parts = model._meta, path.split('__')
+            for i, part in enumerate(parts[:-1]):
+                field = opts.get_field(part)
+                opts = field.related_model._meta
+                dependencies.setdefault(field.related_model, set()).add(
+                    '__'.join(parts[:i + 1]))
+    return dependencies
+
+
+@lru_cache(maxsize=None)
+def get_dependent_lookups(sender):
+    """Return list of ``(model, lookup)`` tuples of models included in
+    search whose indexed text includes instances of ``sender`` and the
+    lookups from those models to ``sender``."""
+    return [(model, lookup) for model in get_search_models()
+            for lookup in sorted(get_dependencies(model).get(sender, ()))]
+
+
+def get_url(instance):
+    """Return URL of page of ``instance`` or an empty string."""
+    try:
+        return instance.get_absolute_url()
+    except AttributeError:
+        return ''
+
+
+def get_search_entries(model, pks):
+    """Return unsaved :class:`cv.models.SearchEntry` instances for the
+    displayable instances of ``model`` with primary keys in ``pks``."""
+    instances = model.displayable.filter(pk__in=pks).only(
+        'pk', 'title', 'slug')
+    texts = {obj.pk: [] for obj in instances}
+    if not texts:
+        return []
+    for paths in SEARCH_FIELDS[model._meta.model_name]:
+        paths = (paths,) if isinstance(paths, str) else paths
+        rows = model._base_manager.filter(pk__in=texts).values_list(
+            'pk', *paths)
+        for pk, *values in rows:
+            text = ' '.join(value for value in values if value)
+            if text and text not in texts[pk]:
+                texts[pk].append(text)
+    return [
+        SearchEntry(model_name=model._meta.model_name, object_id=obj.pk,
+                    title=obj.title, body='\n'.join(texts[obj.pk]),
+                    url=get_url(obj))
+        for obj in instances]
+
+
+def update_index(model, pks):
+    """Update search entries of instances of ``model`` with primary keys in
+    ``pks``, removing those of instances that are not displayable."""
+    if model._meta.model_name not in SEARCH_FIELDS or \
+            get_search_backend() is None:
+        return
+    pks = list(pks)
+    for start in range(0, len(pks), INDEX_CHUNK_SIZE):
+        chunk = pks[start:start + INDEX_CHUNK_SIZE]
+        with transaction.atomic(router.db_for_write(SearchEntry)):
+            SearchEntry.objects.filter(
+                model_name=model._meta.model_name,
+                object_id__in=chunk).delete()
+            SearchEntry.objects.bulk_create(get_search_entries(model, chunk))
+
+
+def rebuild_index():
+    """Replace all search entries and return the number indexed."""
+    with transaction.atomic(router.db_for_write(SearchEntry)):
+        SearchEntry.objects.all().delete()
+        for model in get_search_models():
+            update_index(
+                model, model.displayable.values_list('pk', flat=True))
+    return SearchEntry.objects.count()
+
+
+class SearchResult:
+    """A work matching a search.
+
+    ``model_name``, ``pk``, ``title``, and ``url`` are read from the
+    search index; ``rank`` is higher for better matches.
+    """
+
+    def __init__(self, model_name, pk, title, url, rank):
+        self.model_name = model_name
+        self.pk = pk
+        self.title = title
+        self.url = url
+        self.rank = rank
+
+    @property
+    def model(self):
+        return apps.get_model('cv', self.model_name)
+
+    @property
+    def verbose_name(self):
+        return self.model._meta.verbose_name
+
+    def __repr__(self):
+        return '<SearchResult: %s %s>' % (self.model_name, self.pk)
+
+
+def search(query, limit=20, offset=0):
+    """Return list of at most ``limit`` :class:`SearchResult` instances for
+    works matching ``query``, best first, after skipping ``offset``.
+
+    Raises :class:`~django.core.exceptions.ImproperlyConfigured` if the
+    database does not support full-text search.
+    """
+    backend = get_search_backend()
+    if backend is None:
+        raise ImproperlyConfigured(
+            'Search requires a SQLite or PostgreSQL database.')
+    if not query.strip():
+        return []
+    return [SearchResult(*row) for row in backend.query(query, limit, offset)]
+
+
+def install_search_index(sender, using, **kwargs):
+    """Create the full-text index after the ``cv`` tables are created."""
+    backend = get_search_backend(using)
+    if backend is not None:
+        backend.install()
+
+
+def update_instance_index(sender, instance, **kwargs):
+    """Update search entry of ``instance`` after it is saved."""
+    update_index(sender, [instance.pk])
+
+
+def remove_instance_index(sender, instance, **kwargs):
+    """Remove search entry of ``instance`` after it is deleted."""
+    if get_search_backend() is not None:
+        SearchEntry.objects.filter(
+            model_name=sender._meta.model_name,
+            object_id=instance.pk).delete()
+
+
+def update_dependent_index(sender, instance, **kwargs):
+    """Update search entries of works whose indexed text includes
+    ``instance``, such as the works of an author."""
+    for model, lookup in get_dependent_lookups(sender):
+        field = None if '__' in lookup else model._meta.get_field(lookup)
+        if field is not None and field.one_to_many:
+            # The work is not found by a join after ``instance`` is deleted
+            pks = [getattr(instance, field.field.attname)]
+        else:
+            pks = model._base_manager.filter(
+                **{lookup: instance.pk}).values_list('pk', flat=True)
+        update_index(model, pks)
+
+
+def update_m2m_index(sender, instance, action, model, pk_set, **kwargs):
+    """Update search entries after many-to-many relations indexed with
+    works change (e.g., the collaborators of talks)."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if any(dependent is instance.__class__
+           for dependent, _ in get_dependent_lookups(model)):
+        update_index(instance.__class__, [instance.pk])
+    elif pk_set and any(dependent is model for dependent, _ in
+                        get_dependent_lookups(instance.__class__)):
+        update_index(model, pk_set)
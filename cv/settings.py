@@ -103,3 +103,22 @@ INREVISION_RANGE = MinMax(20, 50)
 PUBLISHED_RANGE = MinMax(50, 90)
 
 CSL_STYLE = getattr(settings,'CV_CSL_STYLE','harvard1')
+
+CV_CONCURRENT_QUERIES = getattr(settings, 'CV_CONCURRENT_QUERIES', None)
+
+CV_CACHE_ALIAS = getattr(settings, 'CV_CACHE_ALIAS', 'default')
+CV_CACHE_TIMEOUT = getattr(settings, 'CV_CACHE_TIMEOUT', 60 * 60 * 24)
+
+CV_AUTOCOMPLETE_PAGE_SIZE = getattr(settings, 'CV_AUTOCOMPLETE_PAGE_SIZE', 20)
+
+CV_SECTION_PAGE_SIZE = getattr(settings, 'CV_SECTION_PAGE_SIZE', 50)
+
+CV_API_PAGE_SIZE = getattr(settings, 'CV_API_PAGE_SIZE', 50)
+CV_API_MAX_PAGE_SIZE = getattr(settings, 'CV_API_MAX_PAGE_SIZE', 500)
+
+CV_SEARCH_CONFIG = getattr(settings, 'CV_SEARCH_CONFIG', 'english')
+CV_SEARCH_PAGE_SIZE = getattr(settings, 'CV_SEARCH_PAGE_SIZE', 20)
+
+CV_PROFILES = getattr(settings, 'CV_PROFILES', {})
+
+CV_PDF_QUEUE = getattr(settings, 'CV_PDF_QUEUE', False)
@@ -1,18 +1,85 @@
 from django.apps import apps
 from django.db.models import Max
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete, \
+    m2m_changed, post_migrate
 from django.dispatch import receiver
 from django.utils import timezone
 
-from cv.models import CourseOffering
+from cv import builds, search
+from cv.models import CourseOffering, CVRevision, CVFile, \
+    DisplayableModel, PDFBuild, SearchEntry
 
 
 def validate_model(sender, **kwargs):
     kwargs['instance'].full_clean()
 
 
+def bump_revision(sender, **kwargs):
+    """Increment the CV revision when CV data changes."""
+    CVRevision.objects.bump()
+
+
+def enqueue_pdf_builds(sender, **kwargs):
+    """Queue builds of the PDFs of CV profiles when a transaction that
+    changes CV data commits."""
+    builds.enqueue_builds()
+
+
+def get_parent_fields(model):
+    """Return foreign keys of ``model`` to instances that depend on it."""
+    return [field for field in model._meta.concrete_fields
+            if field.many_to_one and field.name != 'collaborator' and
+            issubclass(field.related_model, DisplayableModel)]
+
+
+def touch_parents(sender, instance, **kwargs):
+    """Update ``modified`` of CV items that depend on ``instance``.
+
+    Authorships, editions, files, etc. are displayed as part of another
+    instance. Updating the ``modified`` field of that instance allows
+    ``CVQuerySet.changed_since`` to find it with a single indexed filter.
+    """
+    now = timezone.now()
+    if isinstance(instance, CVFile):
+        model = instance.content_type.model_class()
+        if model is not None and issubclass(model, DisplayableModel):
+            model._base_manager.filter(pk=instance.object_id).update(
+                modified=now)
+        return
+    for field in get_parent_fields(sender):
+        field.related_model._base_manager.filter(
+            pk=getattr(instance, field.attname)).update(modified=now)
+
+
 for model in apps.get_app_config('cv').get_models():
     pre_save.connect(validate_model, sender=model)
+    if model not in (CVRevision, PDFBuild, SearchEntry):
+        post_save.connect(bump_revision, sender=model)
+        post_delete.connect(bump_revision, sender=model)
+        post_save.connect(enqueue_pdf_builds, sender=model)
+        post_delete.connect(enqueue_pdf_builds, sender=model)
+    if model is CVFile or get_parent_fields(model):
+        post_save.connect(touch_parents, sender=model)
+        post_delete.connect(touch_parents, sender=model)
+    if model._meta.model_name in search.SEARCH_FIELDS:
+        post_save.connect(search.update_instance_index, sender=model)
+        post_delete.connect(search.remove_instance_index, sender=model)
+    if search.get_dependent_lookups(model):
+        post_save.connect(search.update_dependent_index, sender=model)
+        post_delete.connect(search.update_dependent_index, sender=model)
+
+m2m_changed.connect(search.update_m2m_index)
+post_migrate.connect(
+    search.install_search_index, sender=apps.get_app_config('cv'))
+
+
+@receiver(m2m_changed)
+def bump_revision_on_m2m_change(sender, action, **kwargs):
+    """Increment the CV revision when relations between CV data change."""
+    if (sender._meta.app_label == 'cv' and
+       action in ['post_add', 'post_remove', 'post_clear']):
+        bump_revision(sender, **kwargs)
+        enqueue_pdf_builds(sender, **kwargs)
 
 
 @receiver(post_save, sender=CourseOffering)
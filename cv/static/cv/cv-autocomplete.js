@@ -0,0 +1,53 @@
+// Turns select elements with a `data-autocomplete-url` attribute into
+// searchable selects. The page only includes the selected options; other
+// options are requested from the server one small page at a time.
+(function($) {
+    "use strict";
+
+    function search(select, input, page) {
+        var params = {q: input.val(), page: page};
+        $.getJSON(select.data("autocomplete-url"), params, function(data) {
+            if (page === 1) {
+                select.find("option").not(":selected")
+                    .not("[value='']").remove();
+            }
+            select.find("option.cv-autocomplete-more").remove();
+            $.each(data.results, function(i, result) {
+                if (!select.find("option[value='" + result.id + "']").length) {
+                    select.append(
+                        $("<option>").val(result.id).text(result.text));
+                }
+            });
+            if (data.more) {
+                select.append($("<option>").prop("disabled", true)
+                    .addClass("cv-autocomplete-more")
+                    .text("… type more to narrow results"));
+            }
+            select.data("page", page).data("more", data.more);
+        });
+    }
+
+    $(function() {
+        $("select[data-autocomplete-url]").each(function() {
+            var select = $(this);
+            var input = $("<input type='search'>")
+                .addClass("form-control form-control-sm cv-autocomplete")
+                .attr("placeholder", "Search…");
+            var timer;
+            select.before(input);
+            input.on("input", function() {
+                clearTimeout(timer);
+                timer = setTimeout(function() { search(select, input, 1); },
+                                   250);
+            });
+            select.on("scroll", function() {
+                var nearBottom = this.scrollTop + this.clientHeight >=
+                    this.scrollHeight - 20;
+                if (nearBottom && select.data("more")) {
+                    select.data("more", false);
+                    search(select, input, select.data("page") + 1);
+                }
+            });
+        });
+    });
+})(jQuery);
@@ -0,0 +1,177 @@
+"""Export the CV as a static website.
+
+:func:`get_pages` lists every page of the CV: the CV, the list of each
+section, the page and citations of each work, and the PDF. :func:`export`
+renders the pages with the views of the site and writes each to a file
+under a directory, next to a gzip-compressed copy that static web servers
+can serve as is. Pages are rendered in a pool of processes, each with its
+own database connection.
+"""
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.test import RequestFactory
+from django.urls import reverse
+
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+import os
+
+# Models and views are imported when needed, so that worker processes
+# started with spawn can import this module before setting up Django
+
+CITATION_FORMATS = ('ris', 'bib')
+
+EXTENSIONS = {
+    'text/html': 'html',
+    'application/pdf': 'pdf',
+    'application/x-research-info-systems': 'ris',
+    'application/x-bibtex': 'bib',
+}
+"""Extensions of the files of pages by content type."""
+
+REDIRECT_PAGE = (
+    '<!DOCTYPE html><html><head><meta charset="utf-8">'
+    '<meta http-equiv="refresh" content="0; url=%(name)s">'
+    '<title>%(name)s</title></head>'
+    '<body><a href="%(name)s">%(name)s</a></body></html>')
+"""Page written as ``index.html`` next to pages that are not HTML, so that
+static web servers, which serve ``index.html`` for the URL of a directory,
+send visitors of the URL of the page to its file."""
+
+
+def get_views():
+    """Return dictionary of the views that render each kind of page.
+    Sections are listed on a single page since static pages cannot read
+    the cursor of the next page."""
+    from cv.views import CVDetailView, CVListView, CVView, citation_view, \
+        cv_pdf
+    return {
+        'cv_list': CVView.as_view(),
+        'section_list': CVListView.as_view(per_page=None),
+        'item_detail': CVDetailView.as_view(),
+        'citation': citation_view,
+        'cv_pdf': cv_pdf,
+    }
+
+
+def template_exists(template_name):
+    """Return ``True`` if ``template_name`` is found."""
+    try:
+        get_template(template_name)
+    except TemplateDoesNotExist:
+        return False
+    return True
+
+
+def get_pages():
+    """Return list of the URL name and arguments of every page."""
+    from cv.views import MODELS, CITATION_VIEWS_AVAILABLE, \
+        DETAIL_VIEWS_AVAILABLE
+    pages = [('cv_list', {}), ('cv_pdf', {})]
+    for model in MODELS:
+        model_name = model._meta.model_name
+        if template_exists('cv/lists/%s_list.html' % model_name):
+            pages.append(('section_list', {'model_name': model_name}))
+        if model_name not in DETAIL_VIEWS_AVAILABLE:
+            continue
+        formats = [f for f in CITATION_FORMATS
+                   if model_name in CITATION_VIEWS_AVAILABLE and
+                   template_exists('cv/citations/%s.%s' % (model_name, f))]
+        detail = template_exists('cv/details/%s_detail.html' % model_name)
+        for slug in model.displayable.values_list('slug', flat=True):
+            kwargs = {'model_name': model_name, 'slug': slug}
+            if detail:
+                pages.append(('item_detail', kwargs))
+            pages += [('citation', dict(kwargs, format=f)) for f in formats]
+    return pages
+
+
+def get_content(response):
+    """Return content of ``response``, rendering templates and joining
+    streamed content."""
+    if hasattr(response, 'render'):
+        response.render()
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def write_file(path, content):
+    """Write ``content`` to ``path`` and its compressed copy to
+    ``<path>.gz``."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    with open(path + '.gz', 'wb') as f:
+        # A fixed time keeps the output identical between exports
+        f.write(gzip.compress(content, 9, mtime=0))
+
+
+def render_page(directory, page, views):
+    """Render ``page``, a URL name and its arguments, with ``views`` and
+    write it under ``directory``. Returns the path of the file.
+
+    Pages are written as the ``index`` file of the directory of their URL.
+    Pages that are not HTML, such as the PDF, are written with their own
+    extension next to an ``index.html`` page that redirects to them.
+    """
+    from django.contrib.auth.models import AnonymousUser
+    name, kwargs = page
+    path = reverse('cv:%s' % name, kwargs=kwargs)
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    response = views[name](request, **kwargs)
+    if response.status_code != 200:
+        raise ValueError('%s returned status %s' % (
+            path, response.status_code))
+    content_type = response['Content-Type'].split(';')[0]
+    filename = 'index.%s' % EXTENSIONS.get(content_type, 'html')
+    file_path = os.path.join(directory, path.strip('/'), filename)
+    write_file(file_path, get_content(response))
+    if filename != 'index.html':
+        write_file(os.path.join(os.path.dirname(file_path), 'index.html'),
+                   (REDIRECT_PAGE % {'name': filename}).encode('utf-8'))
+    return file_path
+
+
+def setup_worker():
+    """Set up Django in a worker process. The worker opens its own
+    database connection on its first query.
+
+    Workers started with ``fork`` (the default on Linux) inherit the
+    settings of this process. Workers started with ``spawn`` load the
+    settings module named by ``DJANGO_SETTINGS_MODULE`` instead, so
+    settings given to ``settings.configure()`` are not available to them.
+    """
+    import django
+    django.setup()
+
+
+def render_pages(directory, pages):
+    """Render ``pages`` under ``directory`` and return the list of paths of
+    the files written."""
+    views = get_views()
+    return [render_page(directory, page, views) for page in pages]
+
+
+def export(directory, workers=None, chunk_size=50):
+    """Render every page of the CV under ``directory`` and return the list
+    of paths of the files written.
+
+    Pages are rendered by ``workers`` processes (by default, one for each
+    CPU) in chunks of ``chunk_size`` pages. With one worker, pages are
+    rendered in this process.
+    """
+    pages = get_pages()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return render_pages(directory, pages)
+    chunks = [pages[i:i + chunk_size]
+              for i in range(0, len(pages), chunk_size)]
+    # Workers must not share the connections of this process
+    connections.close_all()
+    with ProcessPoolExecutor(workers, initializer=setup_worker) as executor:
+        results = executor.map(
+            render_pages, [directory] * len(chunks), chunks)
+        return [path for paths in results for path in paths]
@@ -0,0 +1,170 @@
+"""List CV works of all types in reverse chronological order.
+
+The timeline is a single ``UNION ALL`` query of the type, primary key,
+date, and title of published articles, books, chapters, and reports,
+presentations of talks, grants, awards, and media mentions. Pages are
+selected by keyset pagination: the position after the last entry of the
+previous page is applied to each part of the union, so that each part can
+use the index of its date column. Entries carry only the projected
+columns; :func:`hydrate` fetches the full objects of a page with one query
+per type on the page.
+"""
+from django.apps import apps
+from django.core.paginator import InvalidPage
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Coalesce
+
+from cv.pagination import KeysetPage, decode_cursor, encode_cursor, \
+    keyset_condition
+
+
+TIMELINE_SOURCES = (
+    ('article', 'pub_date', 'title'),
+    ('book', 'pub_date', 'title'),
+    ('chapter', 'pub_date', 'title'),
+    ('report', 'pub_date', 'title'),
+    ('presentation', 'presentation_date', 'talk__title'),
+    ('grant', 'start_date', 'title'),
+    ('award', 'date', 'name'),
+    ('mediamention', 'date', ('title', 'outlet')),
+)
+"""Names of models in the timeline and their date and title fields. The
+first title that is not ``NULL`` is used if several are given."""
+
+TIMELINE_KEYSET = [
+    ('entry_date', True), ('entry_type', True), ('entry_id', True)]
+"""Ordering of the timeline as ``(name, descending)`` tuples."""
+
+
+class TimelineEntry:
+    """An entry of the timeline.
+
+    ``type``, ``pk``, ``date``, and ``title`` are read by the timeline
+    query. ``object`` is the instance of the entry, fetched when first
+    accessed unless it was fetched by :func:`hydrate`.
+    """
+
+    def __init__(self, type, pk, date, title):
+        self.type = type
+        self.pk = pk
+        self.date = date
+        self.title = title
+
+    @property
+    def model(self):
+        return apps.get_model('cv', self.type)
+
+    @property
+    def verbose_name(self):
+        return self.model._meta.verbose_name
+
+    @property
+    def object(self):
+        if not hasattr(self, '_object'):
+            hydrate([self])
+        return self._object
+
+    @property
+    def url(self):
+        """Return URL of the page of the entry or an empty string."""
+        obj = self.object
+        if self.type == 'presentation' and obj is not None:
+            obj = obj.talk
+        try:
+            return obj.get_absolute_url()
+        except AttributeError:
+            return ''
+
+    def __repr__(self):
+        return '<TimelineEntry: %s %s (%s)>' % (self.type, self.pk, self.date)
+
+
+def get_source_queryset(model):
+    """Return queryset of the instances of ``model`` in the timeline."""
+    if model._meta.model_name == 'presentation':
+        return model.objects.filter(talk__display=True)
+    if hasattr(model.displayable, 'published'):
+        return model.displayable.published()
+    return model.displayable.all()
+
+
+def get_entry_querysets(types=None):
+    """Return list of querysets of the entries of each model in the
+    timeline, or of the models named in ``types``."""
+    querysets = list()
+    for name, date, title in TIMELINE_SOURCES:
+        if types is not None and name not in types:
+            continue
+        model = apps.get_model('cv', name)
+        title = F(title) if isinstance(title, str) else Coalesce(*title)
+        querysets.append(get_source_queryset(model).order_by().filter(
+            **{date + '__isnull': False}).annotate(
+            entry_type=Value(name, output_field=CharField()),
+            entry_id=F('pk'),
+            entry_date=F(date),
+            entry_title=title,
+        ).values('entry_type', 'entry_id', 'entry_date', 'entry_title'))
+    return querysets
+
+
+def timeline_queryset(types=None, after=None):
+    """Return ``UNION ALL`` queryset of dictionaries with the
+    ``entry_type``, ``entry_id``, ``entry_date``, and ``entry_title`` of
+    the timeline, newest first.
+
+    ``types`` limits the timeline to the named models. ``after`` is a list
+    of the date, type, and primary key of an entry; only entries that
+    follow it are returned.
+    """
+    querysets = get_entry_querysets(types)
+    if after is not None:
+        condition = keyset_condition(TIMELINE_KEYSET, after)
+        querysets = [qs.filter(condition) for qs in querysets]
+    if not querysets:
+        return apps.get_model('cv', 'award').objects.none()
+    return querysets[0].union(*querysets[1:], all=True).order_by(
+        *['-%s' % name for name, _ in TIMELINE_KEYSET])
+
+
+def paginate_timeline(cursor=None, per_page=50, types=None):
+    """Return :class:`~cv.pagination.KeysetPage` of at most ``per_page``
+    :class:`TimelineEntry` instances after the position of ``cursor``.
+
+    Raises :class:`~django.core.paginator.InvalidPage` for invalid
+    cursors.
+    """
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        if len(after) != len(TIMELINE_KEYSET):
+            raise InvalidPage('Invalid cursor.')
+    rows = list(timeline_queryset(types, after)[:per_page + 1])
+    entries = [TimelineEntry(row['entry_type'], row['entry_id'],
+                             row['entry_date'], row['entry_title'])
+               for row in rows[:per_page]]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = entries[-1]
+        next_cursor = encode_cursor([last.date, last.type, last.pk])
+    return KeysetPage(entries, next_cursor)
+
+
+def hydrate(entries):
+    """Fetch the instances of ``entries`` with one query per type and
+    return ``entries``.
+
+    Entries whose instance no longer exists get ``None`` as ``object``.
+    """
+    pks = dict()
+    for entry in entries:
+        pks.setdefault(entry.type, []).append(entry.pk)
+    objects = dict()
+    for name, type_pks in pks.items():
+        model = apps.get_model('cv', name)
+        queryset = model._base_manager.all()
+        if name == 'presentation':
+            queryset = queryset.select_related('talk')
+        objects[name] = queryset.in_bulk(type_pks)
+    for entry in entries:
+        entry._object = objects[entry.type].get(entry.pk)
+    return entries
@@ -6,10 +6,24 @@ app_name = 'cv'
 urlpatterns = [
     path('', views.CVView.as_view(), name='cv_list'),
     path('pdf/', views.cv_pdf, name='cv_pdf'),
+    path('pdf/status/', views.cv_pdf_status, name='cv_pdf_status'),
+    path('export/<str:format>/', views.cv_export, name='cv_export'),
 
     path('forms/<str:model_name>/add/', views.CVCreateView.as_view(),name='cv_add'),
     path('forms/<str:model_name>/<int:pk>/edit/', views.CVUpdateView.as_view(),name='cv_edit'),
     path('forms/<str:model_name>/<int:pk>/delete/',views.CVDeleteView.as_view(), name='cv_delete'),
+    path('autocomplete/<str:model_name>/', views.autocomplete_view, name='autocomplete'),
+    path('batch/', views.batch_view, name='batch'),
+
+    path('search/', views.search_view, name='search'),
+    path('browse/', views.facet_view, name='browse'),
+    path('timeline/', views.timeline_view, name='timeline'),
+
+    path('api/', views.api_index_view, name='api_index'),
+    path('api/search/', views.api_search_view, name='api_search'),
+    path('api/timeline/', views.api_timeline_view, name='api_timeline'),
+    path('api/<str:model_name>s/', views.api_list_view, name='api_list'),
+    path('api/<str:model_name>s/<int:pk>/', views.api_detail_view, name='api_detail'),
 
     path('<str:model_name>s/', views.CVListView.as_view(), name='section_list'),
     path('<str:model_name>s/<slug:slug>/', views.CVDetailView.as_view(), name='item_detail'),
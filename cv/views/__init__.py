@@ -1,16 +1,41 @@
+from asgiref.sync import sync_to_async
 from django.apps import apps
-from django.http import Http404
+from django.db import close_old_connections, connections
+from django.db.models.query import QuerySet
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
 from django.views import generic
 
-from sys import modules
+import asyncio
 
+try:
+    from asgiref.sync import markcoroutinefunction
+except ImportError:  # asgiref < 3.6
+    def markcoroutinefunction(func):
+        func._is_coroutine = asyncio.coroutines._is_coroutine
+        return func
+
+from cv.cache import get_cv_cache, make_key
+from cv.pagination import keyset_paginate_groups
+from cv.profiles import get_profile, section_queryset
+from cv.settings import CV_CACHE_TIMEOUT, CV_CONCURRENT_QUERIES, \
+    CV_SECTION_PAGE_SIZE
 from cv.models import Award, Position, Degree, \
     Article, Book, Chapter, Report, \
     Grant, Talk, OtherWriting, Dataset, \
     MediaMention, Service, JournalService, Student, Course
-from .pdf import cv_pdf
-from .forms import CVCreateView, CVUpdateView, CVDeleteView
+from cv.windows import parse_window, window_condition, window_queryset
+from .conditional import revision_condition, RevisionConditionMixin
+from .pdf import cv_pdf, cv_pdf_status
+from .forms import CVCreateView, CVUpdateView, CVDeleteView, \
+    autocomplete_view
+from .batch import batch_view
+from .api import api_index_view, api_list_view, api_detail_view
+from .search import search_view, api_search_view
+from .facets import facet_view
+from .timeline import timeline_view, api_timeline_view
+from .export import cv_export
 
 
 MODELS = [Award, Position, Degree,
@@ -27,33 +52,148 @@ class CVListMixin:
         """Sum items across dictionaries."""
         return sum([len(i) for i in dict.values()])
 
-    def get_cv_list(self, model):
-        """Gather data for CV section into dictionaries."""
+    def get_window_years(self):
+        """Return the ``years`` parameter of the request."""
+        request = getattr(self, 'request', None)
+        return request.GET.get('years') if request else None
+
+    def get_window_start(self):
+        """Return first date of the window of years selected by the
+        ``years`` parameter of the request, or ``None`` for the full CV
+        (see :mod:`cv.windows`)."""
+        if not hasattr(self, 'window_start'):
+            self.window_start = parse_window(self.get_window_years())
+        return self.window_start
+
+    def get_cv_querysets(self, model):
+        """Return dictionary of unevaluated querysets for CV section."""
         model_name = model._meta.model_name.lower()
-        model_plural = model._meta.verbose_name_plural.lower()
+        since = self.get_window_start()
         if hasattr(model.displayable, 'management_lists'):
-            management_lists = model.displayable.management_lists
             data_dict = dict()
-            for mgr in management_lists:
+            for mgr in model.displayable.management_lists:
                 method = getattr(model.displayable, mgr)
                 context_key = '{0}_{1}_list'.format(model_name, mgr)
-                data_dict[context_key] = method()
+                data_dict[context_key] = window_queryset(method(), since)
+            return data_dict
+        return {'{}_list'.format(model_name): window_queryset(
+            model.displayable.all(), since)}
+
+    def add_cv_totals(self, model, data_dict):
+        """Add total number of items to dictionary of section querysets."""
+        if hasattr(model.displayable, 'management_lists'):
+            model_plural = model._meta.verbose_name_plural.lower()
             total_key = 'total_{}'.format(model_plural)
             data_dict[total_key] = self.sum_items(data_dict)
-            return data_dict
-        return {'{}_list'.format(model_name): model.displayable.all()}
+        return data_dict
+
+    def get_cv_list(self, model):
+        """Gather data for CV section into dictionaries."""
+        return self.add_cv_totals(model, self.get_cv_querysets(model))
+
+    def get_profile_querysets(self, model, section):
+        """Return dictionary of unevaluated querysets for CV section
+        limited to the subsections, filters, and limit of a ``section`` of a
+        :class:`~cv.profiles.Profile`."""
+        model_name = model._meta.model_name.lower()
+        data_dict = self.get_cv_querysets(model)
+        subsections = section.get('subsections')
+        if subsections is not None:
+            managers = [manager for _, manager in subsections]
+            for mgr in model.displayable.management_lists:
+                if mgr not in managers:
+                    key = '{0}_{1}_list'.format(model_name, mgr)
+                    data_dict[key] = data_dict[key].none()
+        for key, queryset in data_dict.items():
+            data_dict[key] = section_queryset(queryset, section)
+        return data_dict
+
+    def get_profile_list(self, model, section):
+        """Gather data for CV section of a ``section`` of a
+        :class:`~cv.profiles.Profile` into dictionaries."""
+        return self.add_cv_totals(
+            model, self.get_profile_querysets(model, section))
+
+    def get_cv_page(self, model, cursor=None, per_page=CV_SECTION_PAGE_SIZE):
+        """Return dictionary with one page of the lists of a CV section and
+        the :class:`~cv.pagination.KeysetGroupPage` of the lists.
+
+        The lists of a section (for example, published, under review, and
+        in preparation articles) are paginated one after another. Totals
+        for the whole section and the number of items in each list are
+        counted with a single aggregate query.
+        """
+        groups = list(self.get_cv_querysets(model).items())
+        try:
+            page = keyset_paginate_groups(groups, cursor, per_page)
+        except InvalidPage as e:
+            raise Http404(str(e))
+        data_dict = dict(page.object_lists)
+        if hasattr(model.displayable, 'management_lists'):
+            model_name = model._meta.model_name.lower()
+            model_plural = model._meta.verbose_name_plural.lower()
+            counts = model.displayable.count_management_lists(
+                window_condition(model, self.get_window_start()))
+            for mgr, count in counts.items():
+                data_dict['{0}_{1}_count'.format(model_name, mgr)] = count
+            data_dict['total_{}'.format(model_plural)] = sum(counts.values())
+        return data_dict, page
 
     def get_cv_primary_positions(self):
         """Return dictionary of CV data with current positions."""
         return {'primary_positions': Position.primarypositions.all()}
 
 
-class CVView(generic.TemplateView, CVListMixin):
-    """An HTML representation of a CV."""
+class CVView(RevisionConditionMixin, generic.TemplateView, CVListMixin):
+    """An HTML representation of a CV.
+
+    The ``profile`` parameter selects a :class:`~cv.profiles.Profile` of
+    the CV and the ``years`` parameter limits the CV to the last number of
+    years. Pages for anonymous visitors are cached for each profile and
+    window until the CV changes.
+    """
     template_name = 'cv/cv.html'
+    profile_template_name = 'cv/profile.html'
+
+    def get_profile(self):
+        """Return profile selected by the ``profile`` parameter."""
+        if not hasattr(self, 'profile'):
+            try:
+                self.profile = get_profile(self.request.GET.get('profile'))
+            except LookupError as e:
+                raise Http404(str(e))
+        return self.profile
+
+    def get_window_years(self):
+        """Return the ``years`` parameter or the years of the profile."""
+        return super(CVView, self).get_window_years() or \
+            self.get_profile().years
+
+    def get_template_names(self):
+        if self.get_profile().complete:
+            return [self.template_name]
+        return [self.profile_template_name]
+
+    def get(self, request, *args, **kwargs):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return super(CVView, self).get(request, *args, **kwargs)
+        key = make_key('cv_html.%s' % self.get_profile().name,
+                       self.get_window_start())
+        cache = get_cv_cache()
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content)
+        response = super(CVView, self).get(request, *args, **kwargs)
+        response.add_post_render_callback(
+            lambda r: cache.set(key, r.content, CV_CACHE_TIMEOUT))
+        return response
 
     def get_context_data(self, **kwargs):
         """Return dictionary of different types of CV entries."""
+        profile = self.get_profile()
+        if not profile.complete:
+            return self.get_profile_context_data(profile)
         cv_entry_list = [self.get_cv_list(model) for model in MODELS]
         cv_entry_list += [self.get_cv_primary_positions()]
         context = dict()
@@ -61,6 +201,134 @@ class CVView(generic.TemplateView, CVListMixin):
             context.update(f)
         return context
 
+    def get_profile_context_data(self, profile):
+        """Return dictionary of the sections of ``profile``.
+
+        ``profile_sections`` lists the templates of the sections in order.
+        """
+        context = {'profile': profile, 'profile_sections': []}
+        for section, template in profile.get_html_sections():
+            model = apps.get_model('cv', section['model_name'])
+            context.update(self.get_profile_list(model, section))
+            context['profile_sections'].append(
+                {'model_name': section['model_name'], 'template': template})
+        context.update(self.get_cv_primary_positions())
+        return context
+
+
+def evaluate_queryset(queryset):
+    """Fill result cache of ``queryset`` and release worker's connection."""
+    try:
+        len(queryset)
+    finally:
+        close_old_connections()
+    return queryset
+
+
+def can_query_concurrently(querysets, concurrent=None):
+    """Return ``True`` if ``querysets`` may be evaluated on separate
+    connections.
+
+    SQLite connections and connections inside of a transaction cannot
+    see the same data from other threads, so those querysets are always
+    evaluated in sequence on the request's own connection.
+    """
+    if concurrent is not None:
+        return concurrent
+    for alias in set(qs.db for qs in querysets):
+        connection = connections[alias]
+        if connection.vendor == 'sqlite' or connection.in_atomic_block:
+            return False
+    return True
+
+
+async def gather_querysets(data_dict, concurrent=None):
+    """Evaluate querysets in ``data_dict`` and return the dictionary.
+
+    Querysets are evaluated concurrently, each in its own thread and
+    on its own database connection, when :func:`can_query_concurrently`
+    allows it. Otherwise they are evaluated one after another in the
+    thread that handles the request. Either way, the querysets keep
+    their result cache so that templates can use them as before.
+    """
+    querysets = [v for v in data_dict.values() if isinstance(v, QuerySet)]
+    if can_query_concurrently(querysets, concurrent):
+        await asyncio.gather(*[
+            sync_to_async(evaluate_queryset, thread_sensitive=False)(qs)
+            for qs in querysets])
+    else:
+        def evaluate_all():
+            for qs in querysets:
+                len(qs)
+        await sync_to_async(evaluate_all, thread_sensitive=True)()
+    return data_dict
+
+
+class AsyncViewMixin:
+    """Mark ``as_view()`` output as a coroutine function so that Django
+    awaits the asynchronous ``get()`` handler."""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        markcoroutinefunction(view)
+        return view
+
+
+class AsyncCVListMixin(CVListMixin):
+    """Asynchronous counterpart of :class:`CVListMixin`.
+
+    Set ``concurrent_queries`` to ``True`` or ``False`` to override the
+    :setting:`CV_CONCURRENT_QUERIES` setting for a single view.
+    """
+    concurrent_queries = CV_CONCURRENT_QUERIES
+
+    async def aget_cv_lists(self, models):
+        """Return dictionary of evaluated CV data for all ``models``."""
+        data_dicts = [(model, self.get_cv_querysets(model))
+                      for model in models]
+        combined = dict()
+        for model, data_dict in data_dicts:
+            combined.update(data_dict)
+        combined.update(self.get_cv_primary_positions())
+        await gather_querysets(combined, self.concurrent_queries)
+        for model, data_dict in data_dicts:
+            combined.update(self.add_cv_totals(model, data_dict))
+        return combined
+
+    async def aget_profile_lists(self, profile):
+        """Return dictionary of evaluated CV data for the sections of
+        ``profile`` (see :meth:`CVView.get_profile_context_data`)."""
+        context = {'profile': profile, 'profile_sections': []}
+        data_dicts = list()
+        for section, template in profile.get_html_sections():
+            model = apps.get_model('cv', section['model_name'])
+            data_dict = self.get_profile_querysets(model, section)
+            data_dicts.append((model, data_dict))
+            context.update(data_dict)
+            context['profile_sections'].append(
+                {'model_name': section['model_name'], 'template': template})
+        context.update(self.get_cv_primary_positions())
+        await gather_querysets(context, self.concurrent_queries)
+        for model, data_dict in data_dicts:
+            context.update(self.add_cv_totals(model, data_dict))
+        return context
+
+
+class AsyncCVView(AsyncViewMixin, AsyncCVListMixin, CVView):
+    """An HTML representation of a CV that gathers sections concurrently.
+
+    Produces the same page as :class:`CVView` for each profile and window.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        profile = self.get_profile()
+        if profile.complete:
+            context = await self.aget_cv_lists(MODELS)
+        else:
+            context = await self.aget_profile_lists(profile)
+        return self.render_to_response(context)
+
 
 # Views
 DETAIL_VIEWS_AVAILABLE = [
@@ -69,8 +337,16 @@ DETAIL_VIEWS_AVAILABLE = [
 CITATION_VIEWS_AVAILABLE = DETAIL_VIEWS_AVAILABLE
 
 
-class CVListView(generic.ListView, CVListMixin):
-    """Creates view of all instances for a particular section."""
+class CVListView(RevisionConditionMixin, generic.ListView, CVListMixin):
+    """Creates view of all instances for a particular section.
+
+    Sections are split into pages of ``per_page`` items (by default
+    :setting:`CV_SECTION_PAGE_SIZE`) selected by the ``cursor`` parameter
+    of the request. Set ``per_page`` to ``None`` to list every item on
+    one page.
+    """
+    per_page = CV_SECTION_PAGE_SIZE
+    page = None
 
     def dispatch(self, request, *args, **kwargs):
         """Set class parameters based on URL and dispatch."""
@@ -81,8 +357,25 @@ class CVListView(generic.ListView, CVListMixin):
         return super().dispatch(request, *args, **kwargs)
 
     def get_queryset(self):
-        mod = modules[__name__]
-        return self.get_cv_list(self.model)
+        if not self.per_page:
+            return self.get_cv_list(self.model)
+        data_dict, self.page = self.get_cv_page(
+            self.model, self.request.GET.get('cursor'), self.per_page)
+        return data_dict
+
+    def get_context_data(self, **kwargs):
+        """Add lists of the section and link to the next page to context."""
+        context = super(CVListView, self).get_context_data(**kwargs)
+        context.update(self.object_list)
+        context['is_paginated'] = bool(
+            self.page and (self.page.has_next or
+                           'cursor' in self.request.GET))
+        context['next_page_url'] = None
+        if self.page and self.page.has_next:
+            params = self.request.GET.copy()
+            params['cursor'] = self.page.next_cursor
+            context['next_page_url'] = '?%s' % params.urlencode()
+        return context
 
     def get_template_names(self):
         """
@@ -95,7 +388,23 @@ class CVListView(generic.ListView, CVListMixin):
         return ['cv/lists/%s_list.html' % (self.model_name)]
 
 
-class CVDetailView(generic.DetailView):
+class AsyncCVListView(AsyncViewMixin, AsyncCVListMixin, CVListView):
+    """Asynchronous variant of :class:`CVListView` that evaluates the
+    querysets of a section concurrently when the section is not paginated
+    (``per_page = None``)."""
+
+    async def get(self, request, *args, **kwargs):
+        if self.per_page:
+            self.object_list = await sync_to_async(self.get_queryset)()
+        else:
+            data_dict = self.get_cv_querysets(self.model)
+            await gather_querysets(data_dict, self.concurrent_queries)
+            self.object_list = self.add_cv_totals(self.model, data_dict)
+        context = self.get_context_data()
+        return self.render_to_response(context)
+
+
+class CVDetailView(RevisionConditionMixin, generic.DetailView):
     """Creates view of a single instance of a CV item."""
 
     def dispatch(self, request, *args, **kwargs):
@@ -119,6 +428,7 @@ class CVDetailView(generic.DetailView):
         return ['cv/details/%s_detail.html' % (self.model_name)]
 
 
+@revision_condition
 def citation_view(request, model_name, slug, format):
     """Returns view to allow citation to be downloaded to citation management
     software.
@@ -0,0 +1,287 @@
+"""Read-only JSON API of CV data."""
+from django.apps import apps
+from django.contrib.contenttypes.fields import GenericRelation
+from django.core.paginator import InvalidPage
+from django.db.models import FileField, Prefetch
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+
+from functools import lru_cache, wraps
+
+from cv.models.base import CollaborationModel, DisplayableModel
+from cv.pagination import keyset_paginate
+from cv.settings import CV_API_PAGE_SIZE, CV_API_MAX_PAGE_SIZE
+
+from .conditional import revision_condition
+
+
+class APIError(Exception):
+    """Raised for invalid API requests; returned as ``400`` responses."""
+
+
+@lru_cache(maxsize=None)
+def get_api_models():
+    """Return dictionary of model names and CV models available in API."""
+    return {
+        model._meta.model_name: model
+        for model in apps.get_app_config('cv').get_models()
+        if issubclass(model, DisplayableModel)
+    }
+
+
+def get_api_model(model_name):
+    """Return CV model named ``model_name`` or raise ``Http404``."""
+    try:
+        return get_api_models()[model_name]
+    except KeyError:
+        raise Http404('API not available for {0}s'.format(model_name))
+
+
+@lru_cache(maxsize=None)
+def get_api_fields(model):
+    """Return dictionary of names and ``(kind, field)`` tuples of fields of
+    ``model`` that can be selected in the API.
+
+    The ``kind`` determines how a field is fetched and serialized:
+
+    ``value``, ``file``, and ``foreign_key``
+        Columns of the model's table.
+    ``collaborations``
+        Authorships, editorships, and grant collaborations.
+    ``related``
+        Other items that belong to the instance (e.g., presentations of
+        talks or editions of books).
+    ``many``
+        Many-to-many relationships, such as grants and disciplines.
+    ``files``
+        Files attached to the instance.
+    """
+    fields = dict()
+    for field in model._meta.concrete_fields:
+        if field.many_to_one or field.one_to_one:
+            fields[field.name] = ('foreign_key', field)
+        elif isinstance(field, FileField):
+            fields[field.name] = ('file', field)
+        else:
+            fields[field.name] = ('value', field)
+    for rel in model._meta.related_objects:
+        if rel.one_to_many:
+            kind = ('collaborations'
+                    if issubclass(rel.related_model, CollaborationModel)
+                    else 'related')
+            fields[rel.get_accessor_name()] = (kind, rel)
+    for field in model._meta.many_to_many:
+        if field.remote_field.through._meta.auto_created:
+            fields[field.name] = ('many', field)
+    for field in model._meta.private_fields:
+        if isinstance(field, GenericRelation):
+            fields[field.name] = ('files', field)
+    return fields
+
+
+def get_selected_fields(model, fields_param):
+    """Return list of field names selected by the comma-separated
+    ``fields_param``, or all fields of ``model`` if it is empty."""
+    available = get_api_fields(model)
+    if not fields_param:
+        return list(available)
+    selected = [name.strip() for name in fields_param.split(',')
+                if name.strip()]
+    unknown = [name for name in selected if name not in available]
+    if unknown:
+        raise APIError('Unknown fields: %s. Available fields: %s.' % (
+            ', '.join(unknown), ', '.join(available)))
+    return selected
+
+
+def prepare_queryset(queryset, fields):
+    """Return ``queryset`` that loads only the columns and related objects
+    needed to serialize ``fields``."""
+    available = get_api_fields(queryset.model)
+    only, select, prefetch = [queryset.model._meta.pk.name], [], []
+    for name in fields:
+        kind, field = available[name]
+        if kind in ('value', 'file'):
+            only.append(name)
+        elif kind == 'foreign_key':
+            only.append(name)
+            select.append(name)
+        elif kind == 'collaborations':
+            prefetch.append(Prefetch(
+                name, queryset=field.related_model.objects.select_related(
+                    'collaborator')))
+        else:
+            prefetch.append(name)
+    queryset = queryset.only(*only)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+def serialize_related(obj):
+    """Return dictionary with id and name of related ``obj``."""
+    if obj is None:
+        return None
+    return {'id': obj.pk, 'name': str(obj)}
+
+
+def serialize_row(obj, exclude=()):
+    """Return dictionary of column values of ``obj`` except ``exclude``."""
+    data = dict()
+    for field in obj._meta.concrete_fields:
+        if field.name in exclude:
+            continue
+        value = getattr(obj, field.attname)
+        if isinstance(field, FileField):
+            value = value.url if value else None
+        data[field.name] = value
+    return data
+
+
+def serialize_file(cvfile):
+    """Return dictionary representing a :class:`cv.models.CVFile`."""
+    return {
+        'id': cvfile.pk,
+        'name': cvfile.name,
+        'type': cvfile.type,
+        'is_primary': cvfile.is_primary,
+        'url': cvfile.file.url if cvfile.file else None,
+        'copyright': cvfile.copyright,
+        'description_html': cvfile.description_html,
+    }
+
+
+def serialize_instance(obj, fields):
+    """Return dictionary of ``fields`` of ``obj``."""
+    available = get_api_fields(obj.__class__)
+    data = dict()
+    for name in fields:
+        kind, field = available[name]
+        if kind == 'value':
+            data[name] = getattr(obj, field.attname)
+        elif kind == 'file':
+            value = getattr(obj, name)
+            data[name] = value.url if value else None
+        elif kind == 'foreign_key':
+            data[name] = serialize_related(getattr(obj, name))
+        elif kind == 'collaborations':
+            exclude = ('id', 'collaborator', field.field.name)
+            data[name] = [
+                dict(collaborator=serialize_related(c.collaborator),
+                     **serialize_row(c, exclude))
+                for c in getattr(obj, name).all()]
+        elif kind == 'related':
+            data[name] = [serialize_row(item, (field.field.name,))
+                          for item in getattr(obj, name).all()]
+        elif kind == 'many':
+            data[name] = [serialize_related(item)
+                          for item in getattr(obj, name).all()]
+        elif kind == 'files':
+            data[name] = [serialize_file(f) for f in getattr(obj, name).all()]
+    return data
+
+
+def get_section_queryset(model, section):
+    """Return displayable queryset of ``model`` for ``section``, the name of
+    a method of the ``displayable`` manager listed in its
+    ``management_lists`` (e.g., ``published``)."""
+    if not section:
+        return model.displayable.all()
+    sections = getattr(model.displayable, 'management_lists', [])
+    if section not in sections:
+        raise APIError('Unknown section: %s. Available sections: %s.' % (
+            section, ', '.join(sections) or 'none'))
+    return getattr(model.displayable, section)()
+
+
+def get_page_size(request):
+    """Return number of results per page requested by ``limit``."""
+    try:
+        limit = int(request.GET.get('limit', CV_API_PAGE_SIZE))
+    except ValueError:
+        raise APIError('Limit must be an integer.')
+    if limit < 1:
+        raise APIError('Limit must be positive.')
+    return min(limit, CV_API_MAX_PAGE_SIZE)
+
+
+def api_error_response(view_func):
+    """Return ``400`` JSON responses for :class:`APIError` exceptions."""
+    @wraps(view_func)
+    def inner(request, *args, **kwargs):
+        try:
+            return view_func(request, *args, **kwargs)
+        except APIError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+    return inner
+
+
+@revision_condition
+def api_index_view(request):
+    """Return the models available in the API with their URLs, sections,
+    and fields."""
+    return JsonResponse({'models': {
+        model_name: {
+            'url': reverse('cv:api_list', kwargs={'model_name': model_name}),
+            'sections': getattr(model.displayable, 'management_lists', []),
+            'fields': list(get_api_fields(model)),
+        } for model_name, model in sorted(get_api_models().items())
+    }})
+
+
+@revision_condition
+@api_error_response
+def api_list_view(request, model_name):
+    """Return one page of displayable instances of a CV model.
+
+    Query parameters:
+
+    ``section``
+        Name of a section of the model, such as ``published``.
+    ``fields``
+        Comma-separated list of fields to include (all by default).
+    ``limit``
+        Number of results per page.
+    ``cursor``
+        Cursor of the page, taken from the ``next`` URL of the previous
+        page.
+    """
+    model = get_api_model(model_name)
+    section = request.GET.get('section', '')
+    fields = get_selected_fields(model, request.GET.get('fields', ''))
+    queryset = prepare_queryset(
+        get_section_queryset(model, section), fields)
+    try:
+        page = keyset_paginate(
+            queryset, request.GET.get('cursor'), get_page_size(request))
+    except InvalidPage as e:
+        raise APIError(str(e))
+    next_url = None
+    if page.has_next:
+        params = request.GET.copy()
+        params['cursor'] = page.next_cursor
+        next_url = '%s?%s' % (request.path, params.urlencode())
+    return JsonResponse({
+        'model': model_name,
+        'section': section or None,
+        'results': [serialize_instance(obj, fields) for obj in page],
+        'next': next_url,
+    })
+
+
+@revision_condition
+@api_error_response
+def api_detail_view(request, model_name, pk):
+    """Return a displayable instance of a CV model.
+
+    Accepts the ``fields`` query parameter of :func:`api_list_view`.
+    """
+    model = get_api_model(model_name)
+    fields = get_selected_fields(model, request.GET.get('fields', ''))
+    queryset = prepare_queryset(model.displayable.filter(pk=pk), fields)
+    obj = queryset.first()
+    if obj is None:
+        raise Http404('No {0} with id {1}'.format(model_name, pk))
+    return JsonResponse(serialize_instance(obj, fields))
@@ -0,0 +1,38 @@
+"""Apply batches of changes to CV works."""
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+
+from cv.batch import apply_batch
+
+import json
+
+
+def get_batch_models(operations):
+    """Return set of model names changed by ``operations``."""
+    return {op.get('model') for ops in operations.values()
+            if isinstance(ops, list) for op in ops if isinstance(op, dict)}
+
+
+@require_POST
+def batch_view(request):
+    """Reorder collaborations and update the status or display of works
+    from a JSON body in a single transaction.
+
+    See :func:`cv.batch.apply_batch` for the format of the body. Returns
+    the number of works changed, or a ``400`` response with an ``error``
+    message if the batch is invalid. The user must have permission to
+    change every model in the batch.
+    """
+    try:
+        operations = json.loads(request.body.decode('utf-8'))
+    except ValueError:
+        return JsonResponse({'error': 'Body must be valid JSON.'}, status=400)
+    if isinstance(operations, dict):
+        for model_name in get_batch_models(operations):
+            if not request.user.has_perm('cv.change_%s' % model_name):
+                raise PermissionDenied
+    try:
+        return JsonResponse(apply_batch(operations))
+    except ValidationError as e:
+        return JsonResponse({'error': ' '.join(e.messages)}, status=400)
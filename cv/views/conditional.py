@@ -0,0 +1,88 @@
+"""Answer conditional requests for CV views from the CV revision."""
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from functools import wraps
+import asyncio
+import calendar
+
+from cv.models import CVRevision
+
+
+def get_revision_validators(request):
+    """Return dictionary with ETag and Last-Modified timestamp of the CV
+    revision or ``None`` if the response should not carry validators.
+
+    Only ``GET`` and ``HEAD`` requests from anonymous users receive
+    validators since pages for authenticated users include editing links.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return None
+    revision = CVRevision.objects.current()
+    return {
+        'etag': quote_etag('cv-%s' % revision.revision),
+        'last_modified': calendar.timegm(revision.modified.utctimetuple())
+    }
+
+
+def set_revision_validators(response, validators):
+    """Add ``ETag`` and ``Last-Modified`` headers to successful responses."""
+    if validators and response.status_code == 200:
+        if not response.has_header('ETag'):
+            response['ETag'] = validators['etag']
+        if not response.has_header('Last-Modified'):
+            response['Last-Modified'] = http_date(
+                validators['last_modified'])
+    return response
+
+
+def revision_condition(view_func):
+    """Decorator for views that depend only on CV data.
+
+    Returns a ``304 Not Modified`` response, without calling the view, when
+    the request's ``If-None-Match`` or ``If-Modified-Since`` headers match
+    the current CV revision. Works with synchronous and asynchronous views.
+    """
+    if asyncio.iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def inner(request, *args, **kwargs):
+            validators = await sync_to_async(get_revision_validators)(
+                request)
+            if validators:
+                response = get_conditional_response(request, **validators)
+                if response is not None:
+                    return response
+            response = await view_func(request, *args, **kwargs)
+            return set_revision_validators(response, validators)
+        return inner
+
+    @wraps(view_func)
+    def inner(request, *args, **kwargs):
+        validators = get_revision_validators(request)
+        if validators:
+            response = get_conditional_response(request, **validators)
+            if response is not None:
+                return response
+        response = view_func(request, *args, **kwargs)
+        return set_revision_validators(response, validators)
+    return inner
+
+
+class RevisionConditionMixin:
+    """Apply :func:`revision_condition` to class-based views."""
+
+    def dispatch(self, request, *args, **kwargs):
+        dispatch = super().dispatch
+        if asyncio.iscoroutinefunction(getattr(self, 'get', None)):
+            async def dispatch_async(request, *args, **kwargs):
+                response = dispatch(request, *args, **kwargs)
+                if asyncio.iscoroutine(response):
+                    response = await response
+                return response
+            return revision_condition(dispatch_async)(
+                request, *args, **kwargs)
+        return revision_condition(dispatch)(request, *args, **kwargs)
@@ -0,0 +1,34 @@
+"""Views that render the CV document in any registered format."""
+from django.http import Http404, StreamingHttpResponse
+
+from cv.document import get_document
+from cv.profiles import get_profile
+from cv.renderers import get_renderer
+from cv.windows import parse_window
+
+from .conditional import revision_condition
+
+
+@revision_condition
+def cv_export(request, format):
+    """Return the CV in ``format`` (see :mod:`cv.renderers`).
+
+    Accepts the ``profile`` and ``years`` parameters of
+    :func:`cv.views.pdf.cv_pdf`. Every format is rendered from the same
+    cached :class:`~cv.document.CVDocument` and streamed as it is
+    rendered.
+    """
+    try:
+        renderer = get_renderer(format)
+        profile = get_profile(request.GET.get('profile'))
+    except LookupError as e:
+        raise Http404(str(e))
+    since = parse_window(request.GET.get('years') or profile.years)
+    document = get_document(profile, since)
+    response = StreamingHttpResponse(
+        renderer.stream(document, request),
+        content_type=renderer.content_type)
+    if format != 'html':
+        response['Content-Disposition'] = 'filename="{}"'.format(
+            renderer.get_filename(document))
+    return response
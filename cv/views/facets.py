@@ -0,0 +1,113 @@
+"""Views that browse CV works by discipline, year, type, and status."""
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.shortcuts import render
+
+from cv.facets import FACETS, FACET_DATES, STATUS_LABELS, count_facets, \
+    get_cached_cube, get_disciplines, get_facet_models, get_work_groups
+from cv.pagination import keyset_paginate_groups
+from cv.settings import CV_SECTION_PAGE_SIZE
+
+from .conditional import revision_condition
+
+
+def get_facet_filters(request, disciplines):
+    """Return dictionary of facet values selected by the query parameters
+    ``type``, ``discipline`` (a slug), ``year``, and ``status``."""
+    filters = dict()
+    params = request.GET
+    if params.get('type'):
+        if params['type'] not in FACET_DATES:
+            raise Http404('Unknown type: %s' % params['type'])
+        filters['type'] = params['type']
+    if params.get('discipline'):
+        pks = [pk for pk, d in disciplines.items()
+               if d.slug == params['discipline']]
+        if not pks:
+            raise Http404('Unknown discipline: %s' % params['discipline'])
+        filters['discipline'] = pks[0]
+    if params.get('year'):
+        try:
+            filters['year'] = int(params['year'])
+        except ValueError:
+            raise Http404('Year must be an integer.')
+    if params.get('status'):
+        if params['status'] not in STATUS_LABELS:
+            raise Http404('Unknown status: %s' % params['status'])
+        filters['status'] = params['status']
+    return filters
+
+
+def facet_url(request, facet, value):
+    """Return URL that selects ``value`` of ``facet``, or removes the
+    selection if ``value`` is ``None``."""
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    if value is None:
+        params.pop(facet, None)
+    else:
+        params[facet] = value
+    query = params.urlencode()
+    return '%s?%s' % (request.path, query) if query else request.path
+
+
+def get_facet_values(request, facet, counter, filters, disciplines):
+    """Return list of dictionaries with the ``label``, ``count``, ``url``,
+    and whether it is ``selected`` for each value of ``facet``."""
+    if facet == 'type':
+        models = {m._meta.model_name: m for m in get_facet_models()}
+        values = [(name, models[name]._meta.verbose_name_plural.title(),
+                   name) for name in FACET_DATES if counter[name]]
+    elif facet == 'discipline':
+        values = sorted(
+            [(pk, disciplines[pk].name, disciplines[pk].slug)
+             for pk in counter if pk in disciplines and counter[pk]],
+            key=lambda value: value[1])
+    elif facet == 'year':
+        values = [(year, year, year) for year in
+                  sorted((y for y in counter if y is not None), reverse=True)
+                  if counter[year]]
+    else:
+        values = [(name, label, name) for name, label in STATUS_LABELS.items()
+                  if counter[name]]
+    return [{
+        'label': label,
+        'count': counter[value],
+        'selected': filters.get(facet) == value,
+        'url': facet_url(request, facet, param),
+    } for value, label, param in values]
+
+
+@revision_condition
+def facet_view(request):
+    """Display works that match the selected facets, with the number of
+    works for each value of each facet."""
+    disciplines = get_disciplines()
+    filters = get_facet_filters(request, disciplines)
+    counts, total = count_facets(get_cached_cube(), filters)
+    try:
+        groups = [
+            (name, queryset.only('pk', 'title', 'slug')) for name, queryset
+            in get_work_groups(filters, counts['type'])]
+        page = keyset_paginate_groups(
+            groups, request.GET.get('cursor'), CV_SECTION_PAGE_SIZE)
+    except InvalidPage as e:
+        raise Http404(str(e))
+    next_page_url = None
+    if page.has_next:
+        params = request.GET.copy()
+        params['cursor'] = page.next_cursor
+        next_page_url = '?%s' % params.urlencode()
+    models = {m._meta.model_name: m for m in get_facet_models()}
+    return render(request, 'cv/facets.html', {
+        'facets': [
+            (facet, get_facet_values(
+                request, facet, counts[facet], filters, disciplines),
+             facet_url(request, facet, None) if facet in filters else None)
+            for facet in FACETS],
+        'total': total,
+        'groups': [
+            (models[name]._meta.verbose_name_plural.title(), objects)
+            for name, objects in page.object_lists.items() if objects],
+        'next_page_url': next_page_url,
+    })
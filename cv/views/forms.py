@@ -1,14 +1,22 @@
 # Forms
 from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Upper
+from django.forms import modelform_factory
+from django.http import Http404, HttpResponseRedirect, JsonResponse
 from django.views.generic.edit import CreateView, UpdateView, DeleteView, SingleObjectTemplateResponseMixin
 from django.urls import reverse_lazy
 from django.apps import apps
+from functools import lru_cache
+from cv.cache import get_or_set, make_key
 from cv.forms import authorship_formset_factory, \
                    edition_formset_factory, \
                    editorship_formset_factory, \
                    grant_collaboration_formset_factory, \
                    presentation_formset_factory, \
-                   offering_formset_factory
+                   offering_formset_factory, \
+                   autocomplete_widgets, AUTOCOMPLETE_SEARCH_FIELDS
+from cv.settings import CV_AUTOCOMPLETE_PAGE_SIZE
 
 def template_name(model_name, suffix):
 #   model_name = model.__name__.lower()
@@ -62,6 +70,45 @@ fieldsets = {
 }
 
 
+@lru_cache(maxsize=None)
+def get_model_form_class(model_name):
+    """Return model form for ``model_name`` that uses autocomplete widgets
+    for journals and grants.
+
+    Form classes are built once per model and reused across requests.
+    """
+    model = apps.get_model('cv', model_name)
+    fields = fieldsets[model_name]
+    return modelform_factory(
+        model, fields=fields, widgets=autocomplete_widgets(model, fields))
+
+
+@lru_cache(maxsize=None)
+def get_formset_classes(model_name):
+    """Return tuple of formset names and formset classes for
+    ``model_name``.
+
+    Formset classes are built once per model and reused across requests.
+    """
+    factories = list()
+    authorship_formset = authorship_formset_factory(model_name)
+    if authorship_formset:
+        factories.append(('authorship_formset', authorship_formset))
+    if model_name=='book':
+        factories.append(('edition_formset', edition_formset_factory()))
+    if model_name=='chapter':
+        factories.append(('editorship_formset', editorship_formset_factory()))
+    if model_name=='grant':
+        factories.append(('grant_collaboration_formset',
+                          grant_collaboration_formset_factory()))
+    if model_name=='talk':
+        factories.append(('presentation_formset',
+                          presentation_formset_factory()))
+    if model_name=='course':
+        factories.append(('offering_formset', offering_formset_factory()))
+    return tuple(factories)
+
+
 class CVSingleObjectMixin(SingleObjectTemplateResponseMixin):
     """
     Provide basic methods for manipulating CV views.
@@ -71,34 +118,67 @@ class CVSingleObjectMixin(SingleObjectTemplateResponseMixin):
         self.model_name = kwargs['model_name']
         self.model = apps.get_model('cv', self.model_name)
         self.fields = fieldsets[self.model_name]
+        self.formsets = None
         return super().dispatch(request, *args, **kwargs)
 
+    def get_form_class(self):
+        """Return model form that uses autocomplete widgets for journals
+        and grants."""
+        return get_model_form_class(self.model_name)
+
+    def get_media(self, context):
+        """Return combined media of the form and formsets in ``context``."""
+        media = context['form'].media
+        for formset in self.get_formsets().values():
+            media += formset.media
+        return media
+
     def get_formset_factories(self):
         """Return a dictionary of formset names and factory methods."""
-        factories = dict()
-        authorship_formset = authorship_formset_factory(self.model_name)
-        if authorship_formset:
-            factories['authorship_formset'] = authorship_formset
-        if self.model_name=='book':
-            factories['edition_formset'] = edition_formset_factory()
-        if self.model_name=='chapter':
-            factories['editorship_formset'] = editorship_formset_factory()
-        if self.model_name=='grant':
-            factories['grant_collaboration_formset'] = grant_collaboration_formset_factory()
-        if self.model_name=='talk':
-            factories['presentation_formset'] = presentation_formset_factory()
-        if self.model_name=='course':
-            factories['offering_formset'] = offering_formset_factory()
-        return factories
+        return dict(get_formset_classes(self.model_name))
+
+    def get_formsets(self):
+        """Return a dictionary of formset names and formsets bound to the
+        request data and object.
+
+        Formsets are constructed once per request so that they are only
+        validated once.
+        """
+        if self.formsets is None:
+            kwargs = {'instance': self.object}
+            if self.request.method in ('POST', 'PUT'):
+                kwargs['data'] = self.request.POST
+            self.formsets = {
+                name: factory(**kwargs)
+                for name, factory in self.get_formset_factories().items()
+            }
+        return self.formsets
+
+    def check_formsets_valid(self, formsets):
+        """Validate every formset and return whether all are valid."""
+        return all([formset.is_valid() for formset in formsets])
+
+    def form_valid(self, form):
+        """Save the object and its formsets in a single transaction if all
+        formsets are valid."""
+        formsets = self.get_formsets().values()
+        if not self.check_formsets_valid(formsets):
+            return self.form_invalid(form)
+        with transaction.atomic():
+            self.object = form.save()
+            for formset in formsets:
+                formset.instance = self.object
+                formset.save()
+        return HttpResponseRedirect(self.get_success_url())
 
     def get_context_data(self, **kwargs):
-        """Set common context variables for CV views and get formset factories.
+        """Set common context variables for CV views and insert formsets.
         """
         context = super(CVSingleObjectMixin, self).get_context_data(**kwargs)
         context['method'] = self.method.title()
         context['model'] = self.model_name
-        self.factories = self.get_formset_factories()
-
+        context.update(self.get_formsets())
+        context['media'] = self.get_media(context)
         return context
 
     def get_template_names(self):
@@ -121,34 +201,14 @@ class CVCreateView(CreateView, CVSingleObjectMixin):
     success_url = reverse_lazy('cv:cv_list')
 
     def get_context_data(self, **kwargs):
-        """Insert authorship formset into the context dict."""
+        """Insert action URL into the context dict."""
         context = super(CVCreateView, self).get_context_data(**kwargs)
-        context['model'] = self.model_name
-        for name, factory in self.factories.items():
-            if self.request.POST:
-                context[name] = factory(self.request.POST)
-            else:
-                context[name] = factory()
         context['action_url'] = reverse_lazy(
             'cv:cv_add',
             kwargs={'model_name': self.model_name}
         )
         return context
 
-    def check_formsets_valid(self, formsets):
-        return all(formset.is_valid() is True for formset in formsets)
-
-    def form_valid(self, form):
-        context = self.get_context_data()
-        formsets = [context[factory] for factory in self.factories]
-        if self.check_formsets_valid(formsets):
-            self.object = form.save()
-            for formset in formsets:
-                formset.instance = self.object
-                formset.save()
-            return super(CVCreateView, self).form_valid(form)
-        return self.render_to_response(self.get_context_data(form=form))
-
 
 class CVUpdateView(UpdateView, CVSingleObjectMixin):
     """View to edit CV objects."""
@@ -159,13 +219,6 @@ class CVUpdateView(UpdateView, CVSingleObjectMixin):
 
     def get_context_data(self, **kwargs):
         context = super(CVUpdateView, self).get_context_data(**kwargs)
-        context['model'] = self.model_name
-        for name, factory in self.factories.items():
-            if self.request.POST:
-                context[name] = factory(
-                    self.request.POST, instance=self.object)
-            else:
-                context[name] = factory(instance=self.object)
         context['action_url'] = reverse_lazy(
             'cv:cv_edit',
             kwargs={'pk': context['object'].id,
@@ -178,20 +231,6 @@ class CVUpdateView(UpdateView, CVSingleObjectMixin):
         )        
         return context
 
-    def check_formsets_valid(self, formsets):
-        return all(formset.is_valid() is True for formset in formsets)
-
-    def form_valid(self, form):
-        context = self.get_context_data()
-        formsets = [context[factory] for factory in self.factories]
-        if self.check_formsets_valid(formsets):
-            self.object = form.save()
-            for formset in formsets:
-                formset.instance = self.object
-                formset.save()
-            return super(CVUpdateView, self).form_valid(form)
-        return self.render_to_response(self.get_context_data(form=form))
-
 class CVDeleteView(DeleteView):
     success_url = reverse_lazy('cv:cv_list')
     template_name = 'cv/forms/cv_confirm_delete.html'
@@ -205,3 +244,51 @@ class CVDeleteView(DeleteView):
         context = super(CVDeleteView, self).get_context_data(**kwargs)
         context['model'] = self.model_name
         return context
+
+
+def search_autocomplete(model_name, q, page):
+    """Return one page of instances of ``model_name`` whose search fields
+    start with every term in ``q``.
+
+    Upper-case values of the search fields are matched against upper-case
+    terms so that the prefix indexes of the fields are used (see
+    :class:`~cv.models.base.PrefixSearchIndex`).
+
+    Returns a dictionary with a list of ``results`` (each with the ``id``
+    and ``text`` of an instance) and whether ``more`` results exist.
+    """
+    model = apps.get_model('cv', model_name)
+    fields = AUTOCOMPLETE_SEARCH_FIELDS[model_name]
+    queryset = model.objects.annotate(
+        **{'%s_upper' % field: Upper(field) for field in fields})
+    for term in q.upper().split():
+        term_query = Q()
+        for field in fields:
+            term_query |= Q(**{'%s_upper__startswith' % field: term})
+        queryset = queryset.filter(term_query)
+    offset = (page - 1) * CV_AUTOCOMPLETE_PAGE_SIZE
+    instances = list(
+        queryset[offset:offset + CV_AUTOCOMPLETE_PAGE_SIZE + 1])
+    return {
+        'results': [{'id': obj.pk, 'text': str(obj)}
+                    for obj in instances[:CV_AUTOCOMPLETE_PAGE_SIZE]],
+        'more': len(instances) > CV_AUTOCOMPLETE_PAGE_SIZE
+    }
+
+
+def autocomplete_view(request, model_name):
+    """Return JSON page of collaborators, journals, or grants matching the
+    ``q`` parameter for autocomplete widgets.
+
+    Pages are cached until CV data changes.
+    """
+    if model_name not in AUTOCOMPLETE_SEARCH_FIELDS:
+        raise Http404('Autocomplete not available for {0}'.format(model_name))
+    q = request.GET.get('q', '').strip().lower()
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    key = make_key('autocomplete', model_name, page, q)
+    return JsonResponse(get_or_set(
+        key, lambda: search_autocomplete(model_name, q, page)))
@@ -1,19 +1,40 @@
 """Create PDF file of CV to be used in views."""
 from django.apps import apps
-from django.http import FileResponse, HttpResponse
-from django.template.loader import get_template
-
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from django.db import connections
+from django.db.models import BooleanField, Case, F, OrderBy, Q, Value, \
+    When, Window
+from django.db.models.functions import RowNumber
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from reportlab.platypus import Flowable, SimpleDocTemplate, Paragraph, \
+    Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ListStyle, \
+    ParagraphStyle, StyleSheet1
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.enums import TA_LEFT, TA_CENTER
 from reportlab.lib.units import inch
 
-from cv.models import Position
+from cv.builds import get_build_status, is_enabled
+from cv.cache import entry_cache, get_or_set, make_key
+from cv.document import get_document, get_heading
+from cv.formatters import TemplateFormatter, get_formatter
+from cv.models import PDFBuild
+from cv.profiles import get_profile, section_queryset
+from cv.records import CHUNK_SIZE, get_records, get_related_columns, \
+    iter_records
 from cv.settings import CV_PERSONAL_INFO
+from cv.windows import parse_window
+
+from .conditional import revision_condition
 
+from functools import reduce
+from itertools import chain, islice
+from operator import attrgetter, or_
+from types import MappingProxyType
+import calendar
 import io
-import json
 
 
 # Define dimensions
@@ -47,71 +68,231 @@ class SubsectionHeader(Paragraph):
 
 
 class DateBlock(Paragraph):
-    """A formatted CV entry that includes date."""
+    """A formatted CV entry that includes date.
+
+    The date is drawn as the bullet of the paragraph, so that its position
+    is set by the ``bulletIndent`` of the style and the text is laid out
+    without extra markup.
+    """
     def __init__(self, text, date, style, *args, **kwargs):
-        self.text = "<para leftIndent=\"54\">" + text + "</para>"
         self.date = date
-        self.style = style
-        Paragraph.__init__(self, self.text, style=style, *args, **kwargs)
+        Paragraph.__init__(self, text, style=style, bulletText=date or None,
+                           *args, **kwargs)
+
+
+class SharedStyle:
+    """Mixin of styles that cannot be changed once they are created."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__dict__['_frozen'] = True
+
+    def check_frozen(self):
+        if self.__dict__.get('_frozen'):
+            raise AttributeError(
+                'Style %s is shared and cannot be changed' % self.name)
+
+    def __setattr__(self, name, value):
+        self.check_frozen()
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        self.check_frozen()
+        super().__delattr__(name)
+
+    def refresh(self):
+        self.check_frozen()
+        super().refresh()
+
+    def clone(self, name, parent=None, **kwargs):
+        """Return new shared style called ``name`` that inherits this style
+        (or ``parent``) and sets ``kwargs``."""
+        return self.__class__(name, parent=parent or self, **kwargs)
 
-    def wrap(self, aW=396, aH=0):
-        w, h = Paragraph.wrap(self, aW, aH)
-        self.h = h
-        return w, h
 
-    def draw(self):
-        self.canv.setFont("Times-Roman", 11)
-        self.canv.drawString(0, self.h - 11, self.date)
-        Paragraph.draw(self)
+class SharedParagraphStyle(SharedStyle, ParagraphStyle):
+    """Paragraph style that cannot be changed once it is created."""
+
+
+class SharedListStyle(SharedStyle, ListStyle):
+    """List style that cannot be changed once it is created."""
+
+
+class SharedStyleSheet(StyleSheet1):
+    """Style sheet with frozen copies of the styles of ``sheet``. Styles
+    cannot be added to it or replaced."""
+
+    def __init__(self, sheet):
+        by_name = dict()
+
+        def freeze(style):
+            if style.name not in by_name:
+                parent = style.parent and freeze(style.parent)
+                shared = SharedListStyle if isinstance(style, ListStyle) \
+                    else SharedParagraphStyle
+                by_name[style.name] = shared(
+                    style.name, parent=parent,
+                    **{key: value for key, value in style.__dict__.items()
+                       if key not in ('name', 'parent')})
+            return by_name[style.name]
+
+        for style in sheet.byName.values():
+            freeze(style)
+        self.byName = MappingProxyType(by_name)
+        self.byAlias = MappingProxyType({
+            alias: by_name[style.name]
+            for alias, style in sheet.byAlias.items()})
+
+    def add(self, style, alias=None):
+        raise TypeError('Shared style sheet cannot be changed')
+
+    def __setitem__(self, key, value):
+        raise TypeError('Shared style sheet cannot be changed')
+
+
+def make_styles():
+    """Return shared style sheet with the styles of the PDF
+    representation."""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name="Infoblock",
+                              fontName="Times-Roman",
+                              fontSize=11,
+                              alignment=TA_CENTER,))
+
+    styles.add(ParagraphStyle(name="SectionHeader",
+                              fontName="Times-Bold",
+                              fontSize=13,
+                              alignment=TA_LEFT,
+                              spaceBefore=0,
+                              spaceAfter=3,
+                              leftIndent=0))
+
+    styles.add(ParagraphStyle(name="SubsectionHeader",
+                              fontName="Times-Italic",
+                              fontSize=11,
+                              alignment=TA_LEFT,
+                              spaceBefore=0,
+                              spaceAfter=3,
+                              leftIndent=0))
+
+    styles.add(ParagraphStyle(name="Dateblock",
+                              fontName="Times-Roman",
+                              fontSize=11,
+                              alignment=TA_LEFT,
+                              bulletFontName="Times-Roman",
+                              bulletFontSize=11,
+                              bulletIndent=0,
+                              spaceAfter=6,
+                              leftIndent=54,
+                              allowOrphans=0,))
+    return SharedStyleSheet(styles)
+
+
+STYLES = make_styles()
+"""Style sheet shared by every PDF. It is built once per process; neither
+the sheet nor its styles can be changed, so builds in different threads
+share them safely."""
+
+
+def get_personal_name():
+    """Return name in :setting:`CV_PERSONAL_INFO`, or an empty string
+    if it is not set."""
+    return (CV_PERSONAL_INFO or {}).get('name', '')
+
+
+def section_header(text):
+    """Return flowable of a section header."""
+    return SectionHeader(text, style=STYLES["SectionHeader"])
+
+
+def subsection_header(text):
+    """Return flowable of a subsection header."""
+    return SubsectionHeader(text, style=STYLES["SubsectionHeader"])
+
+
+def date_block(text, date):
+    """Return flowable of an entry with its date."""
+    return DateBlock(text=text, date=date, style=STYLES["Dateblock"])
+
+
+class FlowableStream:
+    """Sequence of the flowables of ``flowables``, an iterable, that reads
+    them as ReportLab lays them out.
+
+    ReportLab takes flowables from the front of a list, looks at most a few
+    flowables ahead, and puts parts of split flowables back at the front.
+    This class supports those operations while holding only the flowables
+    ReportLab has looked at, so flowables can be created by a generator
+    and are released once drawn.
+    """
+
+    def __init__(self, flowables):
+        self.flowables = iter(flowables)
+        self.buffer = list()
+
+    def fill(self, size=None):
+        """Read flowables until ``size`` are held (all if ``None``)."""
+        while size is None or len(self.buffer) < size:
+            try:
+                self.buffer.append(next(self.flowables))
+            except StopIteration:
+                break
+
+    def fill_to(self, key):
+        if isinstance(key, slice):
+            self.fill(None if key.stop is None or key.stop < 0
+                      else key.stop)
+        else:
+            self.fill(None if key < 0 else key + 1)
+
+    def __len__(self):
+        # ReportLab builds while the sequence is not empty, so one flowable
+        # must be read ahead. It also keeps flowables with keepWithNext
+        # together with the flowable after them, but looks no further than
+        # the length, so those flowables and the next one are read ahead
+        # too
+        self.fill(1)
+        i = 0
+        while i < len(self.buffer) and \
+                isinstance(self.buffer[i], Flowable) and \
+                self.buffer[i].getKeepWithNext():
+            i += 1
+            self.fill(i + 1)
+        return len(self.buffer)
+
+    def __getitem__(self, key):
+        self.fill_to(key)
+        return self.buffer[key]
+
+    def __setitem__(self, key, value):
+        self.fill_to(key)
+        self.buffer[key] = value
+
+    def __delitem__(self, key):
+        self.fill_to(key)
+        del self.buffer[key]
+
+    def insert(self, index, flowable):
+        self.buffer.insert(index, flowable)
 
 
 class CVPdfStyle:
     """Defines styles for PDF representation of CV."""
     def __init__(self):
-        """Creates styles and container to hold CV information."""
-        self.cv = list()
-        self.styles = getSampleStyleSheet()
-        self.styles.add(ParagraphStyle(name="Infoblock",
-                                       fontName="Times-Roman",
-                                       fontSize=11,
-                                       alignment=TA_CENTER,))
-
-        self.styles.add(ParagraphStyle(name="SectionHeader",
-                                       fontName="Times-Bold",
-                                       fontSize=13,
-                                       alignment=TA_LEFT,
-                                       spaceBefore=0,
-                                       spaceAfter=3,
-                                       leftIndent=0))
-
-        self.styles.add(ParagraphStyle(name="SubsectionHeader",
-                                      fontName="Times-Italic",
-                                      fontSize=11,
-                                      alignment=TA_LEFT,
-                                      spaceBefore=0,
-                                      spaceAfter=3,
-                                      leftIndent=0))
-
-        self.styles.add(ParagraphStyle(name="Dateblock",
-                                       fontName="Times-Roman",
-                                       fontSize=11,
-                                       alignment=TA_LEFT,
-                                       bulletFontSize=11,
-                                       spaceAfter=6,
-                                       leftIndent=54,
-                                       allowOrphans=0,))
+        """Uses the stylesheet shared by every PDF."""
+        self.styles = STYLES
 
     def section_header(self, text):
         """Defines a line to be written as a section header."""
-        return SectionHeader(text, style=self.styles["SectionHeader"])
+        return section_header(text)
 
     def subsection_header(self, text):
         """Defines a line to be written as a subsection header."""
-        return SubsectionHeader(text, style=self.styles["SubsectionHeader"])
+        return subsection_header(text)
 
     def date_block(self, text, date, *args, **kwargs):
         """Defines a line to be written with the DateBlock style."""
-        return DateBlock(text=text, date=date, style=self.styles["Dateblock"])
+        return date_block(text, date)
 
     # Define page styles
     def myFirstPage(self, canvas, doc):
@@ -121,7 +302,7 @@ class CVPdfStyle:
         canvas.drawCentredString(
             TEXT_WIDTH / 2.0 + MARGINS[3] + 6,
             PAGE_HEIGHT - MARGINS[0] - 6,
-            CV_PERSONAL_INFO['name']
+            get_personal_name()
         )
         canvas.setFont('Times-Roman', 11)
         canvas.drawString(PAGE_WIDTH - inch, 0.75 * inch, "%d" % doc.page)
@@ -158,25 +339,66 @@ class CVPdfEntryMixin():
         context = {self.model_name: instance}
         return context
 
+    def make_entry(self, formatter, instance):
+        """Return dictionary with the ``date`` and ``text`` of the entry of
+        ``instance`` written by ``formatter``."""
+        instance_dict = dict()
+        instance_dict['date'] = ''
+        if self.date_field:
+            instance_dict['date'] = self.make_date(instance, self.date_field)
+        if isinstance(formatter, TemplateFormatter):
+            context = self.get_context_data(instance)
+            instance_dict['text'] = formatter.render(context)
+        else:
+            instance_dict['text'] = formatter(instance)
+        return instance_dict
+
+    def get_entry_key(self, template, instance):
+        """Return key of the cached entry of ``instance``.
+
+        Names of authors and editors and columns of other related models,
+        such as the titles of journals, are part of the key because changes
+        to them do not change the ``modified`` time of the works that show
+        them (see :func:`cv.records.get_related_columns`). Returns ``None``
+        for instances without a ``modified`` time.
+        """
+        modified = getattr(instance, 'modified', None)
+        if modified is None:
+            return None
+        related = [getattr(instance, name, '')
+                   for name in get_related_columns(self.model_name)]
+        return entry_cache.make_key(
+            self.model_name, instance.pk, modified, template,
+            self.date_field, self.since, getattr(instance, 'authors', ''),
+            getattr(instance, 'editors', ''), *related)
+
     def make_entries(self, template, instances):
         """Create an entry for a CV item.CV
 
-        Returns a dictionary with two fields:
+        Text is written by the formatter of the model and ``template``
+        (see :mod:`cv.formatters`). Entries are cached for each version
+        of the instances, so only new and changed instances are formatted
+        (see :class:`cv.cache.EntryCache`). Returns a dictionary with two
+        fields:
             `date`: what should be printed in the date block
                     (can be empty string)
             `text`: text to write on line in CV
         """
-        entries = list()
-        template = get_template(template)
-        for instance in instances:
-            instance_dict = dict()
-            instance_dict['date'] = ''
-            if self.date_field:
-                instance_dict['date'] = self.make_date(
-                    instance, self.date_field)
-            context = self.get_context_data(instance)
-            instance_dict['text'] = template.render(context)
-            entries.append(instance_dict)
+        if not instances:
+            return []
+        formatter = get_formatter(self.model_name, template)
+        keys = [self.get_entry_key(template, instance)
+                for instance in instances]
+        cached = entry_cache.get_many([key for key in keys if key])
+        entries, missed = list(), dict()
+        for key, instance in zip(keys, instances):
+            entry = cached.get(key)
+            if entry is None:
+                entry = self.make_entry(formatter, instance)
+                if key:
+                    missed[key] = entry
+            entries.append(entry)
+        entry_cache.set_many(missed)
         return entries
 
 
@@ -189,8 +411,11 @@ class CVPdfSubsectionContainer:
 class CVPdfSection(CVPdfEntryMixin):
     """Representation of a section on a CV."""
     def __init__(self, model_name, display_name=None, template=None,
-                 date_field=None, subsections=None):
+                 date_field=None, subsections=None, filters=None, limit=None,
+                 since=None):
         self.model_name = model_name
+        self.since = since
+        self.options = {'filters': filters or {}, 'limit': limit}
         self.model = apps.get_model('cv', self.model_name)
         if display_name:
             self.display_name = display_name
@@ -200,108 +425,249 @@ class CVPdfSection(CVPdfEntryMixin):
             template = 'cv/pdf/{}.xml'.format(self.model_name)
         self.template = template
         self.date_field = date_field
-
-        self.entries_exist = False
-        if self.model.displayable.all().count() > 0:
-            self.entries_exist = True
         self.subsections = subsections
         self.elems = list()
 
+    def get_queryset(self, queryset):
+        """Return ``queryset`` limited to the filters, limit, and window of
+        the section."""
+        return section_queryset(queryset, self.options, self.since)
+
+    def get_record_fields(self):
+        """Return names of the date fields of the section and the
+        ``modified`` field, the version of cached entries."""
+        date_fields = self.date_field or ()
+        if isinstance(date_fields, str):
+            date_fields = (date_fields,)
+        return tuple(date_fields) + ('modified',)
+
+    def get_records(self, queryset):
+        """Return lightweight records of the entries of ``queryset`` in the
+        section (see :mod:`cv.records`)."""
+        return get_records(self.get_queryset(queryset),
+                           self.get_record_fields(), self.since)
+
+    def get_subsection_records(self):
+        """Return list of the title and records of each subsection.
+
+        The entries of all subsections are fetched with one query that
+        marks the subsections of each entry and its position in them (see
+        :func:`annotate_subsections`). Each subsection is fetched with its
+        own query on databases without window functions.
+        """
+        titles = [s[0] for s in self.subsections]
+        querysets = [getattr(self.model.displayable, s[1])()
+                     for s in self.subsections]
+        manager = self.model.displayable
+        if not connections[manager.db].features.supports_over_clause:
+            return list(zip(titles, map(self.get_records, querysets)))
+        queryset = section_queryset(
+            manager.all(), {'filters': self.options['filters']}, self.since)
+        queryset, names = annotate_subsections(queryset, querysets)
+        records = get_records(
+            queryset, self.get_record_fields() + names, self.since)
+        limit = self.options['limit']
+        subsections = list()
+        for i, title in enumerate(titles):
+            subsection = sorted(
+                (r for r in records if getattr(r, 'subsection_%s' % i)),
+                key=attrgetter('subsection_%s_order' % i))
+            subsections.append((title, subsection[:limit] if limit
+                                else subsection))
+        return subsections
+
+    def iter_entries(self, queryset, chunk_size=CHUNK_SIZE):
+        """Yield entries of ``queryset`` in the section, reading and
+        formatting ``chunk_size`` records at a time."""
+        records = iter_records(self.get_queryset(queryset),
+                               self.get_record_fields(), self.since,
+                               chunk_size)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            yield from self.make_entries(self.template, chunk)
+
+    def iter_subsections(self, chunk_size=CHUNK_SIZE):
+        """Yield the title of each subsection (``None`` if the section has
+        no subsections) and a generator of its entries.
+
+        Unlike :meth:`get_subsection_records`, each subsection is read with
+        its own query, so that entries need not be held in memory to be
+        divided into subsections.
+        """
+        manager = self.model.displayable
+        if not self.subsections:
+            yield None, self.iter_entries(manager.all(), chunk_size)
+        for s in self.subsections or ():
+            yield s[0], self.iter_entries(getattr(manager, s[1])(),
+                                          chunk_size)
+
     def make_section_header_name(self):
         return self.display_name
 
     def make_section_entries(self):
         """Create a list of entries for the section and each subsection.
 
-        Each entry must be a dictionary with a ``date`` and ``text`` keys. 
+        Each entry must be a dictionary with a ``date`` and ``text`` keys.
+        Returns ``None`` if the section has no entries.
         """
-        if self.entries_exist is True:
-            if self.subsections:
-                subsection_entries = list()
-                for s in self.subsections:
-                    manager = getattr(self.model.displayable, s[1])
-                    s_entries = self.make_entries(self.template, manager())
-                    if s_entries:
-                        subsection_entries.append({s[0]: s_entries})
+        if self.subsections:
+            subsection_entries = list()
+            for title, records in self.get_subsection_records():
+                s_entries = self.make_entries(self.template, records)
+                if s_entries:
+                    subsection_entries.append({title: s_entries})
+            if subsection_entries:
                 return CVPdfSubsectionContainer(subsection_entries)
-            return self.make_entries(
-                self.template,
-                self.model.displayable.all())
-        return None
+            return None
+        return self.make_entries(
+            self.template,
+            self.get_records(self.model.displayable.all())) or None
+
+
+def get_order_by(queryset):
+    """Return list of the expressions that order ``queryset``, ending with
+    its primary key."""
+    query = queryset.query
+    ordering = query.order_by or (
+        query.default_ordering and query.get_meta().ordering) or []
+    order_by = list()
+    for field in list(ordering) + ['pk']:
+        if isinstance(field, OrderBy):
+            order_by.append(field)
+        elif hasattr(field, 'resolve_expression'):
+            order_by.append(field.asc())
+        elif field.startswith('-'):
+            order_by.append(F(field[1:]).desc())
+        else:
+            order_by.append(F(field).asc())
+    return order_by
+
+
+def annotate_subsections(queryset, querysets):
+    """Return ``queryset`` limited to the entries of ``querysets`` and
+    the names of its annotations.
+
+    For each of ``querysets``, ``subsection_<i>`` is true for its entries
+    and ``subsection_<i>_order`` is the position of each entry in the
+    ordering of that queryset.
+    """
+    names, members = tuple(), dict()
+    for i, subsection in enumerate(querysets):
+        members['subsection_%s' % i] = Case(
+            When(pk__in=subsection.order_by().values('pk'),
+                 then=Value(True)),
+            default=Value(False), output_field=BooleanField())
+    queryset = queryset.annotate(**members).filter(
+        reduce(or_, (Q(**{name: True}) for name in members)))
+    orders = {
+        'subsection_%s_order' % i: Window(
+            RowNumber(), order_by=get_order_by(subsection))
+        for i, subsection in enumerate(querysets)}
+    for name in members:
+        names += (name, name + '_order')
+    return queryset.annotate(**orders), names
 
 
 class CVPdf(CVPdfStyle):
-    """A PDF representation of a CV."""
-    def pdf_template(self, template=None):
-        """Return JSON-formatted template for PDF representation of the CV.
-
-        Unless the user specifies a template, the template at 
-        ``cv/pdf/pdf_list.json`` will be used.
+    """A PDF representation of a CV.
+
+    The PDF is laid out from the :class:`~cv.document.CVDocument` of
+    ``profile`` (by default, the complete CV) limited to the window of
+    years that starts on ``since`` (see :mod:`cv.windows`).
+    """
+    def __init__(self, since=None, profile=None):
+        super(CVPdf, self).__init__()
+        self.since = since
+        self.profile = profile
+
+    def heading_flowables(self, lines):
+        """Yield flowables of the main heading material of CV."""
+        for line in lines:
+            yield Paragraph(line, self.styles["Infoblock"])
+        yield Spacer(PAGE_WIDTH, 24)
+
+    def section_flowables(self, title, subsections):
+        """Yield flowables of a section titled ``title``.
+
+        ``subsections`` is an iterable of the title of each subsection
+        (``None`` if the section has no subsections) and an iterable of
+        the ``(text, date)`` of its entries. Nothing is yielded for a
+        section without entries.
         """
-        if not template:
-            template = 'cv/pdf/pdf_list.json'
-        pdf_template = get_template(template)
-        return json.loads(pdf_template.render({}))
-
-    def build_primary_positions(self):
-        """Append formatted list of primary positions to CV."""
-        for position in Position.primarypositions.all():
-            lines = ['{}'.format(position.title)]
-            if position.department:
-                lines += [position.department]
-            if position.institution:
-                lines += [position.institution]
-            for line in lines:
-                self.cv.append(
-                    Paragraph(line, self.styles["Infoblock"])
-                )
-
-    def build_heading(self):
-        """Append the main heading material to CV."""
-        self.build_primary_positions()
-        for key in ['address', 'phone', 'email']:
-            if key in CV_PERSONAL_INFO.keys():
-                lines = CV_PERSONAL_INFO[key].split("\n")
-                for line in lines:
-                    self.cv.append(Paragraph(line, self.styles["Infoblock"]))
-
-    def build_section(self, section_obj):
-        """Append section and related subsections to CV."""
-        entries = section_obj.make_section_entries()
-        if entries:
-            self.cv.append(self.section_header(
-                section_obj.make_section_header_name()))
-            if type(entries) == CVPdfSubsectionContainer:
-                for subsection in entries.subsection_entries:
-                    for k in subsection.keys():
-                        self.cv.append(self.subsection_header(k))
-                        for e in subsection[k]:
-                            self.cv.append(self.date_block(**e))
-                        self.cv.append(Spacer(PAGE_WIDTH, 20))
-            else:
-                for e in entries:
-                    self.cv.append(self.date_block(**e))
-            self.cv.append(Spacer(PAGE_WIDTH, 20))
-
-    def build_cv(self, file):
-        """Combine elements to build a CV from parts."""
-        doc = SimpleDocTemplate(file,
-                                pagesize=letter,
-                                topMargin=MARGINS[0],
-                                rightMargin=MARGINS[1],
-                                bottomMargin=MARGINS[2],
-                                leftMargin=MARGINS[3],
-                                title='{}' .format(
-                                    CV_PERSONAL_INFO['name']))
-        self.build_heading()
-        self.cv.append(Spacer(PAGE_WIDTH, 24))
-
-        for section in self.pdf_template(): 
-            pdf_section = CVPdfSection(**section)
-            self.build_section(pdf_section)
-
+        started = False
+        for subtitle, entries in subsections:
+            entries = iter(entries)
+            first = next(entries, None)
+            if first is None:
+                continue
+            if not started:
+                yield self.section_header(title)
+                started = True
+            if subtitle is not None:
+                yield self.subsection_header(subtitle)
+            for text, date in chain((first,), entries):
+                yield self.date_block(text, date)
+            if subtitle is not None:
+                yield Spacer(PAGE_WIDTH, 20)
+        if started:
+            yield Spacer(PAGE_WIDTH, 20)
+
+    def document_flowables(self, document):
+        """Yield flowables of :class:`~cv.document.CVDocument`
+        ``document``."""
+        yield from self.heading_flowables(document.heading)
+        for section in document.sections:
+            yield from self.section_flowables(section.title, (
+                (s.title, ((e.text, e.date) for e in s.entries))
+                for s in section.subsections))
+
+    def stream_flowables(self, chunk_size=CHUNK_SIZE):
+        """Yield flowables of the profile read from the database section by
+        section, holding at most ``chunk_size`` entries in memory (see
+        :meth:`CVPdfSection.iter_subsections`)."""
+        yield from self.heading_flowables(get_heading())
+        profile = self.profile or get_profile()
+        for options in profile.sections:
+            section = CVPdfSection(since=self.since, **options)
+            yield from self.section_flowables(
+                section.make_section_header_name(), (
+                    (title, ((e['text'], e['date']) for e in entries))
+                    for title, entries in section.iter_subsections(
+                        chunk_size)))
+
+    def make_doc_template(self, file, title):
+        """Return ReportLab document template that writes to ``file``."""
+        return SimpleDocTemplate(file,
+                                 pagesize=letter,
+                                 topMargin=MARGINS[0],
+                                 rightMargin=MARGINS[1],
+                                 bottomMargin=MARGINS[2],
+                                 leftMargin=MARGINS[3],
+                                 title='{}' .format(title))
+
+    def build_cv(self, file, document=None, stream=False):
+        """Combine elements to build a CV from parts.
+
+        ``document`` is the :class:`~cv.document.CVDocument` to lay out;
+        the cached document of the profile is used if it is not given.
+        If ``stream`` is ``True``, entries are instead read from the
+        database as the PDF is laid out (see :meth:`stream_flowables`).
+        Flowables are created as they are laid out either way, so memory
+        does not grow with the length of the CV.
+        """
+        if stream:
+            title = get_personal_name()
+            flowables = self.stream_flowables()
+        else:
+            if document is None:
+                document = get_document(self.profile, self.since)
+            title = document.name
+            flowables = self.document_flowables(document)
+        doc = self.make_doc_template(file, title)
         doc.build(
-            self.cv,
+            FlowableStream(flowables),
             onFirstPage=self.myFirstPage,
             onLaterPages=self.myLaterPages
         )
@@ -309,13 +675,79 @@ class CVPdf(CVPdfStyle):
         file.close()
         return pdf
 
+
+def build_cv_pdf(since=None, profile=None, stream=False):
+    """Return PDF of the ``profile`` of the CV limited to the window that
+    starts on ``since``, streamed from the database if ``stream`` is
+    ``True`` (see :meth:`CVPdf.build_cv`)."""
+    return CVPdf(since, profile).build_cv(io.BytesIO(), stream=stream)
+
+
+def get_cv_pdf(profile, since=None):
+    """Return cached PDF of ``profile`` limited to the window that starts
+    on ``since``, building it if necessary."""
+    return get_or_set(make_key('cv_pdf.%s' % profile.name, since),
+                      lambda: build_cv_pdf(since, profile))
+
+
+def get_request_profile(request):
+    """Return profile selected by the ``profile`` parameter of
+    ``request``."""
+    try:
+        return get_profile(request.GET.get('profile'))
+    except LookupError as e:
+        raise Http404(str(e))
+
+
+def get_build_response(request, build):
+    """Return response with the PDF of completed ``build``.
+
+    The response is validated by the build rather than by the CV
+    revision, which may be newer than the build.
+    """
+    etag = quote_etag('cv-pdf-%s-%s' % (build.pk, build.revision))
+    last_modified = calendar.timegm(build.finished.utctimetuple())
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(bytes(build.content),
+                                content_type='application/pdf')
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+@revision_condition
 def cv_pdf(request):
-    response = HttpResponse(content_type='application/pdf')
-    name = CV_PERSONAL_INFO['name'].lower().replace('.', '').split(' ')
-    name = ('_').join(name)
+    """Return PDF of the CV profile selected by the ``profile`` parameter,
+    limited to the last number of years given by the ``years`` parameter.
+    PDFs are cached for each profile and window until the CV changes.
+
+    If PDFs are built in the background (see :mod:`cv.builds`), the
+    newest completed build of the profile is returned when the default
+    window of the profile is requested.
+    """
+    profile = get_request_profile(request)
+    years = request.GET.get('years')
+    build = None
+    if is_enabled() and not years:
+        build = PDFBuild.objects.newest(profile.name)
+    if build is not None:
+        response = get_build_response(request, build)
+    else:
+        since = parse_window(years or profile.years)
+        response = HttpResponse(get_cv_pdf(profile, since),
+                                content_type='application/pdf')
+    name = get_personal_name().lower().replace('.', '').split()
+    name = ('_').join(name) or 'cv'
     response['Content-Disposition'] = 'filename="cv_{}.pdf"'.format(name)
-    buffer = io.BytesIO()
-    pdf = CVPdf()
-    pdf_out = pdf.build_cv(buffer)
-    response.write(pdf_out)
     return response
+
+
+def cv_pdf_status(request):
+    """Return JSON describing the newest completed build of the profile
+    selected by the ``profile`` parameter and whether a newer build is
+    pending. Returns 404 unless PDFs are built in the background."""
+    if not is_enabled():
+        raise Http404('PDFs are not built in the background.')
+    return JsonResponse(get_build_status(get_request_profile(request)))
@@ -0,0 +1,82 @@
+"""Views that search CV works."""
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+
+from cv.search import search
+from cv.settings import CV_SEARCH_PAGE_SIZE
+
+from .api import APIError, api_error_response, get_page_size
+from .conditional import revision_condition
+
+
+def get_search_page(query, page, per_page):
+    """Return list of results on ``page`` of search for ``query`` and
+    whether another page follows it."""
+    try:
+        results = search(query, per_page + 1, (page - 1) * per_page)
+    except ImproperlyConfigured as e:
+        raise Http404(str(e))
+    return results[:per_page], len(results) > per_page
+
+
+def get_page_number(request):
+    """Return page number requested by ``page``."""
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        raise APIError('Page must be an integer.')
+    if page < 1:
+        raise APIError('Page must be positive.')
+    return page
+
+
+def page_url(request, page):
+    """Return URL of ``page`` of the current search."""
+    params = request.GET.copy()
+    params['page'] = page
+    return '%s?%s' % (request.path, params.urlencode())
+
+
+@revision_condition
+def search_view(request):
+    """Display works matching query ``q``, best matches first."""
+    query = request.GET.get('q', '')
+    try:
+        page = get_page_number(request)
+    except APIError:
+        page = 1
+    results, has_next = get_search_page(query, page, CV_SEARCH_PAGE_SIZE)
+    return render(request, 'cv/search.html', {
+        'query': query,
+        'results': results,
+        'page': page,
+        'next_page_url': page_url(request, page + 1) if has_next else None,
+        'previous_page_url': page_url(request, page - 1) if page > 1 else None,
+    })
+
+
+@revision_condition
+@api_error_response
+def api_search_view(request):
+    """Return works matching query ``q`` of all types, best matches first.
+
+    Accepts the ``limit`` query parameter of
+    :func:`cv.views.api.api_list_view` and ``page``, the number of the page
+    of results.
+    """
+    query = request.GET.get('q', '')
+    results, has_next = get_search_page(
+        query, get_page_number(request), get_page_size(request))
+    return JsonResponse({
+        'query': query,
+        'results': [{
+            'model': result.model_name,
+            'id': result.pk,
+            'title': result.title,
+            'url': result.url or None,
+            'rank': result.rank,
+        } for result in results],
+        'next': (page_url(request, get_page_number(request) + 1)
+                 if has_next else None),
+    })
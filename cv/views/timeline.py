@@ -0,0 +1,76 @@
+"""Views that list CV works of all types, newest first."""
+from django.core.paginator import InvalidPage
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+
+from cv.settings import CV_SECTION_PAGE_SIZE
+from cv.timeline import TIMELINE_SOURCES, hydrate, paginate_timeline
+
+from .api import APIError, api_error_response, get_page_size
+from .conditional import revision_condition
+
+
+def get_timeline_types(request):
+    """Return list of the model names selected by the comma-separated
+    ``types`` parameter, or ``None`` if it is empty."""
+    param = request.GET.get('types', '')
+    if not param:
+        return None
+    available = [name for name, _, _ in TIMELINE_SOURCES]
+    types = [name.strip() for name in param.split(',') if name.strip()]
+    unknown = [name for name in types if name not in available]
+    if unknown:
+        raise APIError('Unknown types: %s. Available types: %s.' % (
+            ', '.join(unknown), ', '.join(available)))
+    return types
+
+
+def next_page_url(request, page):
+    """Return URL of the page after ``page`` or ``None``."""
+    if not page.has_next:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = page.next_cursor
+    return '%s?%s' % (request.path, params.urlencode())
+
+
+@revision_condition
+def timeline_view(request):
+    """Display works of all types, newest first."""
+    try:
+        page = paginate_timeline(
+            request.GET.get('cursor'), CV_SECTION_PAGE_SIZE,
+            get_timeline_types(request))
+    except (InvalidPage, APIError) as e:
+        raise Http404(str(e))
+    return render(request, 'cv/timeline.html', {
+        'entries': hydrate(page.object_list),
+        'next_page_url': next_page_url(request, page),
+    })
+
+
+@revision_condition
+@api_error_response
+def api_timeline_view(request):
+    """Return the ``type``, ``id``, ``date``, and ``title`` of works of all
+    types, newest first.
+
+    Accepts the ``limit`` and ``cursor`` query parameters of
+    :func:`cv.views.api.api_list_view` and ``types``, a comma-separated
+    list of the types to include.
+    """
+    try:
+        page = paginate_timeline(
+            request.GET.get('cursor'), get_page_size(request),
+            get_timeline_types(request))
+    except InvalidPage as e:
+        raise APIError(str(e))
+    return JsonResponse({
+        'results': [{
+            'type': entry.type,
+            'id': entry.pk,
+            'date': entry.date,
+            'title': entry.title,
+        } for entry in page],
+        'next': next_page_url(request, page),
+    })
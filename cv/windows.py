@@ -0,0 +1,101 @@
+"""Limit CV sections to a window of recent years.
+
+A window keeps items dated on or after its start: works published,
+presented, or offered since then, and positions, grants, and service that
+ended since then or have not ended. Undated items, such as publications
+still in progress or current students, are always kept. The window is
+applied as a filter in the database to every section.
+"""
+from django.db.models import Prefetch, Q
+from django.http import Http404
+from django.utils import timezone
+
+
+WINDOW_DATE_FIELDS = {
+    'award': 'date',
+    'degree': 'date_earned',
+    'position': ('start_date', 'end_date'),
+    'article': 'pub_date',
+    'book': 'pub_date',
+    'chapter': 'pub_date',
+    'report': 'pub_date',
+    'grant': ('start_date', 'end_date'),
+    'talk': 'presentations__presentation_date',
+    'otherwriting': 'date',
+    'dataset': 'pub_date',
+    'mediamention': 'date',
+    'service': ('start_date', 'end_date'),
+    'student': 'graduation_date',
+    'course': 'last_offered',
+}
+"""Names of models and the date field, ``(start, end)`` fields, or
+related date field that place their instances in a window. Instances of
+other models are not limited by windows."""
+
+MAX_WINDOW_YEARS = 100
+
+
+def get_window_start(years, today=None):
+    """Return the first date in a window of the last ``years`` years."""
+    if today is None:
+        today = timezone.now()
+        if timezone.is_aware(today):
+            today = timezone.localtime(today)
+        today = today.date()
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:  # February 29
+        return today.replace(year=today.year - years, day=28)
+
+
+def parse_window(value):
+    """Return the start of the window of the ``years`` query parameter
+    ``value``, or ``None`` for the full CV."""
+    if value in (None, ''):
+        return None
+    try:
+        years = int(value)
+    except ValueError:
+        raise Http404('Years must be an integer.')
+    if not 0 < years <= MAX_WINDOW_YEARS:
+        raise Http404('Years must be between 1 and %s.' % MAX_WINDOW_YEARS)
+    return get_window_start(years)
+
+
+def window_condition(model, since):
+    """Return condition for instances of ``model`` in the window that
+    starts on ``since``."""
+    field = WINDOW_DATE_FIELDS.get(model._meta.model_name)
+    if field is None or since is None:
+        return Q()
+    if not isinstance(field, str):
+        end = field[1]
+        return Q(**{end + '__gte': since}) | Q(**{end + '__isnull': True})
+    if '__' in field:
+        # Select instances with related dates in the window or without
+        # related dates, without joining, so that each instance appears
+        # once
+        related = model._base_manager.values('pk')
+        return Q(pk__in=related.filter(**{field + '__gte': since})) | \
+            ~Q(pk__in=related.filter(**{field + '__isnull': False}))
+    return Q(**{field + '__gte': since}) | Q(**{field + '__isnull': True})
+
+
+def window_queryset(queryset, since):
+    """Return ``queryset`` limited to the window that starts on ``since``.
+
+    Related dated items, such as the presentations of talks, are
+    prefetched limited to the window as well.
+    """
+    if since is None:
+        return queryset
+    model = queryset.model
+    queryset = queryset.filter(window_condition(model, since))
+    field = WINDOW_DATE_FIELDS.get(model._meta.model_name)
+    if isinstance(field, str) and '__' in field:
+        relation, date = field.split('__', 1)
+        related = model._meta.get_field(relation).related_model
+        queryset = queryset.prefetch_related(Prefetch(
+            relation, queryset=related.objects.filter(
+                **{date + '__gte': since})))
+    return queryset
@@ -0,0 +1,95 @@
+"""Tests for the Django-CV admin"""
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from nose.plugins.attrib import attr
+
+from cv.models import Article, ArticleAuthorship, Collaborator, Journal, \
+    Discipline
+from cv.models.base import PrefixSearchIndex
+from cv.settings import PUBLICATION_STATUS
+
+
+@attr('admin')
+@override_settings(ROOT_URLCONF='tests.admin_urls')
+class AdminTestCase(TestCase):
+    """Run tests of admin changelists and autocomplete widgets."""
+
+    @classmethod
+    def setUp(cls):
+        cls.user = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        discipline = Discipline.objects.create(name='Toons', slug='toons')
+        cls.journal = Journal.objects.create(
+            title='Journal of Toons', issn='1234-5678',
+            primary_discipline=discipline)
+        cls.warner = Collaborator.objects.create(
+            first_name="Yakko", last_name="Warner",
+            email="yakko.warner@wbwatertower.com")
+
+    def add_articles(self, n):
+        for i in range(n):
+            article = Article.objects.create(
+                title='Article %s' % i, short_title='Article %s' % i,
+                slug='article-%s-%s' % (n, i), journal=self.journal,
+                status=PUBLICATION_STATUS['PUBLISHED_STATUS'])
+            ArticleAuthorship.objects.create(
+                article=article, collaborator=self.warner, display_order=1)
+
+    def count_changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/cv/article/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_article_changelist_queries_do_not_grow(self):
+        self.client.force_login(self.user)
+        self.add_articles(2)
+        queries = self.count_changelist_queries()
+        self.add_articles(10)
+        self.assertEqual(self.count_changelist_queries(), queries)
+
+    def test_search_fields_use_prefix_indexes(self):
+        for model, model_admin in admin.site._registry.items():
+            if model._meta.app_label != 'cv':
+                continue
+            for field in model_admin.search_fields:
+                self.assertTrue(field.startswith('^'), (model, field))
+                path = field[1:].split('__')
+                target = model
+                for name in path[:-1]:
+                    target = target._meta.get_field(name).related_model
+                indexed = [i.field_name for i in target._meta.indexes
+                           if isinstance(i, PrefixSearchIndex)]
+                self.assertIn(path[-1], indexed, (model, field))
+
+    def test_article_changelist_search(self):
+        self.client.force_login(self.user)
+        self.add_articles(3)
+        response = self.client.get('/admin/cv/article/', {'q': 'journal'})
+        self.assertContains(response, 'Article 2')
+
+    def test_article_change_form_renders_selected_collaborators_only(self):
+        self.client.force_login(self.user)
+        self.add_articles(1)
+        for i in range(10):
+            Collaborator.objects.create(
+                first_name='Given%s' % i, last_name='Family%s' % i,
+                email='c%s@example.com' % i)
+        article = Article.objects.get()
+        response = self.client.get('/admin/cv/article/%s/change/' % article.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Family1')
+        self.assertContains(response, 'Warner, Yakko')
+
+    def test_collaborator_autocomplete(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            '/admin/autocomplete/',
+            {'term': 'war', 'app_label': 'cv', 'model_name': 'articleauthorship',
+             'field_name': 'collaborator'})
+        self.assertEqual(
+            [r['text'] for r in response.json()['results']], ['Warner, Yakko'])
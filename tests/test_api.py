@@ -0,0 +1,183 @@
+"""Tests for the Django-CV JSON API and keyset pagination"""
+from django.core.paginator import InvalidPage
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from nose.plugins.attrib import attr
+
+from cv.models import Article, ArticleAuthorship, Collaborator, Journal, \
+    Discipline, JournalService, Talk, Presentation
+from cv.pagination import keyset_paginate
+from cv.settings import PUBLICATION_STATUS
+
+import datetime
+
+
+class APITestCase(TestCase):
+    """Create articles with tied and missing publication dates."""
+
+    @classmethod
+    def setUp(cls):
+        cls.warner = Collaborator.objects.create(
+            first_name="Yakko", last_name="Warner",
+            email="yakko.warner@wbwatertower.com")
+        discipline = Discipline.objects.create(name='Toons', slug='toons')
+        cls.journal = Journal.objects.create(
+            title='Journal of Toons', issn='1234-5678',
+            primary_discipline=discipline)
+        dates = [datetime.date(2000 + i % 3, 1, 1) for i in range(9)]
+        dates += [None, None]
+        for i, pub_date in enumerate(dates):
+            article = Article.objects.create(
+                title='Article %s' % i, short_title='Article %s' % i,
+                slug='article-%s' % i, pub_date=pub_date,
+                journal=cls.journal,
+                status=PUBLICATION_STATUS['PUBLISHED_STATUS'])
+            ArticleAuthorship.objects.create(
+                article=article, collaborator=cls.warner, display_order=1)
+
+    def get_all_pages(self, queryset, per_page):
+        objects, cursor = [], None
+        while True:
+            page = keyset_paginate(queryset, cursor, per_page)
+            objects += page.object_list
+            if not page.has_next:
+                return objects
+            cursor = page.next_cursor
+
+
+@attr('api')
+class KeysetPaginationTestCase(APITestCase):
+    """Run tests of :func:`cv.pagination.keyset_paginate`."""
+
+    def test_pages_follow_ordering_with_ties_and_nulls(self):
+        for queryset in [Article.displayable.published(),
+                         Article.objects.order_by('pub_date'),
+                         Article.objects.all()]:
+            for per_page in [1, 2, 4, 20]:
+                objects = self.get_all_pages(queryset, per_page)
+                self.assertEqual(len(objects), 11)
+                self.assertEqual(len(set(o.pk for o in objects)), 11)
+        published = self.get_all_pages(Article.displayable.published(), 3)
+        dates = [a.pub_date for a in published]
+        self.assertEqual(dates[-2:], [None, None])
+        self.assertEqual(dates[:-2], sorted(dates[:-2], reverse=True))
+
+    def test_ordering_by_relation(self):
+        for journal in Journal.objects.all():
+            JournalService.objects.create(journal=journal)
+        discipline = Discipline.objects.get()
+        for title in ['B Journal', 'A Journal']:
+            JournalService.objects.create(journal=Journal.objects.create(
+                title=title, issn='0000-000%s' % len(title),
+                primary_discipline=discipline))
+        services = self.get_all_pages(JournalService.objects.all(), 1)
+        self.assertEqual([s.journal.title for s in services],
+                         ['A Journal', 'B Journal', 'Journal of Toons'])
+
+    def test_page_costs_one_query(self):
+        page = keyset_paginate(Article.displayable.published(), None, 3)
+        with self.assertNumQueries(1):
+            keyset_paginate(
+                Article.displayable.published(), page.next_cursor, 3)
+
+    def test_invalid_cursor(self):
+        page = keyset_paginate(Article.objects.order_by('title'), None, 3)
+        with self.assertRaises(InvalidPage):
+            keyset_paginate(Article.objects.all(), 'invalid', 3)
+        with self.assertRaises(InvalidPage):
+            keyset_paginate(Article.objects.all(), page.next_cursor, 3)
+
+
+@attr('api')
+class APIViewTestCase(APITestCase):
+    """Run tests of the JSON API views in :mod:`cv.views.api`."""
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_index(self):
+        data = self.client.get('/api/').json()
+        self.assertEqual(data['models']['article']['url'], '/api/articles/')
+        self.assertEqual(data['models']['article']['sections'],
+                         ['published', 'revise', 'inprep'])
+        self.assertIn('authorship', data['models']['article']['fields'])
+
+    def test_list_follows_next_links(self):
+        url, titles = '/api/articles/?section=published&limit=4', []
+        while url:
+            data = self.client.get(url).json()
+            titles += [result['title'] for result in data['results']]
+            url = data['next']
+        self.assertEqual(len(titles), 11)
+        self.assertEqual(len(set(titles)), 11)
+
+    def test_sparse_fields(self):
+        data = self.client.get(
+            '/api/articles/?fields=title,journal,authorship&limit=1').json()
+        self.assertEqual(data['results'], [{
+            'title': 'Article 2',
+            'journal': {'id': self.journal.pk, 'name': 'Journal of Toons'},
+            'authorship': [{
+                'collaborator': {'id': self.warner.pk,
+                                 'name': 'Warner, Yakko'},
+                'print_middle': True, 'display_order': 1,
+                'student_colleague': None}]}])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/articles/?fields=title')
+        sql = queries[-1]['sql']
+        self.assertIn('"title"', sql)
+        self.assertNotIn('"abstract"', sql)
+
+    def test_queries_do_not_grow_with_results(self):
+        url = '/api/articles/?limit=100'
+        queries = self.count_queries(url)
+        for article in Article.objects.all():
+            ArticleAuthorship.objects.create(
+                article=article, display_order=2,
+                collaborator=Collaborator.objects.create(
+                    first_name='Wakko', last_name=article.slug,
+                    email='%s@example.com' % article.slug))
+        self.assertEqual(self.count_queries(url), queries)
+
+    def test_related_items(self):
+        talk = Talk.objects.create(
+            title='Talk', short_title='Talk', slug='talk')
+        Presentation.objects.create(
+            talk=talk, presentation_date=datetime.date(2010, 1, 1),
+            type=Presentation.INVITED, event='Toon Con')
+        data = self.client.get(
+            '/api/talks/%s/?fields=title,presentations' % talk.pk).json()
+        self.assertEqual(data['presentations'][0]['event'], 'Toon Con')
+        self.assertNotIn('talk', data['presentations'][0])
+
+    def test_detail_only_displayable(self):
+        article = Article.objects.first()
+        self.assertEqual(self.client.get(
+            '/api/articles/%s/?fields=slug' % article.pk).json(),
+            {'slug': article.slug})
+        Article.objects.filter(pk=article.pk).update(display=False)
+        self.assertEqual(self.client.get(
+            '/api/articles/%s/' % article.pk).status_code, 404)
+
+    def test_errors(self):
+        for url in ['/api/articles/?fields=nope',
+                    '/api/articles/?section=nope',
+                    '/api/articles/?limit=x',
+                    '/api/articles/?cursor=nope']:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.json())
+        self.assertEqual(self.client.get('/api/collaborators/').status_code,
+                         404)
+
+    def test_revision_etag(self):
+        response = self.client.get('/api/articles/')
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                '/api/articles/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
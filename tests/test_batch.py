@@ -0,0 +1,249 @@
+"""Tests for batch changes to CV works"""
+from django.contrib.auth.models import User, Permission
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from nose.plugins.attrib import attr
+
+from cv.batch import reorder_collaborations, update_works
+from cv.models import Article, ArticleAuthorship, Chapter, \
+    ChapterEditorship, Collaborator, CVRevision, Talk
+from cv.settings import PUBLICATION_STATUS
+
+import json
+
+
+class BatchTestCase(TestCase):
+    """Create articles with authors for batch tests."""
+
+    @classmethod
+    def setUp(cls):
+        cls.collaborators = [
+            Collaborator.objects.create(
+                first_name=first, last_name="Warner",
+                email="%s.warner@wbwatertower.com" % first.lower())
+            for first in ("Yakko", "Wakko", "Dot")]
+        cls.articles = list()
+        for i, status in enumerate(['INPREP_STATUS', 'SUBMITTED_STATUS',
+                                    'PUBLISHED_STATUS']):
+            article = Article.objects.create(
+                title='Article %s' % i, short_title='Article %s' % i,
+                slug='article-%s' % i, status=PUBLICATION_STATUS[status])
+            for order, collaborator in enumerate(cls.collaborators, 1):
+                ArticleAuthorship.objects.create(
+                    article=article, collaborator=collaborator,
+                    display_order=order)
+            cls.articles.append(article)
+
+    def get_authors(self, article):
+        return [a.collaborator.first_name
+                for a in article.authorship.order_by('display_order')]
+
+    def get_flags(self, article):
+        article.refresh_from_db()
+        return (article.is_inprep, article.is_inrevision,
+                article.is_published)
+
+
+@attr('batch')
+class PublicationQuerySetTestCase(BatchTestCase):
+    """Run tests of :class:`cv.models.managers.PublicationQuerySet`."""
+
+    def test_update_status_sets_status_fields(self):
+        Article.objects.filter(pk=self.articles[0].pk).update(
+            status=PUBLICATION_STATUS['PUBLISHED_STATUS'])
+        self.assertEqual(self.get_flags(self.articles[0]),
+                         (False, False, True))
+        Article.objects.update(status=PUBLICATION_STATUS['RESTING_STATUS'])
+        for article in self.articles:
+            self.assertEqual(self.get_flags(article), (False, False, False))
+
+    def test_update_status_with_expression(self):
+        Article.objects.filter(pk=self.articles[0].pk).update(
+            status=F('status') + PUBLICATION_STATUS['SUBMITTED_STATUS'])
+        self.assertEqual(self.get_flags(self.articles[0]),
+                         (False, True, False))
+
+    def test_status_buckets_ignore_stale_status_fields(self):
+        Article._base_manager.update(
+            status=PUBLICATION_STATUS['PUBLISHED_STATUS'],
+            is_published=False, is_inprep=True)
+        self.assertEqual(Article.displayable.published().count(), 3)
+        self.assertFalse(Article.displayable.inprep().exists())
+        self.assertEqual(Article.objects.published().count(), 3)
+
+    def test_status_indexes(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Article._meta.db_table)
+        indexes = [c['columns'] for c in constraints.values() if c['index']]
+        self.assertIn(['display', 'status', 'pub_date'], indexes)
+        self.assertIn(['display', 'status', 'submission_date'], indexes)
+
+    def test_set_status_fields(self):
+        Article.objects.update(is_inprep=True, is_published=True)
+        with self.assertNumQueries(1):
+            Article.objects.all().set_status_fields()
+        self.assertEqual(
+            [self.get_flags(article) for article in self.articles],
+            [(True, False, False), (False, True, False),
+             (False, False, True)])
+
+
+@attr('batch')
+class ReorderTestCase(BatchTestCase):
+    """Run tests of :func:`cv.batch.reorder_collaborations`."""
+
+    def test_reorder_swaps_authors(self):
+        article = self.articles[0]
+        authorships = list(article.authorship.order_by('display_order'))
+        revision = CVRevision.objects.current().revision
+        reorder_collaborations(
+            article, 'authorship',
+            [authorships[2].pk, authorships[0].pk, authorships[1].pk])
+        self.assertEqual(self.get_authors(article), ['Dot', 'Yakko', 'Wakko'])
+        self.assertEqual(CVRevision.objects.current().revision, revision + 1)
+
+    def test_reorder_editorship(self):
+        chapter = Chapter.objects.create(
+            title='Chapter', short_title='Chapter', slug='chapter',
+            book_title='Book', status=PUBLICATION_STATUS['PUBLISHED_STATUS'])
+        editors = [ChapterEditorship.objects.create(
+            chapter=chapter, collaborator=c, display_order=i)
+            for i, c in enumerate(self.collaborators[:2], 1)]
+        reorder_collaborations(
+            chapter, 'editorship', [editors[1].pk, editors[0].pk])
+        self.assertEqual(
+            [e.collaborator.first_name
+             for e in chapter.editorship.order_by('display_order')],
+            ['Wakko', 'Yakko'])
+
+    def test_reorder_requires_every_collaboration(self):
+        article = self.articles[0]
+        pks = list(article.authorship.values_list('pk', flat=True))
+        with self.assertRaises(ValidationError):
+            reorder_collaborations(article, 'authorship', pks[:2])
+        with self.assertRaises(ValidationError):
+            reorder_collaborations(article, 'authorship', pks[:2] + pks[:1])
+        with self.assertRaises(ValidationError):
+            reorder_collaborations(article, 'editorship', pks)
+
+
+@attr('batch')
+class UpdateWorksTestCase(BatchTestCase):
+    """Run tests of :func:`cv.batch.update_works`."""
+
+    def test_update_status(self):
+        pks = [self.articles[0].pk, self.articles[1].pk]
+        # Savepoint, update, revision bump, and release of savepoint
+        with self.assertNumQueries(4):
+            updated = update_works(
+                Article, pks, status=PUBLICATION_STATUS['INPRESS_STATUS'])
+        self.assertEqual(updated, 2)
+        self.assertEqual(Article.displayable.published().count(), 3)
+
+    def test_update_display(self):
+        talk = Talk.objects.create(
+            title='Talk', short_title='Talk', slug='talk')
+        update_works(Talk, [talk.pk], display=False)
+        self.assertFalse(Talk.displayable.exists())
+
+    def test_invalid_updates(self):
+        talk = Talk.objects.create(
+            title='Talk', short_title='Talk', slug='talk')
+        with self.assertRaises(ValidationError):
+            update_works(Talk, [talk.pk], status=60)
+        with self.assertRaises(ValidationError):
+            update_works(Article, [1], status=12345)
+        with self.assertRaises(ValidationError):
+            update_works(Article, [1], title='New')
+
+
+@attr('batch')
+class BatchViewTestCase(BatchTestCase):
+    """Run tests of :func:`cv.views.batch.batch_view`."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('editor', password='password')
+        self.user.user_permissions.add(
+            Permission.objects.get(codename='change_article'))
+        self.client.force_login(self.user)
+
+    def post(self, body):
+        return self.client.post(
+            '/batch/', json.dumps(body), content_type='application/json')
+
+    def test_batch(self):
+        article = self.articles[0]
+        authorships = list(article.authorship.order_by('display_order'))
+        response = self.post({
+            'reorder': [{'model': 'article', 'id': article.pk,
+                         'relation': 'authorship',
+                         'order': [a.pk for a in reversed(authorships)]}],
+            'update': [{'model': 'article', 'ids': [article.pk],
+                        'status': PUBLICATION_STATUS['PUBLISHED_STATUS'],
+                        'display': False}]})
+        self.assertEqual(response.json(), {'reordered': 1, 'updated': 1})
+        self.assertEqual(self.get_authors(article), ['Dot', 'Wakko', 'Yakko'])
+        self.assertEqual(self.get_flags(article), (False, False, True))
+        self.assertFalse(article.display)
+
+    def test_invalid_batch_makes_no_changes(self):
+        article = self.articles[0]
+        authorships = list(article.authorship.order_by('display_order'))
+        response = self.post({
+            'reorder': [{'model': 'article', 'id': article.pk,
+                         'order': [a.pk for a in reversed(authorships)]}],
+            'update': [{'model': 'article', 'ids': [article.pk],
+                        'status': 12345}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+        self.assertEqual(self.get_authors(article), ['Yakko', 'Wakko', 'Dot'])
+
+    def test_malformed_batch(self):
+        for body in ({'reorder': ['x']}, {'update': {'model': 'article'}},
+                     {'update': [None]}, []):
+            response = self.post(body)
+            self.assertEqual(response.status_code, 400, body)
+            self.assertIn('error', response.json())
+
+    def test_batch_requires_permission(self):
+        response = self.post({'update': [
+            {'model': 'talk', 'ids': [1], 'display': False}]})
+        self.assertEqual(response.status_code, 403)
+
+    def test_batch_requires_post(self):
+        self.assertEqual(self.client.get('/batch/').status_code, 405)
+
+
+@attr('batch')
+@override_settings(ROOT_URLCONF='tests.admin_urls')
+class BatchAdminActionTestCase(BatchTestCase):
+    """Run tests of batch admin actions."""
+
+    def test_status_and_renumber_actions(self):
+        user = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        pks = [a.pk for a in self.articles]
+        response = self.client.post('/admin/cv/article/', {
+            'action': 'set_status_%s' % PUBLICATION_STATUS['REVISE_STATUS'],
+            '_selected_action': pks})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Article.displayable.revise().count(), 3)
+        self.client.post('/admin/cv/article/', {
+            'action': 'hide_selected', '_selected_action': pks[:1]})
+        self.assertEqual(Article.displayable.count(), 2)
+        ArticleAuthorship.objects.filter(article=self.articles[0]).update(
+            display_order=F('display_order') * 10)
+        self.client.post('/admin/cv/article/', {
+            'action': 'renumber_collaborations', '_selected_action': pks[:1]})
+        self.assertEqual(
+            list(self.articles[0].authorship.order_by(
+                'display_order').values_list('display_order', flat=True)),
+            [1, 2, 3])
+        self.assertEqual(self.get_authors(self.articles[0]),
+                         ['Yakko', 'Wakko', 'Dot'])
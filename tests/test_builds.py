@@ -0,0 +1,182 @@
+"""Tests for background builds of the PDFs of CV profiles"""
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nose.plugins.attrib import attr
+from unittest import mock
+
+from cv.builds import queue_profiles, run_build, run_builds
+from cv.models import Award, CVRevision, PDFBuild
+
+from contextlib import contextmanager
+import datetime
+import io
+
+PROFILES = {
+    'short': {'sections': [{'model_name': 'award', 'date_field': 'date'}]},
+}
+
+
+@attr('builds')
+@mock.patch('cv.builds.CV_PDF_QUEUE', True)
+@override_settings(CV_PROFILES=PROFILES)
+class PDFBuildTestCase(TestCase):
+
+    @classmethod
+    def setUp(cls):
+        cache.clear()
+
+    @contextmanager
+    def commit(self):
+        """Run the callbacks registered in the block as if its transaction
+        committed."""
+        with self.captureOnCommitCallbacks(execute=True):
+            yield
+        # The transaction of the test never commits; drop its callbacks as
+        # a commit would
+        connection.run_on_commit.clear()
+
+    def create_award(self, name='Award'):
+        with self.commit():
+            return Award.objects.create(
+                name=name, organization='Acme',
+                date=datetime.date(2010, 1, 1))
+
+    def test_changes_queue_one_build_per_profile(self):
+        self.create_award()
+        self.create_award('Other Award')
+        self.assertEqual(
+            sorted(PDFBuild.objects.values_list('profile', 'status')),
+            [('full', PDFBuild.PENDING), ('short', PDFBuild.PENDING)])
+
+    def test_builds_are_queued_once_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for name in ('Award', 'Other Award', 'Third Award'):
+                Award.objects.create(
+                    name=name, organization='Acme',
+                    date=datetime.date(2010, 1, 1))
+            self.assertFalse(PDFBuild.objects.exists())
+        self.assertEqual(callbacks, [queue_profiles])
+        with CaptureQueriesContext(connection) as queries:
+            callbacks[0]()
+        self.assertEqual(PDFBuild.objects.count(), 2)
+        self.assertLessEqual(len(queries), 5)
+
+    def test_rolled_back_savepoint_does_not_drop_builds(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    Award.objects.create(
+                        name='Award', organization='Acme',
+                        date=datetime.date(2010, 1, 1))
+                    raise ValueError
+            except ValueError:
+                pass
+            Award.objects.create(
+                name='Other Award', organization='Acme',
+                date=datetime.date(2010, 1, 1))
+        self.assertEqual(callbacks, [queue_profiles])
+
+    def test_builds_are_run_once(self):
+        self.create_award()
+        builds = run_builds()
+        self.assertEqual([b.status for b in builds], [PDFBuild.DONE] * 2)
+        self.assertTrue(bytes(builds[0].content).startswith(b'%PDF'))
+        self.assertEqual(run_builds(), [])
+        self.assertIsNone(PDFBuild.objects.claim())
+
+    def test_newer_builds_replace_older_builds(self):
+        self.create_award()
+        run_builds()
+        self.create_award('Other Award')
+        run_builds()
+        builds = PDFBuild.objects.filter(profile='full')
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(builds[0].revision,
+                         CVRevision.objects.current().revision)
+
+    def test_failed_builds_store_errors(self):
+        PDFBuild.objects.enqueue(['missing'])
+        build = run_builds()[0]
+        self.assertEqual(build.status, PDFBuild.FAILED)
+        self.assertIn('LookupError', build.error)
+
+    def test_stalled_builds_are_queued_again(self):
+        self.create_award()
+        build = PDFBuild.objects.claim()
+        self.assertEqual(PDFBuild.objects.requeue_stalled(
+            build.started + datetime.timedelta(seconds=1)), 1)
+        self.assertEqual(PDFBuild.objects.get(pk=build.pk).status,
+                         PDFBuild.PENDING)
+
+    def test_stalled_builds_do_not_duplicate_pending_builds(self):
+        self.create_award()
+        build = PDFBuild.objects.claim()
+        self.create_award('Other Award')
+        PDFBuild.objects.requeue_stalled(
+            build.started + datetime.timedelta(seconds=1))
+        self.assertFalse(PDFBuild.objects.filter(pk=build.pk).exists())
+        self.assertEqual(
+            PDFBuild.objects.filter(profile=build.profile).count(), 1)
+
+    def test_older_failures_are_deleted(self):
+        PDFBuild.objects.enqueue(['missing'])
+        first = run_builds()[0]
+        PDFBuild.objects.enqueue(['missing'])
+        second = run_builds()[0]
+        self.assertEqual(list(PDFBuild.objects.filter(profile='missing')),
+                         [second])
+        self.assertNotEqual(first.pk, second.pk)
+        failed = PDFBuild.objects.create(
+            profile='full', status=PDFBuild.FAILED, revision=0)
+        build = run_build(PDFBuild.objects.create(
+            profile='full', status=PDFBuild.RUNNING))
+        self.assertEqual(build.status, PDFBuild.DONE)
+        self.assertFalse(PDFBuild.objects.filter(pk=failed.pk).exists())
+
+    def test_pdf_serves_newest_build(self):
+        self.create_award()
+        run_builds()
+        build = PDFBuild.objects.newest('full')
+        self.create_award('Other Award')
+        url = reverse('cv:cv_pdf')
+        response = self.client.get(url)
+        self.assertEqual(response.content, bytes(build.content))
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        status = self.client.get(reverse('cv:cv_pdf_status')).json()
+        self.assertEqual(status['build']['revision'], build.revision)
+        self.assertTrue(status['pending'])
+        self.assertFalse(status['current'])
+        run_builds()
+        status = self.client.get(reverse('cv:cv_pdf_status'),
+                                 {'profile': 'short'}).json()
+        self.assertFalse(status['pending'])
+        self.assertTrue(status['current'])
+
+    def test_pdf_is_built_without_completed_build(self):
+        self.create_award()
+        response = self.client.get(reverse('cv:cv_pdf'))
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
+    def test_worker_command(self):
+        out = io.StringIO()
+        call_command('run_pdf_builds', once=True, enqueue=True, stdout=out)
+        self.assertIn('Built full', out.getvalue())
+        self.assertIn('Built short', out.getvalue())
+
+
+@attr('builds')
+class PDFBuildDisabledTestCase(TestCase):
+
+    def test_changes_do_not_queue_builds(self):
+        Award.objects.create(
+            name='Award', organization='Acme', date=datetime.date(2010, 1, 1))
+        self.assertFalse(PDFBuild.objects.exists())
+        response = self.client.get(reverse('cv:cv_pdf_status'))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,148 @@
+"""Tests for the format-neutral CV document and its renderers"""
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nose.plugins.attrib import attr
+
+from cv.document import get_document, markup_to_html, markup_to_runs, \
+    markup_to_text
+from cv.models import Article, ArticleAuthorship, Collaborator, \
+    Presentation, Talk
+from cv.renderers import RENDERERS, get_renderer
+from cv.settings import PUBLICATION_STATUS
+
+from xml.etree import ElementTree
+import datetime
+import io
+import json
+import os
+import tempfile
+import zipfile
+
+
+def get_content(response):
+    """Return text of streamed ``response``."""
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+@attr('document')
+class CVDocumentTestCase(TestCase):
+    """Create articles with an author and an invited talk."""
+
+    @classmethod
+    def setUp(cls):
+        cache.clear()
+        author = Collaborator.objects.create(
+            first_name='Ann', last_name='Author', email='ann@example.com')
+        for status, title in (('PUBLISHED_STATUS', 'Printed'),
+                              ('INPREP_STATUS', 'Drafted')):
+            article = Article.objects.create(
+                title=title, short_title=title, slug=title.lower(),
+                status=PUBLICATION_STATUS[status],
+                pub_date=datetime.date(2001, 1, 1))
+            ArticleAuthorship.objects.create(
+                article=article, collaborator=author, display_order=1)
+        talk = Talk.objects.create(
+            title='Talk & Chat', short_title='Talk', slug='talk')
+        Presentation.objects.create(
+            talk=talk, presentation_date=datetime.date(2010, 1, 1),
+            type=10, event='Conference')
+
+    def test_document_structure(self):
+        document = get_document()
+        sections = {s.model_name: s for s in document.sections}
+        self.assertEqual(list(sections), ['article', 'talk'])
+        titles = [s.title for s in sections['article'].subsections]
+        self.assertEqual(titles, ['Published', 'In Preparation'])
+        entry = sections['article'].subsections[0].entries[0]
+        self.assertEqual(entry.date, '2001')
+        self.assertEqual(entry.plain_text, 'Ann Author. “Printed.”')
+        talk = sections['talk'].subsections[0]
+        self.assertIsNone(talk.title)
+        self.assertIn('<sup>*</sup>', talk.entries[0].html)
+
+    def test_markup_conversion(self):
+        markup = 'A <i>B</i><br />C<super rise=3>*</super> &amp; D'
+        self.assertEqual(markup_to_html(markup),
+                         'A <i>B</i><br>C<sup>*</sup> &amp; D')
+        self.assertEqual(markup_to_text(markup), 'A B C* & D')
+
+    def test_markup_runs(self):
+        runs = markup_to_runs('A <i>B &amp; <b>C</b></i><br />D')
+        self.assertEqual(runs, [
+            ('A ', set()), ('B & ', {'i'}), ('C', {'i', 'b'}), ('\n', set()),
+            ('D', set())])
+
+    def test_markdown(self):
+        text = get_renderer('md').render(get_document()).decode('utf-8')
+        self.assertIn('## Articles\n\n### Published\n\n'
+                      '- **2001** Ann Author. “Printed.”\n', text)
+        self.assertIn('“Talk & Chat.”  \n  Conference (Jan 2010)<sup>\\*</sup>',
+                      text)
+
+    def test_json_resume(self):
+        resume = json.loads(get_renderer('jsonresume').render(get_document()))
+        self.assertEqual(resume['publications'][0],
+                         {'name': 'Ann Author. “Printed.”',
+                          'releaseDate': '2001'})
+        self.assertEqual(resume['projects'][0]['type'], 'Talks')
+
+    def test_docx(self):
+        renderer = get_renderer('docx')
+        chunks = list(renderer.stream(get_document()))
+        self.assertGreater(len(chunks), 1)
+        docx = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        self.assertIsNone(docx.testzip())
+        root = ElementTree.fromstring(docx.read('word/document.xml'))
+        text = ''.join(root.itertext())
+        self.assertIn('Ann Author. “Printed.”', text)
+        self.assertIn('Talk & Chat.', text)
+        self.assertEqual(renderer.get_filename(get_document())[-5:], '.docx')
+
+    def test_export_command_renders_one_document(self):
+        formats = sorted(RENDERERS)
+        with tempfile.TemporaryDirectory() as tmp:
+            with CaptureQueriesContext(connection) as one:
+                call_command('export_cv', 'txt', output_dir=tmp,
+                             stdout=io.StringIO())
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                call_command('export_cv', *formats, output_dir=tmp,
+                             stdout=io.StringIO())
+            self.assertEqual(len(queries), len(one))
+            self.assertEqual(len(os.listdir(tmp)), len(formats))
+
+    def test_renderers_use_cached_document(self):
+        get_document()
+        for format in ('html', 'json', 'txt', 'pdf'):
+            renderer = get_renderer(format)
+            with CaptureQueriesContext(connection) as queries:
+                output = renderer.render(get_document())
+            # Only the revision is read for the cache key
+            self.assertEqual(len(queries), 1, format)
+            self.assertTrue(output)
+        with self.assertRaises(LookupError):
+            get_renderer('doc')
+        self.assertIn('txt', RENDERERS)
+
+    def test_export_view(self):
+        url = reverse('cv:cv_export', kwargs={'format': 'json'})
+        data = json.loads(get_content(self.client.get(url)))
+        self.assertEqual(data['sections'][1]['subsections'][0]['entries'][0]
+                         ['text'], '“Talk & Chat.” Conference '
+                         '(Jan 2010)*')
+        response = self.client.get(
+            reverse('cv:cv_export', kwargs={'format': 'txt'}))
+        self.assertEqual(response['Content-Type'],
+                         'text/plain; charset=utf-8')
+        self.assertIn('ARTICLES', get_content(response))
+        response = self.client.get(
+            reverse('cv:cv_export', kwargs={'format': 'html'}))
+        self.assertContains(response, 'Talk &amp; Chat')
+        response = self.client.get(
+            reverse('cv:cv_export', kwargs={'format': 'doc'}))
+        self.assertEqual(response.status_code, 404)
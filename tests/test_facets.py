@@ -0,0 +1,88 @@
+"""Tests for faceted browsing of CV works"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nose.plugins.attrib import attr
+
+from cv.facets import count_facets, get_cube, get_work_groups
+from cv.models import Article, Discipline, Talk, Presentation
+from cv.settings import PUBLICATION_STATUS
+
+import datetime
+
+
+@attr('facets')
+class FacetTestCase(TestCase):
+    """Run tests of facet counts and the browse view."""
+
+    @classmethod
+    def setUp(cls):
+        cache.clear()
+        cls.toons = Discipline.objects.create(name='Toons', slug='toons')
+        cls.acme = Discipline.objects.create(name='Acme', slug='acme')
+        for i in range(4):
+            article = Article.objects.create(
+                title='Article %s' % i, short_title='Article %s' % i,
+                slug='article-%s' % i, primary_discipline=cls.toons,
+                pub_date=datetime.date(2000 + i % 2, 1, 1),
+                status=PUBLICATION_STATUS['PUBLISHED_STATUS'])
+        Article.objects.create(
+            title='Draft', short_title='Draft', slug='draft',
+            submission_date=datetime.date(2001, 6, 1),
+            status=PUBLICATION_STATUS['INPREP_STATUS'])
+        article.other_disciplines.add(cls.acme)
+        cls.talk = Talk.objects.create(
+            title='Talk', short_title='Talk', slug='talk',
+            primary_discipline=cls.acme)
+        Presentation.objects.create(
+            talk=cls.talk, presentation_date=datetime.date(2001, 1, 1),
+            type=10, event='Conference')
+
+    def test_cube_is_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            cube = get_cube()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(sum(row.count for row in cube if row.primary), 6)
+
+    def test_counts_apply_other_facets(self):
+        counts, total = count_facets(get_cube(), {})
+        self.assertEqual(total, 6)
+        self.assertEqual(counts['type'], {'article': 5, 'talk': 1})
+        self.assertEqual(counts['year'][2001], 4)
+        self.assertEqual(counts['discipline'][self.acme.pk], 2)
+        self.assertEqual(counts['status']['published'], 4)
+        counts, total = count_facets(
+            get_cube(), {'discipline': self.acme.pk, 'year': 2001})
+        self.assertEqual(total, 2)
+        self.assertEqual(counts['type'], {'article': 1, 'talk': 1})
+        self.assertEqual(counts['discipline'][self.toons.pk], 2)
+
+    def test_work_groups_match_counts(self):
+        filters = {'discipline': self.acme.pk, 'year': 2001}
+        counts, total = count_facets(get_cube(), filters)
+        groups = get_work_groups(filters, counts['type'])
+        self.assertEqual([name for name, _ in groups], ['article', 'talk'])
+        self.assertEqual(sum(qs.count() for _, qs in groups), total)
+        groups = get_work_groups({'year': 2001, 'status': 'inprep'})
+        self.assertEqual(
+            [(name, [obj.slug for obj in qs]) for name, qs in groups],
+            [('article', ['draft']), ('book', []), ('chapter', []),
+             ('report', [])])
+
+    def test_browse_view(self):
+        url = reverse('cv:browse')
+        response = self.client.get(url, {'discipline': 'acme'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total'], 2)
+        self.assertContains(response, 'href="/browse/?discipline=acme&amp;type=talk"')
+        self.assertContains(response, self.talk.get_absolute_url())
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {'discipline': 'acme', 'type': 'talk'})
+        # Revision checks, the cached cube and disciplines, and talks
+        self.assertLessEqual(len(queries), 4)
+        for params in [{'type': 'award'}, {'discipline': 'none'},
+                       {'year': 'x'}, {'status': 'retracted'}]:
+            self.assertEqual(self.client.get(url, params).status_code, 404)
@@ -0,0 +1,119 @@
+"""Tests for formatters of the text of CV entries"""
+from django.test import TestCase
+
+from nose.plugins.attrib import attr
+
+from cv.formatters import FORMATTERS, TemplateFormatter, get_formatter, \
+    get_default_template_name
+from cv.models import Article, ArticleAuthorship, Award, Book, Chapter, \
+    ChapterAuthorship, ChapterEditorship, Collaborator, Course, \
+    CourseOffering, Degree, Grant, OtherWriting, Position, Presentation, \
+    Report, ReportAuthorship, Student, Talk
+from cv.records import get_records
+from cv.settings import PUBLICATION_STATUS
+
+import datetime
+
+
+@attr('formatters')
+class FormatterTestCase(TestCase):
+    """Create two instances of each model of the PDF, one with optional
+    fields left blank and one with text that must be escaped."""
+
+    @classmethod
+    def setUp(cls):
+        published = PUBLICATION_STATUS['PUBLISHED_STATUS']
+        date = datetime.date(2010, 5, 1)
+        author = Collaborator.objects.create(
+            first_name='Ann', middle_initial='B.', last_name='Author',
+            email='ann@example.com')
+        for i, text in enumerate(('', 'R&D <Lab>')):
+            kwargs = {'short_title': 'Work %s' % i, 'slug': 'work-%s' % i}
+            article = Article.objects.create(
+                title='Article %s' % text, status=published, pub_date=date,
+                volume=text and '2', issue=text and '3',
+                start_page=text and '10', end_page=text and '20', **kwargs)
+            ArticleAuthorship.objects.create(
+                article=article, collaborator=author, display_order=1)
+            Book.objects.create(
+                title='Book %s' % text, status=published, pub_date=date,
+                publisher=text, **kwargs)
+            chapter = Chapter.objects.create(
+                title='Chapter %s' % text, status=published, pub_date=date,
+                book_title='Edited', place=text, publisher=text,
+                start_page=text and '1', **kwargs)
+            ChapterAuthorship.objects.create(
+                chapter=chapter, collaborator=author, display_order=1)
+            if text:
+                ChapterEditorship.objects.create(
+                    chapter=chapter, collaborator=author, display_order=1)
+            report = Report.objects.create(
+                title='Report %s' % text, status=published, pub_date=date,
+                institution=text, place=text, **kwargs)
+            ReportAuthorship.objects.create(
+                report=report, collaborator=author, display_order=1)
+            Award.objects.create(
+                name='Award %s' % text, organization='Acme', date=date)
+            course = Course(
+                title='Course %s' % text, short_description='Short',
+                full_description='Long', student_level=0)
+            course.save()
+            if text:
+                CourseOffering.objects.create(
+                    course=course, term=10, start_date=date, end_date=date)
+            Degree.objects.create(
+                degree='PhD', date_earned=date, institution=text or 'U',
+                city='City', state='ST', country='US', honors=text,
+                major=text)
+            Grant.objects.create(
+                title='Grant %s' % text, start_date=date, abstract='',
+                source=40, amount=1000, **kwargs)
+            OtherWriting.objects.create(
+                title='Writing %s' % text, venue='Venue', date=date,
+                **kwargs)
+            Position.objects.create(
+                title='Position %s' % text, start_date=date, end_date=date,
+                institution='U', project=text, department=text,
+                current_position=False, primary_position=False)
+            Student.objects.create(
+                first_name='Stu', last_name='Dent %s' % text, role='Advisor',
+                middle_name=text, student_level=0,
+                current_position=text, graduation_date=text and date or None)
+            talk = Talk.objects.create(title='Talk %s' % text, **kwargs)
+            if text:
+                for kind in (10, 20):
+                    Presentation.objects.create(
+                        talk=talk, presentation_date=date, type=kind,
+                        event=text)
+
+    def test_formatters_match_templates(self):
+        for model in (Article, Award, Book, Chapter, Course, Degree, Grant,
+                      OtherWriting, Position, Report, Student, Talk):
+            model_name = model._meta.model_name
+            formatter = get_formatter(model_name)
+            self.assertIs(formatter, FORMATTERS[model_name])
+            template = TemplateFormatter(
+                model_name, get_default_template_name(model_name))
+            records = get_records(model.displayable.all())
+            self.assertEqual(len(records), 2, model_name)
+            for record in records:
+                self.assertEqual(formatter(record), template(record),
+                                 model_name)
+
+    def test_formatters_match_templates_for_instances(self):
+        for model in (Award, Course, Degree, Grant, OtherWriting, Position,
+                      Student, Talk):
+            model_name = model._meta.model_name
+            template = TemplateFormatter(
+                model_name, get_default_template_name(model_name))
+            for instance in model.displayable.all():
+                self.assertEqual(FORMATTERS[model_name](instance),
+                                 template(instance), model_name)
+        talk = Talk.displayable.get(title__contains='Lab')
+        self.assertIn('<super rise=3>*</super>', FORMATTERS['talk'](talk))
+
+    def test_other_templates_are_rendered(self):
+        formatter = get_formatter('award', 'cv/pdf/otherwriting.xml')
+        self.assertIsInstance(formatter, TemplateFormatter)
+        formatter = get_formatter('mediamention', 'cv/pdf/award.xml')
+        self.assertIsInstance(formatter, TemplateFormatter)
@@ -0,0 +1,193 @@
+"""Tests for Django-CV forms and autocomplete"""
+from django.core.cache import cache
+from django.db import connection
+from django.forms.formsets import BaseFormSet
+from django.forms.models import BaseInlineFormSet
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from unittest import mock
+
+from nose.plugins.attrib import attr
+
+from cv.forms import authorship_formset_factory, AutocompleteSelect
+from cv.models import Article, ArticleAuthorship, Collaborator, Journal, \
+    Discipline
+from cv.settings import PUBLICATION_STATUS, CV_AUTOCOMPLETE_PAGE_SIZE
+from cv.views.forms import get_formset_classes, get_model_form_class
+
+
+@attr('forms')
+class AutocompleteTestCase(TestCase):
+    """
+    Run tests of autocomplete widgets and
+    :func:`~cv.views.forms.autocomplete_view`.
+    """
+
+    @classmethod
+    def setUp(cls):
+        cache.clear()
+        for i in range(CV_AUTOCOMPLETE_PAGE_SIZE + 5):
+            Collaborator.objects.create(
+                first_name='Given%02d' % i, last_name='Family%02d' % i,
+                email='collaborator%02d@example.com' % i)
+        cls.warner = Collaborator.objects.create(
+            first_name="Yakko", last_name="Warner",
+            email="yakko.warner@wbwatertower.com")
+        cls.article = Article.objects.create(
+            title='Animaniacs', short_title='Animaniacs', slug='animaniacs',
+            status=PUBLICATION_STATUS['PUBLISHED_STATUS'])
+        ArticleAuthorship.objects.create(
+            article=cls.article, collaborator=cls.warner, display_order=1)
+
+    def test_autocomplete_prefix_search(self):
+        response = self.client.get(
+            '/autocomplete/collaborator/', {'q': 'war yak'})
+        self.assertEqual(
+            response.json(),
+            {'results': [{'id': self.warner.pk, 'text': 'Warner, Yakko'}],
+             'more': False})
+
+    def test_autocomplete_uses_prefix_indexes(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Collaborator._meta.db_table)
+        self.assertIn('cv_collab_last_upper_idx', constraints)
+        self.assertIn('cv_collab_first_upper_idx', constraints)
+        indexes = [c['columns'] for c in constraints.values() if c['index']]
+        self.assertIn(['last_name'], indexes)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/autocomplete/collaborator/', {'q': 'war'})
+        sql = queries[-1]['sql']
+        self.assertIn('UPPER("cv_collaborator"."last_name") LIKE', sql)
+        self.assertIn("'WAR%'", sql)
+
+    def test_autocomplete_pages(self):
+        first = self.client.get(
+            '/autocomplete/collaborator/', {'q': 'family'}).json()
+        self.assertEqual(len(first['results']), CV_AUTOCOMPLETE_PAGE_SIZE)
+        self.assertTrue(first['more'])
+        second = self.client.get(
+            '/autocomplete/collaborator/', {'q': 'family', 'page': 2}).json()
+        self.assertEqual(len(second['results']), 5)
+        self.assertFalse(second['more'])
+
+    def test_autocomplete_cached_until_revision_changes(self):
+        self.client.get('/autocomplete/collaborator/', {'q': 'war'})
+        with self.assertNumQueries(1):
+            self.client.get('/autocomplete/collaborator/', {'q': 'war'})
+        Collaborator.objects.create(
+            first_name="Wakko", last_name="Warner",
+            email="wakko.warner@wbwatertower.com")
+        response = self.client.get(
+            '/autocomplete/collaborator/', {'q': 'war'})
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_autocomplete_journal(self):
+        discipline = Discipline.objects.create(name='Toons', slug='toons')
+        Journal.objects.create(
+            title='Journal of Toons', issn='1234-5678',
+            primary_discipline=discipline)
+        response = self.client.get('/autocomplete/journal/', {'q': 'jour'})
+        self.assertEqual(
+            response.json()['results'][0]['text'], 'Journal of Toons')
+
+    def test_autocomplete_unavailable_model(self):
+        response = self.client.get('/autocomplete/article/', {'q': 'a'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_authorship_formset_renders_selected_collaborators_only(self):
+        formset = authorship_formset_factory('article')(
+            instance=self.article)
+        widget = formset.forms[0].fields['collaborator'].widget
+        self.assertIsInstance(widget, AutocompleteSelect)
+        with self.assertNumQueries(1):
+            html = str(formset.forms[0]['collaborator'])
+        self.assertEqual(html.count('<option'), 2)
+        self.assertIn('Warner, Yakko', html)
+        self.assertIn('data-autocomplete-url="/autocomplete/collaborator/"',
+                      html)
+        with self.assertNumQueries(0):
+            html = str(formset.forms[-1]['collaborator'])
+        self.assertEqual(html.count('<option'), 1)
+
+
+@attr('forms')
+class FormViewTestCase(TestCase):
+    """Run tests of :class:`~cv.views.forms.CVCreateView` and
+    :class:`~cv.views.forms.CVUpdateView`."""
+
+    @classmethod
+    def setUp(cls):
+        cls.warner = Collaborator.objects.create(
+            first_name="Yakko", last_name="Warner",
+            email="yakko.warner@wbwatertower.com")
+
+    def get_article_data(self, **kwargs):
+        prefix = dict(get_formset_classes('article'))[
+            'authorship_formset']().prefix
+        data = {
+            'title': 'Animaniacs', 'short_title': 'Animaniacs',
+            'slug': 'animaniacs', 'display': 'on',
+            'status': PUBLICATION_STATUS['PUBLISHED_STATUS'],
+            prefix + '-TOTAL_FORMS': '1', prefix + '-INITIAL_FORMS': '0',
+            prefix + '-0-collaborator': self.warner.pk,
+            prefix + '-0-display_order': '1',
+        }
+        data.update(kwargs)
+        return data
+
+    def test_form_classes_built_once(self):
+        self.assertIs(get_model_form_class('article'),
+                      get_model_form_class('article'))
+        self.assertIs(get_formset_classes('article'),
+                      get_formset_classes('article'))
+        first = self.client.get('/forms/article/add/')
+        second = self.client.get('/forms/article/add/')
+        self.assertIs(type(first.context['authorship_formset']),
+                      type(second.context['authorship_formset']))
+
+    def test_create_saves_formsets(self):
+        response = self.client.post(
+            '/forms/article/add/', self.get_article_data())
+        self.assertEqual(response.status_code, 302)
+        article = Article.objects.get(slug='animaniacs')
+        self.assertEqual(list(article.authors.all()), [self.warner])
+
+    def test_update_saves_formsets(self):
+        self.client.post('/forms/article/add/', self.get_article_data())
+        article = Article.objects.get(slug='animaniacs')
+        prefix = dict(get_formset_classes('article'))[
+            'authorship_formset']().prefix
+        authorship = article.authorship.get()
+        data = self.get_article_data(title='Pinky and the Brain', **{
+            prefix + '-INITIAL_FORMS': '1',
+            prefix + '-0-id': authorship.pk,
+            prefix + '-0-article': article.pk,
+            prefix + '-0-display_order': '2'})
+        response = self.client.post(
+            '/forms/article/%s/edit/' % article.pk, data)
+        self.assertEqual(response.status_code, 302)
+        article.refresh_from_db()
+        self.assertEqual(article.title, 'Pinky and the Brain')
+        self.assertEqual(article.authorship.get().display_order, 2)
+
+    def test_invalid_formset_validated_once(self):
+        prefix = dict(get_formset_classes('article'))[
+            'authorship_formset']().prefix
+        data = self.get_article_data(**{prefix + '-0-display_order': 'x'})
+        with mock.patch.object(BaseFormSet, 'full_clean', autospec=True,
+                               side_effect=BaseFormSet.full_clean) as clean:
+            response = self.client.post('/forms/article/add/', data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(clean.call_count, 1)
+        self.assertFalse(response.context['authorship_formset'].is_valid())
+        self.assertFalse(Article.objects.exists())
+
+    def test_formset_error_rolls_back_object(self):
+        with mock.patch.object(BaseInlineFormSet, 'save',
+                               side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(
+                    '/forms/article/add/', self.get_article_data())
+        self.assertFalse(Article.objects.exists())
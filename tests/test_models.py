@@ -1,5 +1,6 @@
 """Tests for Django-CV Models"""
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 from nose.plugins.attrib import attr
@@ -9,3 +10,60 @@ from cv.models import Chapter, ChapterAuthorship, ChapterEditorship, \
     Collaborator
 
 from tests.cvtests import VitaePublicationTestCase, AuthorshipTestCase
+
+
+@attr('models')
+class ChangedSinceTestCase(AuthorshipTestCase):
+    """
+    Run tests of ``changed_since`` method of
+    :class:`~cv.models.managers.CVQuerySet`.
+    """
+
+    @classmethod
+    def setUp(cls):
+        super(ChangedSinceTestCase, cls).setUp()
+        cls.chapter = Chapter.objects.create(
+            title='Souls of Black Folk', short_title='Souls',
+            slug='souls', book_title='Essays',
+            status=PUBLICATION_STATUS['PUBLISHED_STATUS'])
+        cls.other = Chapter.objects.create(
+            title='Darkwater', short_title='Darkwater', slug='darkwater',
+            book_title='Essays',
+            status=PUBLICATION_STATUS['PUBLISHED_STATUS'])
+        ChapterAuthorship.objects.create(
+            chapter=cls.chapter, collaborator=cls.dill, display_order=1)
+        cls.since = timezone.now()
+
+    def test_changed_since_fields_set(self):
+        self.assertIsNotNone(self.chapter.created)
+        self.assertIsNotNone(self.chapter.modified)
+        self.assertIsNotNone(self.dill.modified)
+
+    def test_changed_since_excludes_unchanged(self):
+        self.assertFalse(Chapter.objects.changed_since(self.since).exists())
+
+    def test_changed_since_includes_saved(self):
+        self.other.save()
+        self.assertEqual(
+            list(Chapter.objects.changed_since(self.since)), [self.other])
+
+    def test_changed_since_includes_authorship_changes(self):
+        ChapterEditorship.objects.create(
+            chapter=self.chapter, collaborator=self.dubois, display_order=1)
+        self.assertEqual(
+            list(Chapter.displayable.changed_since(self.since)),
+            [self.chapter])
+
+    def test_changed_since_includes_deleted_authorship(self):
+        self.chapter.authorship.all().delete()
+        self.assertEqual(
+            list(Chapter.objects.changed_since(self.since)), [self.chapter])
+
+    def test_changed_since_includes_collaborator_changes(self):
+        self.dill.institution = 'Atlanta University'
+        self.dill.save()
+        self.assertEqual(
+            list(Chapter.displayable.published().changed_since(self.since)),
+            [self.chapter])
+        self.assertEqual(
+            list(Collaborator.objects.changed_since(self.since)), [self.dill])
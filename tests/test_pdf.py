@@ -0,0 +1,284 @@
+"""Tests for the PDF representation of the CV"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+
+from nose.plugins.attrib import attr
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+from unittest import mock
+
+from cv.cache import entry_cache
+from cv.document import build_document
+from cv.models import Article, ArticleAuthorship, Collaborator, \
+    Discipline, Grant, Journal
+from cv.profiles import get_default_sections
+from cv.settings import PUBLICATION_STATUS
+from cv.views.pdf import STYLES, CVPdf, CVPdfSection, FlowableStream, \
+    build_cv_pdf, date_block
+
+import datetime
+import io
+
+
+@attr('pdf')
+class CVPdfStyleTestCase(TestCase):
+
+    def test_styles_are_shared(self):
+        self.assertIs(CVPdf().styles, CVPdf().styles)
+        self.assertIs(CVPdf().styles, STYLES)
+        with self.assertRaises(AttributeError):
+            STYLES['Dateblock'].leftIndent = 0
+
+    def test_every_style_is_shared(self):
+        self.assertIn('Normal', STYLES)
+        self.assertIs(STYLES['h1'], STYLES['Heading1'])
+        self.assertIs(STYLES['Heading1'].parent, STYLES['Normal'])
+        self.assertEqual(STYLES['Heading1'].fontSize, 18)
+        for style in STYLES.byName.values():
+            with self.assertRaises(AttributeError):
+                style.fontSize = 1
+            with self.assertRaises(AttributeError):
+                style.refresh()
+        with self.assertRaises(TypeError):
+            STYLES.add(ParagraphStyle('Other'))
+        with self.assertRaises(TypeError):
+            STYLES['Normal'] = ParagraphStyle('Normal')
+        with self.assertRaises(TypeError):
+            STYLES.byName['Other'] = ParagraphStyle('Other')
+
+    def test_shared_styles_are_cloned(self):
+        style = STYLES['Normal'].clone('Header', keepWithNext=1)
+        self.assertEqual(style.keepWithNext, 1)
+        self.assertEqual(style.fontName, STYLES['Normal'].fontName)
+        self.assertIs(style.parent, STYLES['Normal'])
+        self.assertFalse(getattr(STYLES['Normal'], 'keepWithNext', 0))
+        with self.assertRaises(AttributeError):
+            style.keepWithNext = 0
+
+    def test_date_block_uses_style(self):
+        block = date_block('Text <i>in italics</i>', '2001')
+        self.assertEqual(block.getPlainText(), 'Text in italics')
+        self.assertEqual(block.bulletText, '2001')
+        self.assertEqual(block.style.leftIndent, 54)
+        self.assertIsNone(date_block('Text', '').bulletText)
+
+    def test_pdf_is_built(self):
+        self.assertTrue(build_cv_pdf().startswith(b'%PDF'))
+
+    @mock.patch('cv.views.pdf.CV_PERSONAL_INFO', '')
+    def test_pdf_is_built_without_personal_info(self):
+        cache.clear()
+        response = self.client.get(reverse('cv:cv_pdf'))
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertEqual(response['Content-Disposition'],
+                         'filename="cv_cv.pdf"')
+
+
+@attr('pdf')
+class EntryCacheTestCase(TestCase):
+    """Create three articles by the same author."""
+
+    @classmethod
+    def setUp(cls):
+        cache.clear()
+        entry_cache.reset_stats()
+        cls.author = Collaborator.objects.create(
+            first_name='Ann', last_name='Author', email='ann@example.com')
+        for i in range(3):
+            article = Article.objects.create(
+                title='Article %s' % i, short_title='Article %s' % i,
+                slug='article-%s' % i,
+                status=PUBLICATION_STATUS['PUBLISHED_STATUS'],
+                pub_date=datetime.date(2000 + i, 1, 1))
+            ArticleAuthorship.objects.create(
+                article=article, collaborator=cls.author, display_order=1)
+
+    def get_entries(self):
+        return CVPdfSection(
+            'article', date_field='pub_date').make_section_entries()
+
+    def test_only_changed_entries_are_formatted(self):
+        entries = self.get_entries()
+        self.assertEqual(entry_cache.get_stats()['misses'], 3)
+        self.assertEqual(self.get_entries(), entries)
+        self.assertEqual(entry_cache.get_stats()['hits'], 3)
+        article = Article.objects.get(slug='article-1')
+        article.title = 'Changed'
+        article.save()
+        entries = self.get_entries()
+        self.assertIn('Changed', entries[1]['text'])
+        self.assertEqual(entry_cache.get_stats(),
+                         {'hits': 5, 'misses': 4, 'hit_rate': 5 / 9})
+
+    def test_collaborator_changes_are_formatted(self):
+        self.get_entries()
+        self.author.last_name = 'Renamed'
+        self.author.save()
+        for entry in self.get_entries():
+            self.assertIn('Renamed', entry['text'])
+
+    def test_journal_changes_are_formatted(self):
+        discipline = Discipline.objects.create(name='Toons', slug='toons')
+        journal = Journal.objects.create(
+            title='Old Journal', issn='1234-5678',
+            primary_discipline=discipline)
+        Article.objects.update(journal=journal)
+        self.assertIn('<i>Old Journal</i>', self.get_entries()[0]['text'])
+        journal.title = 'New Journal'
+        journal.save()
+        for entry in self.get_entries():
+            self.assertIn('<i>New Journal</i>', entry['text'])
+
+
+@attr('pdf')
+class CVPdfSectionTestCase(TestCase):
+    """Create articles at each stage of publication and grants from each
+    source."""
+
+    @classmethod
+    def setUp(cls):
+        cache.clear()
+        statuses = ('PUBLISHED_STATUS', 'REVISE_STATUS', 'INPREP_STATUS')
+        for i in range(9):
+            Article.objects.create(
+                title='Article %s' % i, short_title='Article %s' % i,
+                slug='article-%s' % i,
+                status=PUBLICATION_STATUS[statuses[i % 3]],
+                pub_date=datetime.date(2000 + i, 1, 1),
+                submission_date=datetime.date(2010 - i, 1, 1))
+        for i, source in enumerate((10, 40, 40)):
+            Grant.objects.create(
+                title='Grant %s' % i, short_title='Grant %s' % i,
+                slug='grant-%s' % i, start_date=datetime.date(2000 + i, 1, 1),
+                abstract='', source=source, amount=1000)
+
+    def test_subsections_match_managers(self):
+        for section in get_default_sections():
+            if not section.get('subsections'):
+                continue
+            pdf_section = CVPdfSection(**section)
+            manager = pdf_section.model.displayable
+            for title, records in pdf_section.get_subsection_records():
+                method = dict(section['subsections'])[title]
+                expected = getattr(manager, method)()
+                self.assertEqual([r.pk for r in records],
+                                 [i.pk for i in expected], title)
+
+    def test_subsections_are_limited(self):
+        section = CVPdfSection(
+            'article', subsections=[['Published', 'published']], limit=2)
+        records = section.get_subsection_records()[0][1]
+        self.assertEqual([r.title for r in records],
+                         ['Article 6', 'Article 3'])
+
+    def test_queries_do_not_depend_on_entries(self):
+        sections = get_default_sections()
+        with CaptureQueriesContext(connection) as queries:
+            build_document()
+        # One query for each section, one for the authors of articles, and
+        # one for the heading
+        self.assertEqual(len(queries), len(sections) + 2)
+        for i in range(9, 30):
+            Article.objects.create(
+                title='Article %s' % i, short_title='Article %s' % i,
+                slug='article-%s' % i,
+                status=PUBLICATION_STATUS['PUBLISHED_STATUS'],
+                pub_date=datetime.date(2000, 1, 1))
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            build_document()
+        self.assertEqual(len(queries), len(sections) + 2)
+
+
+@attr('pdf')
+class FlowableStreamTestCase(TestCase):
+
+    def test_flowables_are_read_as_needed(self):
+        read = list()
+
+        def flowables():
+            for i in range(5):
+                read.append(i)
+                yield i
+        stream = FlowableStream(flowables())
+        self.assertEqual(stream[0], 0)
+        self.assertEqual(read, [0])
+        self.assertEqual(stream[:2], [0, 1])
+        del stream[0]
+        stream[0:0] = ['a', 'b']
+        stream.insert(0, 'c')
+        self.assertEqual(stream[:4], ['c', 'a', 'b', 1])
+        self.assertEqual(read, [0, 1])
+        items = list()
+        while len(stream):
+            items.append(stream[0])
+            del stream[0]
+        self.assertEqual(items, ['c', 'a', 'b', 1, 2, 3, 4])
+
+    def layout(self, flowables):
+        """Return list of the page and text of each flowable laid out."""
+        laid_out = list()
+
+        class DocTemplate(SimpleDocTemplate):
+            def afterFlowable(self, flowable):
+                for f in getattr(flowable, '_content', [flowable]):
+                    if isinstance(f, Paragraph):
+                        laid_out.append((self.page, f.getPlainText()))
+
+        DocTemplate(io.BytesIO()).build(flowables)
+        return laid_out
+
+    def test_stream_keeps_flowables_with_next(self):
+        header_style = STYLES['Normal'].clone('Header', keepWithNext=1)
+
+        def flowables():
+            for i in range(40):
+                yield Paragraph('Section %s' % i, header_style)
+                yield Paragraph('Subsection %s' % i, header_style)
+                for j in range(i % 4 + 1):
+                    yield Paragraph('Entry %s.%s' % (i, j), STYLES['Normal'])
+
+        expected = self.layout(list(flowables()))
+        self.assertGreater(expected[-1][0], 2)
+        self.assertEqual(self.layout(FlowableStream(flowables())), expected)
+
+
+@attr('pdf')
+class StreamedPdfTestCase(TestCase):
+    """Create articles at each stage of publication with an author."""
+
+    @classmethod
+    def setUp(cls):
+        cache.clear()
+        author = Collaborator.objects.create(
+            first_name='Ann', last_name='Author', email='ann@example.com')
+        statuses = ('PUBLISHED_STATUS', 'REVISE_STATUS', 'INPREP_STATUS')
+        for i in range(12):
+            article = Article.objects.create(
+                title='Article %s' % i, short_title='Article %s' % i,
+                slug='article-%s' % i,
+                status=PUBLICATION_STATUS[statuses[i % 3]],
+                pub_date=datetime.date(2000 + i, 1, 1))
+            ArticleAuthorship.objects.create(
+                article=article, collaborator=author, display_order=1)
+
+    def test_streamed_entries_match_document(self):
+        section = CVPdfSection(
+            'article', date_field='pub_date',
+            subsections=[['Published', 'published'], ['In Prep', 'inprep']])
+        expected = [(title, [r.title for r in records])
+                    for title, records in section.get_subsection_records()]
+        streamed = [(title, [e['text'] for e in entries])
+                    for title, entries in section.iter_subsections(2)]
+        self.assertEqual([t for t, e in streamed], ['Published', 'In Prep'])
+        for (title, titles), (_, texts) in zip(expected, streamed):
+            self.assertEqual(len(titles), len(texts))
+            for name, text in zip(titles, texts):
+                self.assertIn(name + '.', text)
+
+    @mock.patch('reportlab.rl_config.invariant', 1)
+    def test_streamed_pdf_matches_document_pdf(self):
+        self.assertEqual(build_cv_pdf(stream=True), build_cv_pdf())
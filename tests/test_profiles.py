@@ -0,0 +1,119 @@
+"""Tests for named CV profiles"""
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nose.plugins.attrib import attr
+
+from cv.models import Article, Award
+from cv.profiles import Profile, get_profile, get_profiles
+from cv.settings import PUBLICATION_STATUS
+from cv.views import AsyncCVView, CVView
+
+from io import StringIO
+import datetime
+
+
+PROFILES = {
+    'short': {
+        'title': 'Short CV',
+        'sections': [
+            {'model_name': 'article', 'date_field': 'pub_date',
+             'subsections': [['Published', 'published']],
+             'filters': {'title__startswith': 'Kept'}, 'limit': 2},
+        ],
+    },
+}
+
+
+@attr('profiles')
+@override_settings(CV_PROFILES=PROFILES)
+class ProfileTestCase(TestCase):
+    """Create published articles, a draft, and an award."""
+
+    @classmethod
+    def setUp(cls):
+        cache.clear()
+        published = PUBLICATION_STATUS['PUBLISHED_STATUS']
+        for i, title in enumerate(['Kept', 'Kept', 'Kept', 'Filtered']):
+            Article.objects.create(
+                title='%s Article %s' % (title, i),
+                short_title='Article %s' % i, slug='article-%s' % i,
+                status=published, pub_date=datetime.date(2000 + i, 1, 1))
+        Article.objects.create(
+            title='Kept Draft', short_title='Draft', slug='draft',
+            status=PUBLICATION_STATUS['INPREP_STATUS'])
+        Award.objects.create(
+            name='Prize', organization='Acme', date=datetime.date(2001, 1, 1))
+
+    def test_get_profile(self):
+        self.assertTrue(get_profile().complete)
+        self.assertEqual(get_profile('short').title, 'Short CV')
+        with self.assertRaises(LookupError):
+            get_profile('missing')
+
+    def test_profiles_are_built_once(self):
+        self.assertIs(get_profile('short'), get_profile('short'))
+        with override_settings(CV_PROFILES={}):
+            self.assertEqual(list(get_profiles()), ['full'])
+        self.assertEqual(sorted(get_profiles()), ['full', 'short'])
+
+    def test_invalid_profiles(self):
+        with self.assertRaises(ImproperlyConfigured):
+            Profile('bad', [{'model_name': 'nothing'}])
+        with self.assertRaises(ImproperlyConfigured):
+            Profile('bad', [{'model_name': 'article',
+                             'subsections': [['Other', 'other']]}])
+        with self.assertRaises(ImproperlyConfigured):
+            Profile('bad', [{'model_name': 'article', 'limits': 2}])
+
+    def test_html_profile(self):
+        response = self.client.get(reverse('cv:cv_list'), {'profile': 'short'})
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode('utf-8')
+        self.assertIn('Kept Article 2', content)
+        self.assertIn('Kept Article 1', content)
+        self.assertNotIn('Kept Article 0', content)
+        self.assertNotIn('Filtered', content)
+        self.assertNotIn('Kept Draft', content)
+        self.assertNotIn('Prize', content)
+        response = self.client.get(reverse('cv:cv_list'))
+        self.assertContains(response, 'Prize')
+        response = self.client.get(
+            reverse('cv:cv_list'), {'profile': 'missing'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_async_html_profile(self):
+        for params in ({'profile': 'short'}, {'years': 5}):
+            request = RequestFactory().get(reverse('cv:cv_list'), params)
+            request.user = AnonymousUser()
+            expected = CVView.as_view()(request).render()
+            response = async_to_sync(AsyncCVView.as_view())(request)
+            self.assertEqual(response.render().content, expected.content)
+        self.assertNotIn(b'Prize', response.content)
+
+    def test_pdf_profile(self):
+        url = reverse('cv:cv_pdf')
+        full = self.client.get(url)
+        short = self.client.get(url, {'profile': 'short'})
+        self.assertEqual(short['Content-Type'], 'application/pdf')
+        self.assertLess(len(short.content), len(full.content))
+        response = self.client.get(url, {'profile': 'missing'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_precompute_profiles(self):
+        out = StringIO()
+        call_command('precompute_cv_profiles', stdout=out)
+        self.assertIn('Cached Short CV.', out.getvalue())
+        for url in (reverse('cv:cv_list'), reverse('cv:cv_pdf')):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {'profile': 'short'})
+            self.assertEqual(response.status_code, 200)
+            # The revision is read for the validators and the cache key
+            self.assertEqual(len(queries), 2)
@@ -0,0 +1,102 @@
+"""Tests for lightweight records of CV entries"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from nose.plugins.attrib import attr
+
+from cv.models import Article, ArticleAuthorship, Chapter, \
+    ChapterAuthorship, ChapterEditorship, Collaborator, Discipline, \
+    Journal, Presentation, Talk
+from cv.records import Record, get_records
+from cv.settings import PUBLICATION_STATUS
+from cv.views.pdf import CVPdfSection
+
+import datetime
+
+
+@attr('records')
+class RecordTestCase(TestCase):
+    """Create articles with two authors, a chapter with editors, and a talk
+    presented twice."""
+
+    @classmethod
+    def setUp(cls):
+        published = PUBLICATION_STATUS['PUBLISHED_STATUS']
+        cls.ann = Collaborator.objects.create(
+            first_name='Ann', middle_initial='B.', last_name='Author',
+            email='ann@example.com')
+        cls.cat = Collaborator.objects.create(
+            first_name='Cat', last_name='Coauthor', email='cat@example.com')
+        discipline = Discipline.objects.create(name='Tests', slug='tests')
+        journal = Journal.objects.create(
+            title='Journal of Tests', issn='1234-5678',
+            primary_discipline=discipline)
+        for i in range(5):
+            article = Article.objects.create(
+                title='Article %s' % i, short_title='Article %s' % i,
+                slug='article-%s' % i, status=published, journal=journal,
+                volume='1', pub_date=datetime.date(2000 + i, 1, 1))
+            for order, author in enumerate((cls.ann, cls.cat)):
+                ArticleAuthorship.objects.create(
+                    article=article, collaborator=author,
+                    display_order=order, print_middle=order == 0)
+        chapter = Chapter.objects.create(
+            title='Chapter', short_title='Chapter', slug='chapter',
+            status=published, book_title='Edited Book',
+            pub_date=datetime.date(2001, 1, 1))
+        ChapterAuthorship.objects.create(
+            chapter=chapter, collaborator=cls.ann, display_order=1)
+        for order, editor in enumerate((cls.ann, cls.cat)):
+            ChapterEditorship.objects.create(
+                chapter=chapter, collaborator=editor, display_order=order)
+        talk = Talk.objects.create(
+            title='Talk', short_title='Talk', slug='talk')
+        for year, kind in ((2001, 10), (2011, 20)):
+            Presentation.objects.create(
+                talk=talk, presentation_date=datetime.date(year, 1, 1),
+                type=kind, event='Meeting %s' % year)
+
+    def test_records_have_slots(self):
+        records = get_records(Article.displayable.all(), 'pub_date')
+        record = records[0]
+        self.assertIsInstance(record, Record)
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertEqual(record.title, 'Article 4')
+        self.assertEqual(record.journal, 'Journal of Tests')
+        self.assertEqual(record.pub_date, datetime.date(2004, 1, 1))
+        self.assertEqual(record.authors, 'Ann B. Author and Cat Coauthor')
+        self.assertEqual(record.authors_count, 2)
+
+    def test_queries_do_not_grow_with_entries(self):
+        with CaptureQueriesContext(connection) as queries:
+            get_records(Article.displayable.all(), 'pub_date')
+        # Articles and their authors
+        self.assertEqual(len(queries), 2)
+
+    def test_related_records(self):
+        chapter = get_records(Chapter.displayable.all())[0]
+        self.assertEqual(chapter.editors, 'Ann Author and Cat Coauthor')
+        self.assertEqual(chapter.editors_count, 2)
+        talk = get_records(Talk.displayable.all())[0]
+        self.assertEqual(talk.presentations.count(), 2)
+        self.assertEqual(talk.presentations[0].get_type_display,
+                         Presentation(type=20).get_type_display())
+        talk = get_records(
+            Talk.displayable.all(), since=datetime.date(2010, 1, 1))[0]
+        self.assertEqual(
+            [p.event for p in talk.presentations.all()], ['Meeting 2011'])
+
+    def test_pdf_entries(self):
+        section = CVPdfSection(
+            'article', date_field='pub_date',
+            subsections=[['Published', 'published']])
+        entries = section.make_section_entries().subsection_entries
+        entry = entries[0]['Published'][0]
+        self.assertEqual(entry['date'], '2004')
+        self.assertEqual(
+            entry['text'], 'Ann B. Author and Cat Coauthor. '
+            '&#8220;Article 4.&#8221;<i>Journal of Tests</i> 1: ')
+        section = CVPdfSection('chapter', date_field='pub_date')
+        self.assertIn('Ann Author and Cat Coauthor, eds.',
+                      section.make_section_entries()[0]['text'])
@@ -0,0 +1,129 @@
+"""Tests for full-text search of CV works"""
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nose.plugins.attrib import attr
+
+from io import StringIO
+
+from cv.batch import update_works
+from cv.models import Article, ArticleAuthorship, Collaborator, Journal, \
+    Discipline, Grant, Talk, Presentation, SearchEntry
+from cv.search import search
+from cv.settings import PUBLICATION_STATUS
+
+
+@attr('search')
+class SearchTestCase(TestCase):
+    """Run tests of the search index, views, and API."""
+
+    @classmethod
+    def setUp(cls):
+        cls.warner = Collaborator.objects.create(
+            first_name="Yakko", last_name="Warner",
+            email="yakko.warner@wbwatertower.com")
+        discipline = Discipline.objects.create(name='Toons', slug='toons')
+        cls.journal = Journal.objects.create(
+            title='Journal of Toons', issn='1234-5678',
+            primary_discipline=discipline)
+        cls.article = Article.objects.create(
+            title='Slapstick in the Water Tower', short_title='Slapstick',
+            slug='slapstick', journal=cls.journal,
+            abstract='Anvils falling on coyotes.',
+            status=PUBLICATION_STATUS['PUBLISHED_STATUS'])
+        ArticleAuthorship.objects.create(
+            article=cls.article, collaborator=cls.warner, display_order=1)
+        cls.talk = Talk.objects.create(
+            title='Water Tower Acoustics', short_title='Acoustics',
+            slug='acoustics')
+        Presentation.objects.create(
+            talk=cls.talk, presentation_date='2010-01-01', type=10,
+            event='Toon Conference')
+        cls.grant = Grant.objects.create(
+            title='Warner Tower Maintenance', short_title='Maintenance',
+            slug='maintenance', agency='Acme',
+            start_date='2000-01-01', abstract='', source=40, amount=1000)
+
+    def search_models(self, query):
+        return [(r.model_name, r.pk) for r in search(query)]
+
+    def test_search_returns_mixed_types_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            results = search('tower')
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            {(r.model_name, r.pk) for r in results},
+            {('article', self.article.pk), ('talk', self.talk.pk),
+             ('grant', self.grant.pk)})
+
+    def test_titles_rank_above_other_text(self):
+        self.assertEqual(
+            self.search_models('warner'),
+            [('grant', self.grant.pk), ('article', self.article.pk)])
+
+    def test_related_text_is_indexed_and_maintained(self):
+        self.assertEqual(self.search_models('yakko'),
+                         [('article', self.article.pk)])
+        self.assertEqual(self.search_models('toon conference'),
+                         [('talk', self.talk.pk)])
+        self.warner.first_name = 'Wakko'
+        self.warner.save()
+        self.assertEqual(self.search_models('yakko'), [])
+        self.assertEqual(self.search_models('wakko'),
+                         [('article', self.article.pk)])
+        self.journal.title = 'Quarterly of Cartoons'
+        self.journal.save()
+        self.assertEqual(self.search_models('quarterly'),
+                         [('article', self.article.pk)])
+        self.article.authorship.all().delete()
+        self.assertEqual(self.search_models('wakko'), [])
+
+    def test_hidden_and_deleted_works_are_removed(self):
+        self.talk.display = False
+        self.talk.save()
+        self.assertNotIn(('talk', self.talk.pk),
+                         self.search_models('tower'))
+        update_works(Article, [self.article.pk], display=False)
+        self.assertEqual(self.search_models('tower'),
+                         [('grant', self.grant.pk)])
+        self.grant.delete()
+        self.assertEqual(SearchEntry.objects.count(), 0)
+
+    def test_prefixes_and_punctuation(self):
+        self.assertEqual(self.search_models('slapst'),
+                         [('article', self.article.pk)])
+        self.assertEqual(self.search_models('"anvils" OR (NEAR'), [])
+        self.assertEqual(self.search_models('  '), [])
+
+    def test_rebuild_search_index(self):
+        SearchEntry.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 3 works', out.getvalue())
+        self.assertEqual(len(self.search_models('tower')), 3)
+
+    def test_search_view(self):
+        response = self.client.get(reverse('cv:search'), {'q': 'slapstick'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.article.get_absolute_url())
+        response = self.client.get(reverse('cv:search'), {'q': 'nothing'})
+        self.assertContains(response, 'No works match')
+
+    def test_api_search_view(self):
+        url = reverse('cv:api_search')
+        data = self.client.get(url, {'q': 'tower', 'limit': 2}).json()
+        results = data['results']
+        self.assertEqual(len(results), 2)
+        data = self.client.get(data['next']).json()
+        results += data['results']
+        self.assertIsNone(data['next'])
+        urls = {r['model']: r['url'] for r in results}
+        self.assertEqual(urls, {
+            'article': self.article.get_absolute_url(),
+            'talk': self.talk.get_absolute_url(),
+            'grant': None})
+        response = self.client.get(url, {'q': 'tower', 'page': 'x'})
+        self.assertEqual(response.status_code, 400)
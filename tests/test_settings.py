@@ -58,7 +58,14 @@ TEMPLATES = [
     },
 ]
 
+CV_PERSONAL_INFO = {
+    'name': 'Yakko Warner',
+    'address': '1 Water Tower\nBurbank, CA',
+    'email': 'yakko.warner@wbwatertower.com',
+}
+
 MEDIA_ROOT = '/Users/bader/tmp/'
 MEDIA_URL = '/media/'
+STATIC_URL = '/static/'
 
 
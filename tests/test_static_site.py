@@ -0,0 +1,123 @@
+"""Tests for the export of the CV as a static website"""
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from nose.plugins.attrib import attr
+
+from cv.models import Article, ArticleAuthorship, Collaborator, Position
+from cv.settings import PUBLICATION_STATUS
+from cv.static_site import export, get_pages
+
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import datetime
+import gzip
+import io
+import os
+import tempfile
+
+
+class LinkParser(HTMLParser):
+    """Collect the links of a page without their fragments and queries."""
+
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.links = list()
+
+    def handle_starttag(self, tag, attrs):
+        href = dict(attrs).get('href')
+        if href and not href.startswith(('#', 'http:', 'https:', 'mailto:')):
+            self.links.append(href.split('#')[0].split('?')[0].strip())
+        content = dict(attrs).get('content') or ''
+        if tag == 'meta' and 'url=' in content:
+            self.links.append(content.split('url=')[1])
+
+
+@attr('static_site')
+class StaticSiteTestCase(TestCase):
+    """Create an article with an author and a primary position."""
+
+    @classmethod
+    def setUp(cls):
+        cache.clear()
+        author = Collaborator.objects.create(
+            first_name='Ann', last_name='Author', email='ann@example.com')
+        article = Article.objects.create(
+            title='Static Article', short_title='Static Article',
+            slug='static-article',
+            status=PUBLICATION_STATUS['PUBLISHED_STATUS'],
+            pub_date=datetime.date(2000, 1, 1))
+        ArticleAuthorship.objects.create(
+            article=article, collaborator=author, display_order=1)
+        Position.objects.create(
+            title='Professor', institution='Acme',
+            start_date=datetime.date(2000, 1, 1),
+            end_date=datetime.date(2010, 1, 1), current_position=True,
+            primary_position=True)
+
+    def test_pages_include_each_kind_of_page(self):
+        pages = get_pages()
+        self.assertIn(('cv_list', {}), pages)
+        self.assertIn(('cv_pdf', {}), pages)
+        self.assertIn(('section_list', {'model_name': 'article'}), pages)
+        kwargs = {'model_name': 'article', 'slug': 'static-article'}
+        self.assertIn(('item_detail', kwargs), pages)
+        self.assertIn(('citation', dict(kwargs, format='ris')), pages)
+        self.assertIn(('citation', dict(kwargs, format='bib')), pages)
+
+    def test_pages_are_written_with_compressed_copies(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = export(directory, workers=1)
+            self.assertEqual(len(paths), len(get_pages()))
+            names = [os.path.relpath(p, directory) for p in paths]
+            self.assertIn('index.html', names)
+            self.assertIn(os.path.join('pdf', 'index.pdf'), names)
+            self.assertIn(os.path.join(
+                'articles', 'static-article', 'cite', 'ris', 'index.ris'),
+                names)
+            path = os.path.join(
+                directory, 'articles', 'static-article', 'index.html')
+            with open(path, 'rb') as f:
+                content = f.read()
+            self.assertIn(b'Static Article', content)
+            with open(path + '.gz', 'rb') as f:
+                self.assertEqual(gzip.decompress(f.read()), content)
+            with open(os.path.join(directory, 'pdf', 'index.pdf'), 'rb') as f:
+                self.assertTrue(f.read().startswith(b'%PDF'))
+
+    def test_internal_links_resolve_to_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            export(directory, workers=1)
+            links = set()
+            for root, dirs, files in os.walk(directory):
+                if 'index.html' not in files:
+                    continue
+                relpath = os.path.relpath(root, directory)
+                url = '/' if relpath == os.curdir else \
+                    '/%s/' % relpath.replace(os.sep, '/')
+                parser = LinkParser()
+                with open(os.path.join(root, 'index.html')) as f:
+                    parser.feed(f.read())
+                links.update(urljoin(url, link) for link in parser.links)
+            self.assertIn('/pdf/', links)
+            self.assertIn('/pdf/index.pdf', links)
+            self.assertIn('/articles/static-article/cite/ris/', links)
+            for link in links:
+                # Static and media files are not part of the export
+                if link.startswith((settings.STATIC_URL, settings.MEDIA_URL)):
+                    continue
+                path = os.path.join(directory, link.strip('/'))
+                if link.endswith('/'):
+                    path = os.path.join(path, 'index.html')
+                self.assertTrue(os.path.isfile(path), link)
+
+    def test_command(self):
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('export_static_site', directory, workers=1,
+                         stdout=out)
+            self.assertTrue(os.path.exists(
+                os.path.join(directory, 'index.html.gz')))
+        self.assertIn('Wrote %s pages' % len(get_pages()), out.getvalue())
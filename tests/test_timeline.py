@@ -0,0 +1,104 @@
+"""Tests for the timeline of CV works"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nose.plugins.attrib import attr
+
+from cv.models import Article, Award, Book, MediaMention, Talk, Presentation
+from cv.settings import PUBLICATION_STATUS
+from cv.timeline import hydrate, paginate_timeline
+
+import datetime
+
+
+@attr('timeline')
+class TimelineTestCase(TestCase):
+    """Create works of several types, some on the same date."""
+
+    @classmethod
+    def setUp(cls):
+        published = PUBLICATION_STATUS['PUBLISHED_STATUS']
+        for i in range(3):
+            Article.objects.create(
+                title='Article %s' % i, short_title='Article %s' % i,
+                slug='article-%s' % i, status=published,
+                pub_date=datetime.date(2001, 1, 1 + i))
+        Article.objects.create(
+            title='Draft', short_title='Draft', slug='draft',
+            status=PUBLICATION_STATUS['INPREP_STATUS'])
+        Book.objects.create(
+            title='Book', short_title='Book', slug='book', status=published,
+            pub_date=datetime.date(2001, 1, 2))
+        talk = Talk.objects.create(
+            title='Talk', short_title='Talk', slug='talk')
+        for day in (1, 3):
+            Presentation.objects.create(
+                talk=talk, presentation_date=datetime.date(2002, 1, day),
+                type=10, event='Conference %s' % day)
+        Award.objects.create(
+            name='Prize', organization='Acme', date=datetime.date(2001, 1, 2))
+        MediaMention.objects.create(
+            outlet='Times', date=datetime.date(2000, 1, 1))
+        MediaMention.objects.create(
+            outlet='Hidden', date=datetime.date(2003, 1, 1), display=False)
+
+    def get_all_entries(self, per_page, types=None):
+        entries, cursor = [], None
+        while True:
+            page = paginate_timeline(cursor, per_page, types)
+            entries += page.object_list
+            if not page.has_next:
+                return entries
+            cursor = page.next_cursor
+
+    def test_timeline_is_ordered_newest_first(self):
+        entries = self.get_all_entries(100)
+        self.assertEqual(
+            [(e.type, e.title) for e in entries],
+            [('presentation', 'Talk'), ('presentation', 'Talk'),
+             ('article', 'Article 2'), ('book', 'Book'),
+             ('award', 'Prize'), ('article', 'Article 1'),
+             ('article', 'Article 0'), ('mediamention', 'Times')])
+
+    def test_pages_are_one_query_and_cover_timeline(self):
+        expected = [(e.type, e.pk) for e in self.get_all_entries(100)]
+        for per_page in (1, 2, 3):
+            entries = self.get_all_entries(per_page)
+            self.assertEqual([(e.type, e.pk) for e in entries], expected)
+        page = paginate_timeline(None, 3)
+        with CaptureQueriesContext(connection) as queries:
+            paginate_timeline(page.next_cursor, 3)
+        self.assertEqual(len(queries), 1)
+
+    def test_hydrate_fetches_one_query_per_type(self):
+        entries = paginate_timeline(None, 5).object_list
+        with CaptureQueriesContext(connection) as queries:
+            hydrate(entries)
+            urls = [entry.url for entry in entries]
+        # Presentations, articles, books, and awards
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(urls[0], '/talks/talk/')
+        self.assertEqual(entries[3].object, Book.objects.get())
+
+    def test_types(self):
+        entries = self.get_all_entries(2, types=['award', 'mediamention'])
+        self.assertEqual([e.title for e in entries], ['Prize', 'Times'])
+
+    def test_timeline_views(self):
+        response = self.client.get(reverse('cv:timeline'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Talk at Conference 3')
+        url = reverse('cv:api_timeline')
+        data = self.client.get(url, {'limit': 6}).json()
+        self.assertEqual(len(data['results']), 6)
+        self.assertEqual(data['results'][0]['date'], '2002-01-03')
+        data = self.client.get(data['next']).json()
+        self.assertEqual([r['title'] for r in data['results']],
+                         ['Article 0', 'Times'])
+        self.assertIsNone(data['next'])
+        response = self.client.get(url, {'types': 'degree'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {'cursor': 'x'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,228 @@
+"""Tests for Django-CV views"""
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+
+from nose.plugins.attrib import attr
+
+from cv.models import Article, ArticleAuthorship, Collaborator, \
+    Discipline, Talk, Presentation, CVRevision
+from cv.settings import PUBLICATION_STATUS
+from cv.views import CVView, CVListView, AsyncCVView, AsyncCVListView, \
+    can_query_concurrently
+
+
+class CVViewTestCase(TestCase):
+    """Base class that creates a small CV to be rendered by views."""
+
+    @classmethod
+    def setUp(cls):
+        cls.factory = RequestFactory()
+        cls.einstein = Collaborator.objects.create(
+            first_name="Albert", last_name="Einstein",
+            email="ae@example.edu")
+        articles = [
+            ('gen-theory-gravitation', 'PUBLISHED_STATUS', '1950-04-01'),
+            ('quantum-theory', 'PUBLISHED_STATUS', '1951-01-26'),
+            ('unified-field-theory', 'SUBMITTED_STATUS', None),
+            ('photons', 'INPREP_STATUS', None)
+        ]
+        for slug, status, pub_date in articles:
+            a = Article.objects.create(
+                title=slug.replace('-', ' ').title(), short_title=slug,
+                slug=slug, pub_date=pub_date,
+                status=PUBLICATION_STATUS[status])
+            ArticleAuthorship.objects.create(
+                article=a, collaborator=cls.einstein, display_order=1)
+        talk = Talk.objects.create(
+            title='Relativity', short_title='Relativity', slug='relativity')
+        Presentation.objects.create(
+            talk=talk, presentation_date='1921-04-02',
+            type=Presentation.INVITED, event='Columbia University')
+
+    def get_request(self, path='/'):
+        request = self.factory.get(path)
+        request.user = AnonymousUser()
+        return request
+
+
+@attr('views')
+class AsyncCVViewTestCase(CVViewTestCase):
+    """
+    Run tests of asynchronous views :class:`~cv.views.AsyncCVView` and
+    :class:`~cv.views.AsyncCVListView`.
+    """
+
+    def test_async_cv_view_matches_cv_view(self):
+        request = self.get_request()
+        expected = CVView.as_view()(request).render()
+        response = async_to_sync(AsyncCVView.as_view())(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.render().content, expected.content)
+
+    def test_async_cv_list_view_matches_cv_list_view(self):
+        for model_name in ['article', 'talk']:
+            request = self.get_request('/%ss/' % model_name)
+            expected = CVListView.as_view()(
+                request, model_name=model_name).render()
+            response = async_to_sync(AsyncCVListView.as_view())(
+                request, model_name=model_name)
+            self.assertEqual(response.render().content, expected.content)
+
+    def test_async_cv_list_view_totals(self):
+        request = self.get_request('/articles/')
+        response = async_to_sync(AsyncCVListView.as_view())(
+            request, model_name='article')
+        object_list = response.context_data['object_list']
+        self.assertEqual(object_list['total_articles'], 4)
+        self.assertEqual(len(object_list['article_published_list']), 2)
+
+    def test_async_view_is_coroutine_function(self):
+        import asyncio
+        self.assertTrue(asyncio.iscoroutinefunction(AsyncCVView.as_view()))
+        self.assertFalse(asyncio.iscoroutinefunction(CVView.as_view()))
+
+    def test_no_concurrent_queries_on_sqlite(self):
+        querysets = [Article.displayable.published()]
+        self.assertFalse(can_query_concurrently(querysets))
+        self.assertTrue(can_query_concurrently(querysets, concurrent=True))
+
+
+@attr('views')
+class RevisionConditionTestCase(CVViewTestCase):
+    """
+    Run tests of conditional requests answered from
+    :class:`~cv.models.CVRevision`.
+    """
+
+    def get_etag(self):
+        return '"cv-%s"' % CVRevision.objects.current().revision
+
+    def test_revision_bumped_on_save_and_delete(self):
+        revision = CVRevision.objects.current().revision
+        article = Article.objects.get(slug='photons')
+        article.save()
+        self.assertEqual(
+            CVRevision.objects.current().revision, revision + 1)
+        article.delete()
+        self.assertGreater(
+            CVRevision.objects.current().revision, revision + 1)
+
+    def test_revision_bumped_on_m2m_change(self):
+        discipline = Discipline.objects.create(
+            name='Physics', slug='physics')
+        revision = CVRevision.objects.current().revision
+        Article.objects.get(slug='photons').other_disciplines.add(discipline)
+        self.assertEqual(
+            CVRevision.objects.current().revision, revision + 1)
+
+    def test_validators_set(self):
+        response = self.client.get('/')
+        self.assertEqual(response['ETag'], self.get_etag())
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_not_modified_without_querying_sections(self):
+        etag = self.get_etag()
+        for path in ['/', '/articles/', '/articles/photons/',
+                     '/articles/photons/cite/ris/', '/pdf/']:
+            with self.assertNumQueries(1):
+                response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, path)
+
+    def test_not_modified_since(self):
+        response = self.client.get('/articles/')
+        response = self.client.get(
+            '/articles/',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_modified_after_change(self):
+        etag = self.get_etag()
+        Article.objects.get(slug='photons').save()
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_async_view_not_modified(self):
+        request = self.get_request()
+        request.META['HTTP_IF_NONE_MATCH'] = self.get_etag()
+        response = async_to_sync(AsyncCVView.as_view())(request)
+        self.assertEqual(response.status_code, 304)
+        request = self.get_request()
+        response = async_to_sync(AsyncCVView.as_view())(request)
+        self.assertEqual(response['ETag'], self.get_etag())
+
+    def test_no_validators_for_authenticated_users(self):
+        from django.contrib.auth.models import User
+        request = self.get_request()
+        request.user = User(username='editor')
+        request.META['HTTP_IF_NONE_MATCH'] = self.get_etag()
+        response = CVView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+
+@attr('views')
+class SectionPaginationTestCase(CVViewTestCase):
+    """Run tests of pages of :class:`~cv.views.CVListView`."""
+
+    def get_pages(self, model_name, per_page):
+        view = CVListView.as_view(per_page=per_page)
+        path, pages = '/%ss/' % model_name, []
+        while path:
+            response = view(self.get_request(path), model_name=model_name)
+            pages.append(response.context_data)
+            next_page_url = response.context_data['next_page_url']
+            path = '/%ss/%s' % (model_name, next_page_url) \
+                if next_page_url else None
+        return pages
+
+    def test_pages_keep_section_lists(self):
+        pages = self.get_pages('article', 1)
+        self.assertEqual(len(pages), 4)
+        slugs = [
+            [a.slug for key in ['article_published_list',
+                                'article_revise_list',
+                                'article_inprep_list']
+             for a in page[key]]
+            for page in pages]
+        self.assertEqual(slugs, [
+            ['quantum-theory'], ['gen-theory-gravitation'],
+            ['unified-field-theory'], ['photons']])
+        pages = self.get_pages('article', 3)
+        self.assertEqual(
+            [len(pages[0]['article_published_list']),
+             len(pages[0]['article_revise_list']),
+             len(pages[1]['article_inprep_list'])], [2, 1, 1])
+        self.assertTrue(pages[0]['is_paginated'])
+
+    def test_section_counts(self):
+        page = self.get_pages('article', 1)[-1]
+        self.assertEqual(page['total_articles'], 4)
+        self.assertEqual(
+            [page['article_published_count'], page['article_revise_count'],
+             page['article_inprep_count']], [2, 1, 1])
+        with self.assertNumQueries(1):
+            counts = Article.displayable.count_management_lists()
+        self.assertEqual(counts, {'published': 2, 'revise': 1, 'inprep': 1})
+
+    def test_no_empty_last_page(self):
+        pages = self.get_pages('article', 2)
+        self.assertEqual(len(pages), 2)
+        self.assertIsNone(pages[-1]['next_page_url'])
+
+    def test_talk_list_rendered(self):
+        response = self.client.get('/talks/')
+        self.assertContains(response, 'Columbia University')
+        self.assertFalse(response.context['is_paginated'])
+
+    def test_unpaginated(self):
+        view = CVListView.as_view(per_page=None)
+        response = view(self.get_request('/articles/'), model_name='article')
+        self.assertEqual(
+            len(response.context_data['article_published_list']), 2)
+        self.assertIsNone(response.context_data['next_page_url'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/articles/', {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
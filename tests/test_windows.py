@@ -0,0 +1,122 @@
+"""Tests for CVs limited to a window of recent years"""
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from nose.plugins.attrib import attr
+
+from cv.models import Article, Position, Presentation, Talk
+from cv.settings import PUBLICATION_STATUS
+from cv.windows import get_window_start, parse_window, window_condition, \
+    window_queryset
+
+import datetime
+
+
+@attr('windows')
+class WindowTestCase(TestCase):
+    """Create items dated in and out of a five-year window."""
+
+    @classmethod
+    def setUp(cls):
+        cache.clear()
+        today = datetime.date.today()
+        recent = today - datetime.timedelta(days=365)
+        old = today.replace(year=today.year - 20)
+        published = PUBLICATION_STATUS['PUBLISHED_STATUS']
+        for title, date in (('Recent', recent), ('Old', old)):
+            Article.objects.create(
+                title='%s Article' % title, short_title=title,
+                slug=title.lower(), status=published, pub_date=date)
+        Article.objects.create(
+            title='Draft Article', short_title='Draft', slug='draft',
+            status=PUBLICATION_STATUS['INPREP_STATUS'])
+        Position.objects.create(
+            title='Old Position', institution='Acme', start_date=old,
+            current_position=False, primary_position=False,
+            end_date=old)
+        Position.objects.create(
+            title='Recent Position', institution='Acme', start_date=old,
+            end_date=recent,
+            current_position=True, primary_position=False)
+        talk = Talk.objects.create(
+            title='Talk', short_title='Talk', slug='talk')
+        for date, event in ((recent, 'New Conference'),
+                            (old, 'Old Conference')):
+            Presentation.objects.create(
+                talk=talk, presentation_date=date, type=10, event=event)
+        old_talk = Talk.objects.create(
+            title='Old Talk', short_title='Old Talk', slug='old-talk')
+        Presentation.objects.create(
+            talk=old_talk, presentation_date=old, type=10, event='Old')
+        Talk.objects.create(
+            title='Undated Talk', short_title='Undated Talk',
+            slug='undated-talk')
+        cls.since = get_window_start(5)
+
+    def test_get_window_start(self):
+        self.assertEqual(
+            get_window_start(2, datetime.date(2020, 2, 29)),
+            datetime.date(2018, 2, 28))
+        self.assertIsNone(parse_window(''))
+        for value in ('x', '0', '1000'):
+            with self.assertRaises(Http404):
+                parse_window(value)
+
+    def test_window_queryset(self):
+        articles = window_queryset(Article.displayable.all(), self.since)
+        self.assertEqual(sorted(a.short_title for a in articles),
+                         ['Draft', 'Recent'])
+        positions = window_queryset(Position.displayable.all(), self.since)
+        self.assertEqual([p.title for p in positions], ['Recent Position'])
+        self.assertEqual(
+            Article.displayable.count_management_lists(
+                window_condition(Article, self.since)),
+            {'published': 1, 'revise': 0, 'inprep': 1})
+
+    def test_talk_presentations_are_limited_to_window(self):
+        talks = window_queryset(Talk.displayable.all(), self.since)
+        with CaptureQueriesContext(connection) as queries:
+            talks = {t.title: t for t in talks}
+            events = [p.event for p in talks['Talk'].presentations.all()]
+        self.assertEqual(sorted(talks), ['Talk', 'Undated Talk'])
+        self.assertEqual(events, ['New Conference'])
+        self.assertEqual(len(queries), 2)
+
+    def test_cv_view(self):
+        response = self.client.get(reverse('cv:cv_list'), {'years': 5})
+        self.assertContains(response, 'Recent Article')
+        self.assertNotContains(response, 'Old Article')
+        self.assertNotContains(response, 'Old Talk')
+        response = self.client.get(reverse('cv:cv_list'))
+        self.assertContains(response, 'Old Article')
+        response = self.client.get(reverse('cv:cv_list'), {'years': 'x'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cached_cv_view(self):
+        url = reverse('cv:cv_list')
+        first = self.client.get(url, {'years': 5})
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url, {'years': 5})
+        self.assertEqual(first.content, second.content)
+        # Only the revision of the CV is read, for the validators of the
+        # response and for the cache key
+        self.assertEqual(len(queries), 2)
+        Article.objects.filter(slug='recent').update(title='Changed')
+        Article.objects.get(slug='recent').save()
+        response = self.client.get(url, {'years': 5})
+        self.assertContains(response, 'Changed')
+
+    def test_pdf_view(self):
+        url = reverse('cv:cv_pdf')
+        full = self.client.get(url)
+        window = self.client.get(url, {'years': 5})
+        self.assertEqual(window['Content-Type'], 'application/pdf')
+        self.assertLess(len(window.content), len(full.content))
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(url, {'years': 5})
+        self.assertEqual(cached.content, window.content)
+        self.assertEqual(len(queries), 2)